@@ -4,6 +4,10 @@ from .models import Advertisement, AdType
 from profiles.models import Genre, Skill
 from dal import autocomplete
 from cities_light.models import City
+from core import reference_data
+from core.filters import NearbyFilterSet
+from profiles.city_index import filter_within_city_radius
+from search.backends import search
 
 
 # Utility functions to dynamically generate choices for filters
@@ -11,36 +15,44 @@ def get_ad_type_choices():
     """
     Returns a list of tuples containing the id and name of each AdType for use in filter choices
     """
-    return [(ad_type.id, ad_type.name) for ad_type in AdType.objects.all()]
+    return reference_data.registry.get_choices(AdType)
 
 
 def get_genre_choices():
     """
     Returns a list of tuples containing the id and name of each Genre for use in filter choices
     """
-    return [(genre.id, genre.name) for genre in Genre.objects.all()]
+    return reference_data.registry.get_choices(Genre)
 
 
 def get_skill_choices():
     """
     Returns a list of tuples containing the id and name of each Skill for use in filter choices
     """
-    return [(skill.id, skill.name) for skill in Skill.objects.all()]
+    return reference_data.registry.get_choices(Skill)
 
 
-class AdvertisementFilter(django_filters.FilterSet):
+class AdvertisementFilter(NearbyFilterSet):
     """
     Filter class for Advertisement model
     """
 
-    # CharFilter for filtering advertisements by title, using case-insensitive containment matching
-    title = django_filters.CharFilter(field_name="title", lookup_expr="icontains")
+    # CharFilter for the full-text search of advertisements by title, description, genres and skills
+    q = django_filters.CharFilter(label="Search", method="filter_search")
+
+    def filter_search(self, queryset, name, value):
+        """
+        Custom method to filter the advertisements matching the full-text search query, most relevant first.
+        This method is used by the `q` filter above.
+        """
+
+        return search(queryset, value)
 
     # A MultipleChoiceFilter for filtering by advertisement type
-    # Choices are dynamically generated by the get_ad_type_choices function
+    # Choices are dynamically generated by the get_ad_type_choices function, each time the form is built
     ad_type = django_filters.MultipleChoiceFilter(
         field_name="ad_type",
-        choices=get_ad_type_choices(),
+        choices=get_ad_type_choices,
         widget=CheckboxSelectMultiple,
     )
 
@@ -65,12 +77,40 @@ class AdvertisementFilter(django_filters.FilterSet):
         widget=CheckboxSelectMultiple(attrs={"class": "d-flex flex-wrap row-cols-4"}),
     )
 
+    # Sorts the advertisements of the nearby search by distance
+    sort = django_filters.ChoiceFilter(
+        label="Sort by",
+        choices=[("distance", "Distance")],
+        empty_label="Last Updated",
+        method="filter_nearby",
+    )
+
+    # Nearest advertisements first, then the most recently updated
+    distance_ordering = ["distance", "-last_updated"]
+
+    def filter_within_radius(self, queryset, latitude, longitude, radius_km):
+        """
+        Advertisements are located by their city
+        """
+
+        return filter_within_city_radius(
+            queryset, "location", latitude, longitude, radius_km
+        )
+
+    def sorts_by_distance(self):
+        return self.form.cleaned_data.get("sort") == "distance"
+
     class Meta:
+        # Renders the choices of the genres and skills from the reference data registry
+        form = reference_data.ReferenceDataForm
         model = Advertisement
         fields = [
-            "title",
+            "q",
             "ad_type",
             "location",
+            "near",
+            "radius",
+            "sort",
             "genres",
             "skills",
         ]
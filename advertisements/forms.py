@@ -6,10 +6,11 @@ from crispy_forms.layout import Layout, Submit, Button
 from .models import Advertisement, Comment
 from profiles.models import Genre, Skill
 from cities_light.models import City
+from core.reference_data import ReferenceDataFormMixin
 from dal import autocomplete
 
 
-class AdvertisementCreateForm(forms.ModelForm):
+class AdvertisementCreateForm(ReferenceDataFormMixin, forms.ModelForm):
     """
     This form is used to create a new advertisement. It includes fields for the advertisement's title, description,
     location, genres, and skills. The form also utilizes Crispy Forms for better layout and presentation.
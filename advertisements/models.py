@@ -1,8 +1,14 @@
 from django.urls import reverse
 from django.db import models
+from django.db.models.functions import Left
+from core import reference_data
 from profiles.models import Profile, Skill, Genre
 
+# Number of description characters loaded for the advertisement cards
+CARD_DESCRIPTION_LENGTH = 500
 
+
+@reference_data.register
 class AdType(models.Model):
     """
     Model to store advertisement types
@@ -14,6 +20,43 @@ class AdType(models.Model):
         return self.name
 
 
+class AdvertisementQuerySet(models.QuerySet):
+    """
+    QuerySet for Advertisements
+    """
+
+    def for_cards(self):
+        """
+        Shapes the queryset for advertisement cards (ad lists, bookmarks, profile ads).
+        Joins the location rendered on every card and only loads the start of the description,
+        which is all the cards display, as `description_preview`.
+        """
+
+        return (
+            self.select_related("location")
+            .only(
+                "title",
+                "author",
+                "location__display_name",
+                "location__name",
+                "created",
+                "last_updated",
+            )
+            .annotate(description_preview=Left("description", CARD_DESCRIPTION_LENGTH))
+        )
+
+    def for_detail(self):
+        """
+        Shapes the queryset for the advertisement detail page.
+        Joins the author, ad type and location, and prefetches the genres and skills,
+        so the loaded advertisement holds everything the page renders and can be cached as is.
+        """
+
+        return self.select_related("author", "ad_type", "location").prefetch_related(
+            "genres", "skills"
+        )
+
+
 class Advertisement(models.Model):
     """
     Model to store advertisements
@@ -38,6 +81,8 @@ class Advertisement(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
 
+    objects = AdvertisementQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.title} - {self.author.user.email}"
 
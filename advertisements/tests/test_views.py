@@ -1,3 +1,124 @@
+from decimal import Decimal
+
+from cities_light.models import City, Country
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from advertisements.models import Advertisement, CARD_DESCRIPTION_LENGTH
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class AdvertisementListQueryCountTests(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name="United Kingdom", code2="GB")
+        city = City.objects.create(name="Glasgow", country=country)
+
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=self.user, display_name="Test User")
+
+        for i in range(12):
+            Advertisement.objects.create(
+                title=f"Ad {i}",
+                description="Looking for a drummer. " * 50,
+                author=self.profile,
+                location=city,
+            )
+
+    def count_queries(self, url, page_size, **kwargs):
+        """Returns the number of queries run to render the url with the given page size."""
+        with self.settings(PAGE_SIZE=page_size):
+            # Warm up process wide caches (e.g. content types) so only the page itself is measured
+            self.client.get(url, **kwargs)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_advertisement_list_query_count_does_not_depend_on_page_size(self):
+        self.client.login(username="testuser", password="password")
+        url = reverse("advertisements:advertisement_list")
+        self.assertEqual(self.count_queries(url, 2), self.count_queries(url, 10))
+
+    def test_get_advertisements_query_count_does_not_depend_on_page_size(self):
+        self.client.login(username="testuser", password="password")
+        url = reverse("advertisements:get_advertisements")
+        self.assertEqual(
+            self.count_queries(url, 2, HTTP_HX_REQUEST="true"),
+            self.count_queries(url, 10, HTTP_HX_REQUEST="true"),
+        )
+
+    def test_profile_ads_query_count_does_not_depend_on_number_of_ads(self):
+        url = reverse("profiles:profile_detail_ads", args=[self.profile.slug])
+        before = self.count_queries(url, 10)
+
+        Advertisement.objects.create(
+            title="Another ad", description="Another ad", author=self.profile
+        )
+        self.assertEqual(self.count_queries(url, 10), before)
+
+    def test_card_only_loads_description_preview(self):
+        ad = Advertisement.objects.for_cards().first()
+
+        self.assertIn("description", ad.get_deferred_fields())
+        self.assertEqual(len(ad.description_preview), CARD_DESCRIPTION_LENGTH)
+
+
+class AdvertisementNearbySearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        country = Country.objects.create(name="United Kingdom", code2="GB")
+        user = User.objects.create_user(username="testuser", password="password")
+        profile = Profile.objects.create(user=user, display_name="Test User")
+
+        self.cities = {}
+        for name, latitude, longitude in [
+            ("Edinburgh", "55.9533", "-3.1883"),
+            ("Paisley", "55.8456", "-4.4239"),
+            ("Glasgow", "55.8642", "-4.2518"),
+        ]:
+            self.cities[name] = City.objects.create(
+                name=name,
+                country=country,
+                latitude=Decimal(latitude),
+                longitude=Decimal(longitude),
+            )
+            Advertisement.objects.create(
+                title=f"Drummer wanted in {name}",
+                description="Looking for a drummer.",
+                author=profile,
+                location=self.cities[name],
+            )
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_titles(self, params):
+        response = self.client.get(reverse("advertisements:advertisement_list"), params)
+        self.assertEqual(response.status_code, 200)
+        return [ad.title for ad in response.context["ads"]]
+
+    def test_within_radius_of_city(self):
+        # Paisley is 11 km from Glasgow, Edinburgh 67 km
+        titles = self.get_titles({"near": self.cities["Glasgow"].pk})
+        self.assertEqual(
+            titles, ["Drummer wanted in Glasgow", "Drummer wanted in Paisley"]
+        )
 
-# Create your tests here.
+    def test_sort_by_distance(self):
+        titles = self.get_titles(
+            {"near": self.cities["Paisley"].pk, "radius": 100, "sort": "distance"}
+        )
+        self.assertEqual(
+            titles,
+            [
+                "Drummer wanted in Paisley",
+                "Drummer wanted in Glasgow",
+                "Drummer wanted in Edinburgh",
+            ],
+        )
@@ -8,16 +8,18 @@ from django.views.generic import (
     UpdateView,
     DeleteView,
 )
-from .models import Advertisement, Comment
+from .models import Advertisement, AdType, Comment
+from profiles.models import Profile, Genre, Skill
 from .forms import AdvertisementCreateForm, AdvertisementEditForm, CommentCreateForm
 from inbox.forms import InboxCreateMessageForm
 from .filters import AdvertisementFilter
 from profiles.mixins import ProfileRequiredMixin
-from django.http import HttpResponseRedirect
-from django.core.paginator import Paginator
+from django.http import HttpResponseRedirect, HttpResponseBadRequest
+from core.listing import ListPipeline
+from core.mixins import CachedObjectMixin
+from core.pagination import InvalidCursor
 from django.http import Http404
-from django.conf import settings
-from bookmarks.mixins import BookmarkMixin, BookmarkSingleObjectMixin
+from bookmarks.mixins import BookmarkSingleObjectMixin
 from reports.forms import ReportForm
 
 
@@ -29,37 +31,24 @@ def advertisement_list(request):
     # Part of Django filters,
     # initialize the advertisement filter with the GET parameters and the queryset of all advertisements,
     # ordered by the last updated date (descending).
-    f = AdvertisementFilter(
-        request.GET, queryset=Advertisement.objects.all().order_by("-last_updated")
+    # The filters are evaluated once and the advertisements paginated with settings.PAGE_SIZE items per page.
+    advertisements = ListPipeline(
+        request,
+        AdvertisementFilter,
+        Advertisement.objects.for_cards().order_by("-last_updated"),
     )
-
-    # Check if any filter fields are present in the GET parameters.
-    has_filter = any(field in request.GET for field in set(f.get_fields()))
-
-    # If no filters are applied, retrieve all advertisements ordered by the last updated date.
-    if not has_filter:
-        advertisements = Advertisement.objects.all().order_by("-last_updated")
-    else:
-        # If filters are applied, get the filtered queryset.
-        advertisements = f.qs
-
-    # Paginate the advertisements with the number of items per page defined in settings.PAGE_SIZE.
-    # This defaults to the first page when this view is triggered.
-    paginator = Paginator(advertisements, settings.PAGE_SIZE)
-    advertisements_page = paginator.page(1)  # default to 1 when this view is triggered
+    # First page when this view is triggered
+    advertisements_page = advertisements.page()
 
     context = {
-        "form": f.form,  # The form object associated with the filter.
+        "form": advertisements.form,  # The form object associated with the filter.
         "ads": advertisements_page,
-        "ads_count": advertisements.count,  # The total count of advertisements.
-        "has_filter": has_filter,
+        "ads_count": advertisements.count(),  # The total count of advertisements.
+        "has_filter": advertisements.has_filter,
     }
 
-    # Add bookmark context to the context dictionary.
-    bookmark_context = BookmarkMixin().get_bookmark_context(
-        request.user, advertisements
-    )
-    context.update(bookmark_context)  # Update the context with bookmark information.
+    # Add bookmark context for the advertisements on the page to the context dictionary.
+    context.update(advertisements.get_bookmark_context(advertisements_page))
 
     return render(request, "advertisements/advertisement_list.html", context)
 
@@ -73,37 +62,29 @@ def get_advertisements(request):
     if not request.headers.get("HX-Request"):
         raise Http404()
 
-    # Get the page number from the GET parameters. If not provided, default to page 1.
-    page = request.GET.get(
-        "page", 1  # ?page=2 will extract 2; defaults to 1 if not present.
-    )
+    # Get the opaque cursor pointing after the last advertisement of the previous page.
+    # If not provided, the first page is returned.
+    cursor = request.GET.get("cursor")
 
     # Initialize the advertisement filter with the GET parameters and the queryset of all advertisements,
     # ordered by the last updated date (descending).
-    f = AdvertisementFilter(
-        request.GET, queryset=Advertisement.objects.all().order_by("-last_updated")
+    advertisements = ListPipeline(
+        request,
+        AdvertisementFilter,
+        Advertisement.objects.for_cards().order_by("-last_updated"),
     )
 
-    # Check if any filter fields are present in the GET parameters.
-    has_filter = any(field in request.GET for field in set(f.get_fields()))
-
-    # If no filters are applied, retrieve all advertisements ordered by the last updated date.
-    # If filters are applied, get the filtered queryset.
-    if not has_filter:
-        advertisements = Advertisement.objects.all().order_by("-last_updated")
-    else:
-        advertisements = f.qs
+    # Keyset pagination, so deep pages cost the same as the first one and no COUNT is run.
+    try:
+        advertisements_page = advertisements.page(cursor)
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid cursor.")
 
-    # Paginate the advertisements with the number of items per page defined in settings.PAGE_SIZE.
-    paginator = Paginator(advertisements, settings.PAGE_SIZE)
-    context = {"ads": paginator.page(page)}
+    context = {"ads": advertisements_page}
 
     # Add bookmark context to the context dictionary.
-    # Gets bookmarks for advertisements pertaining to the current user.
-    bookmark_context = BookmarkMixin().get_bookmark_context(
-        request.user, advertisements
-    )
-    context.update(bookmark_context)
+    # Gets bookmarks of the current user for the advertisements on the page.
+    context.update(advertisements.get_bookmark_context(advertisements_page))
 
     return render(
         request,
@@ -150,7 +131,7 @@ class AdvertisementCreateView(
         )
 
 
-class AdvertisementDetailView(BookmarkSingleObjectMixin, DetailView):
+class AdvertisementDetailView(CachedObjectMixin, BookmarkSingleObjectMixin, DetailView):
     """
     View for displaying the detail of an advertisement
     """
@@ -158,6 +139,10 @@ class AdvertisementDetailView(BookmarkSingleObjectMixin, DetailView):
     # The model that this view operates on.
     model = Advertisement
 
+    # Load the author, type, location, genres and skills with the advertisement, which is cached with them
+    queryset = Advertisement.objects.for_detail()
+    cache_dependencies = [Profile, AdType, Genre, Skill]
+
     # The template used to render the advertisement detail page.
     template_name = "advertisements/advertisement_detail.html"
 
@@ -172,8 +157,8 @@ class AdvertisementDetailView(BookmarkSingleObjectMixin, DetailView):
         # Initialize the base context provided by the superclass.
         context = super().get_context_data(**kwargs)
 
-        # Retrieve the specific advertisement object based on the primary key (pk) from the URL
-        advertisement = self.get_object()
+        # The advertisement object retrieved by DetailView based on the primary key (pk) from the URL
+        advertisement = self.object
 
         # Add a form for creating comments related to the advertisement.
         context["comment_form"] = CommentCreateForm()
@@ -188,12 +173,11 @@ class AdvertisementDetailView(BookmarkSingleObjectMixin, DetailView):
 
         # Get and add bookmark context specific to the advertisement detail for the current user.
         bookmark_context = self.get_single_bookmark_context(
-            self.request.user, self.get_object()
+            self.request.user, advertisement
         )
         context.update(bookmark_context)
 
         # Pass context for report button
-        advertisement = self.get_object()
         context["report_form"] = ReportForm()
         context["app_label"] = advertisement._meta.app_label
         context["model_name"] = advertisement._meta.model_name
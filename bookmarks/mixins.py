@@ -3,52 +3,109 @@ from django.db.models import QuerySet
 from bookmarks.models import Bookmark
 
 
-class BookmarkMixin:
+class BookmarkLookupMixin:
+    """
+    Base mixin holding the bookmark lookups of the current user.
+    Looked up bookmarks are memoized on the mixin instance, which class based views create once per request,
+    so the same object is never looked up twice while rendering a page.
+    """
+
+    def _get_bookmark_profile(self, user):
+        """
+        Returns the profile of the user if bookmarks can be looked up for them, otherwise None.
+        """
+
+        if user.is_authenticated and hasattr(user, "profile"):
+            return user.profile
+        return None
+
+    def _get_bookmark_memo(self, profile):
+        """
+        Returns the memo of looked up bookmarks, keyed by (content type id, object id).
+        A None value means the object was looked up and is not bookmarked.
+        """
+
+        memo = getattr(self, "_bookmark_memo", None)
+        if memo is None or memo[0] != profile.pk:
+            memo = (profile.pk, {})
+            self._bookmark_memo = memo
+        return memo[1]
+
+
+class BookmarkMixin(BookmarkLookupMixin):
     """
     Mixin to add bookmark-related context to a view.
-    Provides a method to generate a context dictionary with information about which objects in a given queryset are bookmarked by the current user.
+    Provides a method to generate a context dictionary with information about which of the given objects are bookmarked by the current user.
     """
 
-    def get_bookmark_context(self, user, object_list):
+    def get_bookmark_context(self, user, object_list, model=None):
         """
         Generates a context dictionary containing bookmarked objects for the given user and object list.
 
         Args:
             user: The current user making the request.
-            object_list: A QuerySet of objects to check for bookmarks.
+            object_list: The rendered objects to check for bookmarks, either a page or list of objects,
+                a list of ids (with `model` given), or a QuerySet.
+            model: The model of the objects, only required when object_list is a list of ids.
 
         Returns:
             context: A dictionary containing the bookmarked objects if the user is authenticated and has a profile.
         """
         context = {}
 
-        # Check if the user is authenticated, has a profile, and the object_list is a QuerySet.
-        if (
-            user.is_authenticated
-            and hasattr(user, "profile")
-            and isinstance(object_list, QuerySet)
-        ):
-            # Get the ContentType for the model of the objects in the object_list.
-            content_type = ContentType.objects.get_for_model(object_list.model)
-
-            # Retrieve all bookmarks for the current user that match the objects in the object_list.
+        profile = self._get_bookmark_profile(user)
+        if profile is None:
+            return context
+
+        if isinstance(object_list, QuerySet):
+            # Evaluate the queryset, only its rendered objects are looked up
+            model = object_list.model
+            object_list = list(object_list)
+
+        # Collect the ids of the objects, which may already be ids
+        object_ids = [getattr(obj, "pk", obj) for obj in object_list]
+        if model is None:
+            # An empty list has no model, and nothing to look up
+            if not object_list:
+                context["bookmarked_objects"] = {}
+                return context
+            model = type(object_list[0])
+
+        # Get the ContentType for the model of the objects in the object_list.
+        content_type = ContentType.objects.get_for_model(model)
+        memo = self._get_bookmark_memo(profile)
+
+        # Only look up the objects which have not been looked up during this request
+        missing_ids = [
+            object_id
+            for object_id in object_ids
+            if (content_type.id, object_id) not in memo
+        ]
+        if missing_ids:
+            # Retrieve the bookmarks of the current user for the objects.
             bookmarks = Bookmark.objects.filter(
-                profile__user=user,
+                profile=profile,
                 content_type=content_type,
-                object_id__in=object_list.values_list("id", flat=True),
+                object_id__in=missing_ids,
             )
-
-            # Create a dictionary mapping object IDs to their corresponding bookmark objects.
-            bookmarked_objects = {
-                bookmark.object_id: bookmark for bookmark in bookmarks
-            }
-
-            # Add the bookmarked objects dictionary to the context.
-            context["bookmarked_objects"] = bookmarked_objects
+            for object_id in missing_ids:
+                memo[(content_type.id, object_id)] = None
+            for bookmark in bookmarks:
+                memo[(content_type.id, bookmark.object_id)] = bookmark
+
+        # Create a dictionary mapping object IDs to their corresponding bookmark objects.
+        bookmarked_objects = {
+            object_id: memo[(content_type.id, object_id)]
+            for object_id in object_ids
+            if memo[(content_type.id, object_id)] is not None
+        }
+
+        # Add the bookmarked objects dictionary to the context.
+        context["bookmarked_objects"] = bookmarked_objects
         return context
 
 
-class BookmarkSingleObjectMixin:
+class BookmarkSingleObjectMixin(BookmarkLookupMixin):
     """
     Mixin to add bookmark-related context to a view that handles a single object.
     Provides a method to generate a context dictionary with information about whether the given object is bookmarked by the current user.
@@ -68,16 +125,21 @@ class BookmarkSingleObjectMixin:
         context = {}
 
         # Check if the user is authenticated and has a profile.
-        if user.is_authenticated and hasattr(user, "profile"):
+        profile = self._get_bookmark_profile(user)
+        if profile is not None:
             # Get the ContentType for the model of the object.
             content_type = ContentType.objects.get_for_model(obj)
-
-            # Retrieve the bookmark for the current user and the given object, if it exists.
-            bookmark = Bookmark.objects.filter(
-                profile__user=user,
-                content_type=content_type,
-                object_id=obj.id,
-            ).first()  # Use .first() to get the first (and only) bookmark if it exists.
+            memo = self._get_bookmark_memo(profile)
+
+            # Retrieve the bookmark for the current user and the given object, unless already looked up.
+            key = (content_type.id, obj.pk)
+            if key not in memo:
+                memo[key] = Bookmark.objects.filter(
+                    profile=profile,
+                    content_type=content_type,
+                    object_id=obj.pk,
+                ).first()  # Use .first() to get the first (and only) bookmark if it exists.
+            bookmark = memo[key]
 
             # Add a boolean to the context indicating whether the object is bookmarked.
             context["is_bookmarked"] = bookmark is not None
@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from advertisements.models import Advertisement
+from bookmarks.mixins import BookmarkMixin, BookmarkSingleObjectMixin
+from bookmarks.models import Bookmark
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class BookmarkView(BookmarkSingleObjectMixin, BookmarkMixin):
+    """Stands in for a view using both bookmark mixins."""
+
+
+class BookmarkMixinTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=self.user, display_name="Test User")
+        self.ads = [
+            Advertisement.objects.create(title=f"Ad {i}", author=self.profile)
+            for i in range(4)
+        ]
+
+        content_type = ContentType.objects.get_for_model(Advertisement)
+        self.bookmark = Bookmark.objects.create(
+            profile=self.profile, content_type=content_type, object_id=self.ads[0].pk
+        )
+        Bookmark.objects.create(
+            profile=self.profile, content_type=content_type, object_id=self.ads[3].pk
+        )
+
+        # Load the profile and content type so only the bookmark lookups are counted
+        self.user.profile
+
+    def test_only_given_objects_are_looked_up(self):
+        context = BookmarkMixin().get_bookmark_context(self.user, self.ads[:2])
+
+        self.assertEqual(context["bookmarked_objects"], {self.ads[0].pk: self.bookmark})
+
+    def test_ids_with_model(self):
+        context = BookmarkMixin().get_bookmark_context(
+            self.user, [self.ads[0].pk, self.ads[1].pk], model=Advertisement
+        )
+
+        self.assertEqual(context["bookmarked_objects"], {self.ads[0].pk: self.bookmark})
+
+    def test_empty_page_runs_no_query(self):
+        with self.assertNumQueries(0):
+            context = BookmarkMixin().get_bookmark_context(self.user, [])
+
+        self.assertEqual(context["bookmarked_objects"], {})
+
+    def test_anonymous_user(self):
+        context = BookmarkMixin().get_bookmark_context(AnonymousUser(), self.ads)
+
+        self.assertEqual(context, {})
+
+    def test_single_lookup_is_memoized(self):
+        view = BookmarkView()
+        view.get_single_bookmark_context(self.user, self.ads[0])
+
+        with self.assertNumQueries(0):
+            context = view.get_single_bookmark_context(self.user, self.ads[0])
+
+        self.assertTrue(context["is_bookmarked"])
+        self.assertEqual(context["bookmark"], self.bookmark)
+
+    def test_list_lookup_fills_memo(self):
+        view = BookmarkView()
+        view.get_bookmark_context(self.user, self.ads)
+
+        with self.assertNumQueries(0):
+            bookmarked = view.get_single_bookmark_context(self.user, self.ads[1])
+            context = view.get_bookmark_context(self.user, self.ads[2:])
+
+        self.assertFalse(bookmarked["is_bookmarked"])
+        self.assertEqual(list(context["bookmarked_objects"]), [self.ads[3].pk])
@@ -317,7 +317,8 @@ class BookmarkProfileListView(LoginRequiredMixin, ProfileRequiredMixin, ListView
 
         # Annotate the Profile queryset with the bookmark created date and order by it
         return (
-            Profile.objects.filter(
+            Profile.objects.for_cards()
+            .filter(
                 id__in=Bookmark.objects.filter(
                     profile=profile, content_type=profile_content_type
                 ).values(
@@ -381,7 +382,8 @@ class BookmarkAdvertisementListView(
 
         # Annotate the Advertisement queryset with the bookmark created date and order by it.
         return (
-            Advertisement.objects.filter(
+            Advertisement.objects.for_cards()
+            .filter(
                 id__in=Bookmark.objects.filter(
                     profile=profile, content_type=advertisement_content_type
                 ).values(
@@ -404,11 +406,11 @@ class BookmarkAdvertisementListView(
         # Get the base context from the superclass.
         context = super().get_context_data(**kwargs)
 
-        # Retrieve the queryset of bookmarked advertisements.
-        queryset = self.get_queryset()
+        # The bookmarked advertisements retrieved by ListView, evaluated once for the count, bookmarks and template.
+        queryset = context["object_list"]
 
         # Add the count of bookmarked advertisements to the context.
-        context["ads_count"] = queryset.count()
+        context["ads_count"] = len(queryset)
 
         # Add bookmark context for the advertisements (list of objects).
         # Returns a group of bookmarked advertisements to mark which advertisements have been bookmarked,
@@ -457,7 +459,8 @@ class BookmarkOpenMicListView(
 
         # Annotate the OpenMic queryset with the bookmark created date and order by it.
         return (
-            OpenMic.objects.filter(
+            OpenMic.objects.for_cards()
+            .filter(
                 id__in=Bookmark.objects.filter(
                     profile=profile, content_type=openmic_content_type
                 ).values(
@@ -479,11 +482,11 @@ class BookmarkOpenMicListView(
         """
         context = super().get_context_data(**kwargs)
 
-        # Retrieve the queryset of bookmarked OpenMic events.
-        queryset = self.get_queryset()
+        # The bookmarked OpenMic events retrieved by ListView, evaluated once for the count, bookmarks and template.
+        queryset = context["object_list"]
 
         # Add the count of bookmarked OpenMic events to the context.
-        context["openmics_count"] = queryset.count()
+        context["openmics_count"] = len(queryset)
 
         # Add bookmark context for the open mics (list of objects).
         # Returns a group of bookmarked open mics to mark which open mics have been bookmarked,
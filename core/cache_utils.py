@@ -0,0 +1,78 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+# Prefix of the cache keys holding the current version of each namespace
+VERSION_KEY_PREFIX = "cache-version"
+
+
+def get_namespace(model):
+    """
+    Returns the cache namespace of a model (or model instance), its lowercase app label and model name.
+    """
+    return model._meta.label_lower
+
+
+def get_versions(namespaces):
+    """
+    Returns the current versions of the given namespaces, in a single cache round trip.
+    """
+    version_keys = [f"{VERSION_KEY_PREFIX}:{namespace}" for namespace in namespaces]
+    versions = cache.get_many(version_keys)
+    missing = [key for key in version_keys if key not in versions]
+    if missing:
+        # add() keeps a version set concurrently by another process
+        for key in missing:
+            cache.add(key, new_version(), timeout=None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, 0) for key in version_keys]
+
+
+def new_version():
+    """
+    Returns the starting version of a namespace whose version is not in the cache.
+    Time based, so a version evicted from the cache never comes back to a previously used number.
+    """
+    return time.time_ns()
+
+
+def make_key(namespaces, *parts):
+    """
+    Returns a cache key for the given parts, versioned by one or more namespaces.
+    Bumping the version of any of the namespaces makes the key change, which invalidates the cached value.
+    """
+    if isinstance(namespaces, str):
+        namespaces = [namespaces]
+    versions = get_versions(namespaces)
+    versioned = [
+        f"{namespace}.v{version}" for namespace, version in zip(namespaces, versions)
+    ]
+
+    # Hash the versions and parts so arbitrary values (e.g. SQL) give short keys valid for every cache backend
+    digest = hashlib.md5(
+        ":".join(str(part) for part in versioned + list(parts)).encode()
+    ).hexdigest()
+    return f"{namespaces[0]}:{digest}"
+
+
+def bump_version(namespace):
+    """
+    Invalidates every key of the namespace by incrementing its version.
+    The stale values are not deleted, they expire with their timeout.
+    """
+    key = f"{VERSION_KEY_PREFIX}:{namespace}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The version is not in the cache (never used or evicted), start a new one
+        cache.set(key, new_version(), timeout=None)
+
+
+def get_or_set(namespaces, parts, default, timeout=DEFAULT_TIMEOUT):
+    """
+    Returns the cached value for the versioned key of the parts,
+    calling default() and caching its result on a miss.
+    """
+    return cache.get_or_set(make_key(namespaces, *parts), default, timeout)
@@ -0,0 +1,100 @@
+import django_filters
+from cities_light.models import City
+from dal import autocomplete
+
+# Radius choices of the nearby searches, in kilometers
+RADIUS_CHOICES = [
+    (5, "5 km"),
+    (10, "10 km"),
+    (25, "25 km"),
+    (50, "50 km"),
+    (100, "100 km"),
+]
+
+# Radius of the nearby searches when none is selected
+DEFAULT_RADIUS_KM = 25
+
+
+class NearbyFilterSet(django_filters.FilterSet):
+    """
+    Base FilterSet of the lists searchable by distance: keeps the objects within the selected radius
+    of a city, annotated with their `distance` (km) and optionally sorted by it.
+
+    Subclasses implement filter_within_radius() and sorts_by_distance().
+    """
+
+    # Filters of the nearby search, applied together by filter_queryset() below
+    near = django_filters.ModelChoiceFilter(
+        queryset=City.objects.all(),
+        label="Near",
+        method="filter_nearby",
+        widget=autocomplete.ModelSelect2(url="profiles:location_autocomplete"),
+    )
+    radius = django_filters.ChoiceFilter(
+        label="Within",
+        choices=RADIUS_CHOICES,
+        empty_label=None,
+        method="filter_nearby",
+    )
+
+    # Ordering of the results sorted by distance
+    distance_ordering = ["distance"]
+
+    def __init__(self, data=None, *args, **kwargs):
+        # Search within the default radius if none is selected
+        if data is not None and not data.get("radius"):
+            data = data.copy()
+            data["radius"] = DEFAULT_RADIUS_KM
+        super().__init__(data, *args, **kwargs)
+
+    def filter_nearby(self, queryset, name, value):
+        """
+        The nearby search needs all of its filters at once, it is applied by filter_queryset()
+        """
+
+        return queryset
+
+    def get_center(self):
+        """
+        Returns the (latitude, longitude) of the nearby search, those of the selected city.
+        Returns None if there is no nearby search.
+        """
+
+        city = self.form.cleaned_data.get("near")
+        if (
+            city is not None
+            and city.latitude is not None
+            and city.longitude is not None
+        ):
+            return float(city.latitude), float(city.longitude)
+        return None
+
+    def filter_within_radius(self, queryset, latitude, longitude, radius_km):
+        """
+        Returns the queryset restricted to the objects within the radius (km) of the coordinates,
+        annotated with their `distance` (km).
+        """
+
+        raise NotImplementedError
+
+    def sorts_by_distance(self):
+        """
+        Returns True if the results of the nearby search are to be sorted by distance
+        """
+
+        return False
+
+    def filter_queryset(self, queryset):
+        """
+        Applies the filters, then the nearby search (if any)
+        """
+
+        queryset = super().filter_queryset(queryset)
+
+        center = self.get_center()
+        if center is not None:
+            radius = int(self.form.cleaned_data.get("radius") or DEFAULT_RADIUS_KM)
+            queryset = self.filter_within_radius(queryset, *center, radius)
+            if self.sorts_by_distance():
+                queryset = queryset.order_by(*self.distance_ordering)
+        return queryset
@@ -0,0 +1,194 @@
+import math
+
+import numpy as np
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+# Mean radius of the Earth, in kilometers
+EARTH_RADIUS_KM = 6371.0088
+
+# Size of the cells of the geo grid, in degrees of latitude and longitude (about 28 km at the equator).
+# Changing it invalidates the stored cells, which have to be backfilled.
+CELL_DEGREES = 0.25
+CELL_ROWS = int(180 / CELL_DEGREES)
+CELL_COLUMNS = int(360 / CELL_DEGREES)
+
+
+def get_row(latitude):
+    return min(max(int(math.floor((latitude + 90) / CELL_DEGREES)), 0), CELL_ROWS - 1)
+
+
+def get_column(longitude):
+    # Longitudes wrap around the antimeridian
+    return int(math.floor((longitude + 180) / CELL_DEGREES)) % CELL_COLUMNS
+
+
+def get_cell(latitude, longitude):
+    """
+    Returns the integer cell of the geo grid holding the coordinates, None if they are missing.
+    Cells are numbered row by row, so the cells of a row between two longitudes are a contiguous range.
+    """
+
+    if latitude is None or longitude is None:
+        return None
+    return get_row(float(latitude)) * CELL_COLUMNS + get_column(float(longitude))
+
+
+def get_cells(latitudes, longitudes):
+    """
+    Returns a NumPy array of the cells of the geo grid holding each of the given coordinates,
+    computed at once (see get_cell).
+    """
+
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+    rows = np.clip(np.floor((latitudes + 90) / CELL_DEGREES), 0, CELL_ROWS - 1)
+    columns = np.floor((longitudes + 180) / CELL_DEGREES) % CELL_COLUMNS
+    return (rows * CELL_COLUMNS + columns).astype(np.int64)
+
+
+def get_bounding_box(latitude, longitude, radius_km):
+    """
+    Returns the (min_latitude, max_latitude, min_longitude, max_longitude) box holding the circle of the
+    given radius around the coordinates. The longitudes are None if the box spans every longitude
+    (circle around a pole), and may go beyond ±180 when it crosses the antimeridian.
+    """
+
+    angle = radius_km / EARTH_RADIUS_KM
+    delta_latitude = math.degrees(angle)
+    min_latitude = latitude - delta_latitude
+    max_latitude = latitude + delta_latitude
+    if min_latitude <= -90 or max_latitude >= 90:
+        return max(min_latitude, -90), min(max_latitude, 90), None, None
+
+    delta_longitude = math.degrees(
+        math.asin(min(math.sin(angle) / math.cos(math.radians(latitude)), 1))
+    )
+    if delta_longitude >= 180:
+        return min_latitude, max_latitude, None, None
+    return (
+        min_latitude,
+        max_latitude,
+        longitude - delta_longitude,
+        longitude + delta_longitude,
+    )
+
+
+def get_cell_ranges(latitude, longitude, radius_km):
+    """
+    Returns the (first, last) ranges of the cells covering the bounding box of the circle of the given
+    radius around the coordinates, one or two per row of the grid (two when crossing the antimeridian).
+    """
+
+    min_latitude, max_latitude, min_longitude, max_longitude = get_bounding_box(
+        latitude, longitude, radius_km
+    )
+    first_row, last_row = get_row(min_latitude), get_row(max_latitude)
+
+    # Circle around a pole: every cell of the rows, which is a single range
+    if min_longitude is None:
+        return [(first_row * CELL_COLUMNS, last_row * CELL_COLUMNS + CELL_COLUMNS - 1)]
+
+    first_column, last_column = get_column(min_longitude), get_column(max_longitude)
+    if min_longitude >= -180 and max_longitude < 180:
+        columns = [(first_column, last_column)]
+    else:
+        # The box crosses the antimeridian, its columns are split at both ends of the rows
+        columns = [(first_column, CELL_COLUMNS - 1), (0, last_column)]
+
+    return [
+        (row * CELL_COLUMNS + first, row * CELL_COLUMNS + last)
+        for row in range(first_row, last_row + 1)
+        for first, last in columns
+    ]
+
+
+def get_cell_filter(field_name, latitude, longitude, radius_km):
+    """
+    Returns a Q object selecting the rows whose cell (stored in `field_name`) may be within
+    the given radius of the coordinates, a range lookup per row of the grid using the cell index.
+    """
+
+    condition = Q()
+    for first, last in get_cell_ranges(latitude, longitude, radius_km):
+        condition |= Q(**{f"{field_name}__range": (first, last)})
+    return condition
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """
+    Returns a NumPy array of the great circle distances (km) between the coordinates
+    and each of the given latitudes and longitudes, computed at once with the haversine formula.
+    """
+
+    latitude, longitude = math.radians(latitude), math.radians(longitude)
+    latitudes = np.radians(np.asarray(latitudes, dtype=float))
+    longitudes = np.radians(np.asarray(longitudes, dtype=float))
+
+    a = (
+        np.sin((latitudes - latitude) / 2) ** 2
+        + math.cos(latitude)
+        * np.cos(latitudes)
+        * np.sin((longitudes - longitude) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def distance_expression(latitude, longitude, latitude_field, longitude_field):
+    """
+    Returns the database expression of the haversine distance (km) between the coordinates
+    and the given latitude and longitude fields, used to order the rows by distance.
+    The fields are cast to floats, so they can also be decimals (e.g. the coordinates of the cities).
+    """
+
+    latitude_radians = Radians(Cast(F(latitude_field), FloatField()))
+    a = Power(
+        Sin((latitude_radians - Value(math.radians(latitude))) / Value(2.0)), 2
+    ) + Value(math.cos(math.radians(latitude))) * Cos(latitude_radians) * Power(
+        Sin(
+            (
+                Radians(Cast(F(longitude_field), FloatField()))
+                - Value(math.radians(longitude))
+            )
+            / Value(2.0)
+        ),
+        2,
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a))
+
+
+def filter_within_radius(
+    queryset,
+    latitude,
+    longitude,
+    radius_km,
+    cell_field="geo_cell",
+    latitude_field="latitude",
+    longitude_field="longitude",
+):
+    """
+    Returns the queryset restricted to the rows within the given radius (km) of the coordinates,
+    annotated with their `distance` (km).
+
+    The candidates are selected on the indexed grid cells covering the bounding box of the circle,
+    only their coordinates are loaded, and the exact haversine distance is computed over all of them
+    at once with NumPy to keep the rows inside the circle.
+    """
+
+    candidates = np.array(
+        queryset.filter(get_cell_filter(cell_field, latitude, longitude, radius_km))
+        .order_by()
+        .values_list("pk", latitude_field, longitude_field),
+        dtype=float,
+    ).reshape(-1, 3)
+
+    distances = haversine_km(latitude, longitude, candidates[:, 1], candidates[:, 2])
+    pks = candidates[distances <= radius_km, 0].astype(int).tolist()
+
+    queryset = queryset.filter(pk__in=pks).annotate(
+        distance=distance_expression(
+            latitude, longitude, latitude_field, longitude_field
+        )
+    )
+    # Without candidates, skip the query (an empty `pk__in` cannot even be compiled to SQL)
+    return queryset if pks else queryset.none()
@@ -0,0 +1,212 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Formats of the derivatives: Pillow format, content type and file extension.
+# WebP is served to the browsers supporting it, JPEG to the others.
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", "image/webp", "webp"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+}
+
+# Format of the fallback `src` of the rendered images
+FALLBACK_FORMAT = "jpeg"
+
+
+def get_derivative_name(name, size, format):
+    """
+    Returns the storage name of a derivative of the image stored under `name`,
+    in a "derivatives" directory alongside the original ("a/b.png" becomes "a/derivatives/b_card.webp").
+    """
+
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    extension = DERIVATIVE_FORMATS[format][2]
+    return os.path.join(directory, "derivatives", f"{stem}_{size}.{extension}")
+
+
+def resize(image, width, height=None):
+    """
+    Returns the image resized to the given width, cropped to fill the given height if there is one,
+    otherwise keeping its aspect ratio. Images are never upscaled.
+    """
+
+    if height is None:
+        if image.width <= width:
+            return image.copy()
+        return image.resize(
+            (width, round(image.height * width / image.width)), Image.LANCZOS
+        )
+
+    # Scale down the box to the image if it is smaller, keeping the aspect ratio of the box
+    scale = min(1, image.width / width, image.height / height)
+    box = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return ImageOps.fit(image, box, Image.LANCZOS)
+
+
+def encode(image, format):
+    """
+    Returns the bytes of the image encoded in the given derivative format
+    """
+
+    pillow_format = DERIVATIVE_FORMATS[format][0]
+    if pillow_format == "JPEG" and image.mode != "RGB":
+        # JPEG has no transparency, transparent pixels are flattened on white
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+
+    output = BytesIO()
+    image.save(
+        output,
+        pillow_format,
+        quality=getattr(settings, "IMAGE_DERIVATIVE_QUALITY", 82),
+        optimize=True,
+    )
+    return output.getvalue()
+
+
+def cap_image(field_file, width, height=None):
+    """
+    Resizes the image of a file field in place to fit within the given width and height (any height if None),
+    keeping its aspect ratio and format, if it is larger. The orientation of the camera is applied.
+    Returns the name the image is stored under, which the storage may have changed when it was resized.
+    """
+
+    storage = field_file.storage
+    with field_file.open("rb") as file:
+        image = Image.open(file)
+        # Pillow writes the multi-picture JPEGs of some cameras as plain JPEG
+        format = "JPEG" if image.format == "MPO" else image.format
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.width <= width and (height is None or image.height <= height):
+        return field_file.name
+
+    image.thumbnail((width, height or image.height), Image.LANCZOS)
+    output = BytesIO()
+    image.save(
+        output,
+        format,
+        quality=getattr(settings, "IMAGE_DERIVATIVE_QUALITY", 82),
+        optimize=True,
+    )
+    storage.delete(field_file.name)
+    return storage.save(field_file.name, ContentFile(output.getvalue()))
+
+
+def generate_derivatives(field_file, sizes):
+    """
+    Generates the derivatives of the image of a file field in every size and format,
+    stores them alongside the original through the storage of the field and returns their description:
+    {"source": name of the original, "sizes": {size: {"width": width, "webp": name, "jpeg": name}}}.
+
+    `sizes` maps the name of each size to its (width, height), a height crops the image to fill it.
+    """
+
+    storage = field_file.storage
+    with field_file.open("rb") as file:
+        image = Image.open(file)
+        # Apply the orientation of the camera, the derivatives are stored without EXIF data
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    derivatives = {"source": field_file.name, "sizes": {}}
+    for size, (width, height) in sizes.items():
+        resized = resize(image, width, height)
+        derivative = {"width": resized.width}
+        for format in DERIVATIVE_FORMATS:
+            name = get_derivative_name(field_file.name, size, format)
+            if storage.exists(name):
+                storage.delete(name)
+            # The storage may still rename it (e.g. S3 without overwrite), keep the name it was saved under
+            derivative[format] = storage.save(
+                name, ContentFile(encode(resized, format))
+            )
+        derivatives["sizes"][size] = derivative
+    return derivatives
+
+
+def get_derivative_names(derivatives):
+    """
+    Returns the storage names of the files of derivatives described by generate_derivatives()
+    """
+
+    return [
+        derivative[format]
+        for derivative in (derivatives or {}).get("sizes", {}).values()
+        for format in DERIVATIVE_FORMATS
+        if derivative.get(format)
+    ]
+
+
+def delete_derivatives(storage, derivatives):
+    """
+    Deletes the files of derivatives described by generate_derivatives()
+    """
+
+    for name in get_derivative_names(derivatives):
+        storage.delete(name)
+
+
+class DerivativeImage:
+    """
+    An image file field with its derivatives, as rendered by the `picture` template tag.
+    Derivatives generated from another file than the current one of the field are ignored,
+    the original is used until the derivatives of the new file are generated.
+    An image whose file could not be read (recorded as "unreadable") is false, like a missing one,
+    so templates render their placeholder instead of the original.
+    """
+
+    def __init__(self, field_file, derivatives):
+        self.field_file = field_file
+        self.unreadable = False
+        if field_file and (derivatives or {}).get("source") == field_file.name:
+            self.sizes = derivatives.get("sizes", {})
+            self.unreadable = bool(derivatives.get("unreadable"))
+        else:
+            self.sizes = {}
+
+    def __bool__(self):
+        return bool(self.field_file) and not self.unreadable
+
+    @property
+    def storage(self):
+        return self.field_file.storage
+
+    def get_url(self, size=None, format=FALLBACK_FORMAT):
+        """
+        Returns the URL of the derivative of the given size and format,
+        the URL of the original if it has not been generated.
+        """
+
+        derivative = self.sizes.get(size)
+        if derivative and derivative.get(format):
+            return self.storage.url(derivative[format])
+        return self.field_file.url
+
+    @property
+    def url(self):
+        return self.get_url()
+
+    def get_srcset(self, format=FALLBACK_FORMAT):
+        """
+        Returns the srcset attribute listing the derivatives of the given format with their widths,
+        an empty string if there are none.
+        """
+
+        derivatives = sorted(
+            self.sizes.values(), key=lambda derivative: derivative["width"]
+        )
+        return ", ".join(
+            f"{self.storage.url(derivative[format])} {derivative['width']}w"
+            for derivative in derivatives
+            if derivative.get(format)
+        )
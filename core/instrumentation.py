@@ -0,0 +1,88 @@
+import functools
+import time
+from contextvars import ContextVar
+
+from django.template.base import Template
+
+# Metrics of the request being handled in the current thread or task
+_current_metrics = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    Performance metrics of a request: SQL queries with their durations, template render time and total time.
+    Durations are in seconds.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.template_time = 0
+        self.rendering = False
+        self.start = time.perf_counter()
+        self.total_time = None
+
+    @property
+    def query_count(self):
+        return len(self.queries)
+
+    @property
+    def query_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def stop(self):
+        self.total_time = time.perf_counter() - self.start
+
+    def top_queries(self, count):
+        """
+        Returns the `count` slowest (sql, duration) queries
+        """
+        return sorted(self.queries, key=lambda query: query[1], reverse=True)[:count]
+
+    def __call__(self, execute, sql, params, many, context):
+        # Database execute wrapper recording the duration of each query
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+
+def start_metrics():
+    """
+    Starts recording the metrics of a request, returns them with the token resetting the previous metrics
+    """
+    metrics = RequestMetrics()
+    return metrics, _current_metrics.set(metrics)
+
+
+def stop_metrics(metrics, token):
+    metrics.stop()
+    _current_metrics.reset(token)
+
+
+def instrument_templates():
+    """
+    Wraps Template.render so the render time of the templates is added to the metrics of the current request.
+    Only the outermost template is timed, included templates are part of its render time.
+    """
+    if getattr(Template.render, "instrumented", False):
+        return
+
+    original_render = Template.render
+
+    @functools.wraps(original_render)
+    def render(self, context):
+        metrics = _current_metrics.get()
+        if metrics is None or metrics.rendering:
+            return original_render(self, context)
+
+        metrics.rendering = True
+        start = time.perf_counter()
+        try:
+            return original_render(self, context)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+            metrics.rendering = False
+
+    render.instrumented = True
+    Template.render = render
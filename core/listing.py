@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+
+from bookmarks.mixins import BookmarkMixin
+from core import cache_utils
+from core.pagination import CursorPaginator
+
+
+class ListPipeline:
+    """
+    Shared pipeline for the filtered, infinitely scrolling list views.
+
+    The FilterSet is built and evaluated once, the total count is computed at most once
+    (and optionally cached), and bookmarks are only looked up for the objects on the current page,
+    so a list request runs a fixed, small number of queries whatever the size of the table.
+    """
+
+    def __init__(self, request, filterset_class, queryset, per_page=None):
+        self.request = request
+
+        # Build the FilterSet once, its queryset is the unfiltered queryset when no filter is applied
+        self.filterset = filterset_class(request.GET, queryset=queryset)
+
+        # Check if there are filter fields in the GET request,
+        # used to display the Reset filter button in the templates
+        self.has_filter = any(
+            field in request.GET for field in set(self.filterset.get_fields())
+        )
+
+        self.queryset = self.filterset.qs
+        self.paginator = CursorPaginator(self.queryset, per_page or settings.PAGE_SIZE)
+
+    @property
+    def form(self):
+        return self.filterset.form
+
+    def page(self, cursor=None):
+        """
+        Returns the page following the given cursor, or the first page if no cursor is given.
+        Raises InvalidCursor if the cursor cannot be decoded.
+        """
+
+        return self.paginator.page(cursor)
+
+    def count(self):
+        """
+        Returns the total number of objects matching the filters.
+        Counted once per pipeline, and cached across requests for LIST_COUNT_CACHE_TIMEOUT seconds if it is set.
+        The cached count is versioned by the model, so it is invalidated as soon as one of its objects changes.
+        """
+
+        if not hasattr(self, "_count"):
+            timeout = getattr(settings, "LIST_COUNT_CACHE_TIMEOUT", None)
+            try:
+                if timeout:
+                    # The SQL of the filtered queryset identifies the result set, including the filter values
+                    self._count = cache_utils.get_or_set(
+                        self._get_cache_namespaces(),
+                        ["list-count", self.queryset.query],
+                        self.queryset.count,
+                        timeout,
+                    )
+                else:
+                    self._count = self.queryset.count()
+            except EmptyResultSet:
+                # Nothing can match (e.g. a nearby search without candidates), and the SQL cannot be built
+                self._count = 0
+        return self._count
+
+    def _get_cache_namespaces(self):
+        # The filters on genres, skills and types depend on the related models too
+        model = self.queryset.model
+        related_models = {
+            field.related_model
+            for field in model._meta.get_fields()
+            if field.is_relation and field.related_model and not field.auto_created
+        }
+        return [cache_utils.get_namespace(model)] + sorted(
+            cache_utils.get_namespace(related) for related in related_models
+        )
+
+    def get_bookmark_context(self, page):
+        """
+        Returns the bookmark context for the objects on the given page only.
+        """
+
+        return BookmarkMixin().get_bookmark_context(
+            self.request.user, page, model=self.queryset.model
+        )
@@ -0,0 +1,65 @@
+import base64
+from email.mime.base import MIMEBase
+
+from django.core.mail import EmailMultiAlternatives
+
+
+def serialize_email(message):
+    """
+    Returns an email message as a JSON serializable dict, to be stored and sent later (see mailer).
+    Attachments given as MIME objects are not supported.
+    """
+
+    attachments = []
+    for attachment in message.attachments:
+        if isinstance(attachment, MIMEBase):
+            raise ValueError("Emails with MIME attachments cannot be serialized")
+        filename, content, mimetype = attachment
+        # Binary contents are stored in base64
+        if isinstance(content, bytes):
+            attachments.append(
+                [filename, base64.b64encode(content).decode(), mimetype, True]
+            )
+        else:
+            attachments.append([filename, content, mimetype, False])
+
+    return {
+        "subject": message.subject,
+        "body": message.body,
+        "from_email": message.from_email,
+        "to": message.to,
+        "cc": message.cc,
+        "bcc": message.bcc,
+        "reply_to": message.reply_to,
+        "headers": message.extra_headers,
+        "content_subtype": message.content_subtype,
+        "alternatives": [
+            list(alternative) for alternative in getattr(message, "alternatives", [])
+        ],
+        "attachments": attachments,
+    }
+
+
+def deserialize_email(data, connection=None):
+    """
+    Returns the email message of a dict built by serialize_email(), sent through the given connection
+    """
+
+    message = EmailMultiAlternatives(
+        subject=data["subject"],
+        body=data["body"],
+        from_email=data["from_email"],
+        to=data["to"],
+        cc=data["cc"],
+        bcc=data["bcc"],
+        reply_to=data["reply_to"],
+        headers=data["headers"],
+        alternatives=[tuple(alternative) for alternative in data["alternatives"]],
+        connection=connection,
+    )
+    message.content_subtype = data["content_subtype"]
+    for filename, content, mimetype, encoded in data.get("attachments", []):
+        if encoded:
+            content = base64.b64decode(content)
+        message.attach(filename, content, mimetype)
+    return message
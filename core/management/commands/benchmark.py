@@ -0,0 +1,282 @@
+import json
+import math
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from openmics.models import OpenMic
+from profiles.models import Profile
+
+# Endpoints driven by the benchmark: name, URL name, URL keyword arguments (keys of the benchmark context),
+# whether they need a logged in user, and whether they are requested as HTMX partials
+ENDPOINTS = [
+    ("profile_list", "profiles:profile_list", {}, False, False),
+    ("get_profiles", "profiles:get_profiles", {}, False, True),
+    ("advertisement_list", "advertisements:advertisement_list", {}, False, False),
+    ("openmic_list", "openmics:openmic_list", {}, False, False),
+    ("openmic_detail", "openmics:openmic_detail", {"pk": "openmic"}, False, False),
+    ("inbox", "inbox:inbox", {}, True, False),
+    (
+        "inbox_detail",
+        "inbox:inbox_detail",
+        {"conversation_pk": "conversation"},
+        True,
+        False,
+    ),
+    ("notify_inbox", "inbox:notify_inbox", {}, True, True),
+    ("bookmark_profile_list", "bookmarks:bookmark_profile_list", {}, True, False),
+    (
+        "bookmark_advertisement_list",
+        "bookmarks:bookmark_advertisement_list",
+        {},
+        True,
+        False,
+    ),
+    ("bookmark_openmic_list", "bookmarks:bookmark_openmic_list", {}, True, False),
+]
+
+
+def percentile(values, percent):
+    """
+    Returns the nearest rank percentile of the values
+    """
+    values = sorted(values)
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting the queries run
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the hot endpoints through the test client, reporting their p50/p95 latency, "
+        "query count and response size, and fails on regressions against a JSON baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "endpoints",
+            nargs="*",
+            help="Names of the endpoints to benchmark, all of them by default",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Number of measured requests"
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=2,
+            help="Number of requests before the measured ones, filling the caches",
+        )
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1,
+            help="Scale of the dataset generated when the database has no profiles",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the generated dataset"
+        )
+        parser.add_argument(
+            "--generate",
+            action="store_true",
+            help="Generate a dataset even if the database already has profiles",
+        )
+        parser.add_argument("--output", help="Writes the results to this JSON file")
+        parser.add_argument(
+            "--baseline", help="Compares the results to this JSON file of results"
+        )
+        parser.add_argument(
+            "--latency-tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed p95 latency increase over the baseline, as a fraction",
+        )
+        parser.add_argument(
+            "--min-latency-regression",
+            type=float,
+            default=2,
+            help="p95 latency increase (ms) below which a latency change is noise",
+        )
+        parser.add_argument(
+            "--query-tolerance",
+            type=int,
+            default=0,
+            help="Allowed number of additional queries over the baseline",
+        )
+        parser.add_argument(
+            "--bytes-tolerance",
+            type=float,
+            default=0.1,
+            help="Allowed response size increase over the baseline, as a fraction",
+        )
+
+    def handle(self, *args, **options):
+        endpoints = [
+            endpoint
+            for endpoint in ENDPOINTS
+            if not options["endpoints"] or endpoint[0] in options["endpoints"]
+        ]
+        unknown = set(options["endpoints"]) - {endpoint[0] for endpoint in ENDPOINTS}
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+        if options["generate"] or not Profile.objects.exists():
+            call_command(
+                "generate_dataset",
+                scale=options["scale"],
+                seed=options["seed"],
+                stdout=self.stdout,
+            )
+
+        context = self.get_context()
+        client = Client()
+        client.force_login(context["profile"].user)
+
+        results = {}
+        # The test client requests the "testserver" host
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for name, url_name, kwargs, login, htmx in endpoints:
+                url = reverse(
+                    url_name,
+                    kwargs={key: context[value] for key, value in kwargs.items()},
+                )
+                headers = {"HX-Request": "true"} if htmx else {}
+                results[name] = self.measure(
+                    client if login else Client(), url, headers, options
+                )
+
+        self.write_results(results)
+        report = {
+            "metadata": {
+                "database": connection.vendor,
+                "profiles": Profile.objects.count(),
+                "repeat": options["repeat"],
+            },
+            "endpoints": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Wrote the results to {options['output']}")
+
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)
+            regressions = self.compare(results, baseline["endpoints"], options)
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(regression)
+                raise CommandError(
+                    f"{len(regressions)} regressions against {options['baseline']}"
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
+
+    def get_context(self):
+        """
+        Returns the user and objects the endpoints are requested with:
+        the profile with the most conversations, one of its conversations and an open mic.
+        """
+        profile = (
+            Profile.objects.annotate(conversation_count=Count("conversations"))
+            .select_related("user")
+            .order_by("-conversation_count", "pk")
+            .first()
+        )
+        openmic = OpenMic.objects.order_by("pk").first()
+        conversation = profile and profile.conversations.order_by("pk").first()
+        if conversation is None or openmic is None:
+            raise CommandError(
+                "The database needs a profile with a conversation and an open mic, "
+                "run it with --generate"
+            )
+        return {
+            "profile": profile,
+            "conversation": conversation.pk,
+            "openmic": openmic.pk,
+        }
+
+    def measure(self, client, url, headers, options):
+        """
+        Requests the URL and returns its latency percentiles (ms), query count and response size (bytes)
+        """
+        for _ in range(options["warmup"]):
+            client.get(url, headers=headers)
+
+        durations = []
+        queries = []
+        for _ in range(options["repeat"]):
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                start = time.perf_counter()
+                response = client.get(url, headers=headers)
+                durations.append((time.perf_counter() - start) * 1000)
+            queries.append(counter.count)
+
+            if response.status_code != 200:
+                raise CommandError(f"{url} returned a {response.status_code} response")
+
+        return {
+            "url": url,
+            "p50_ms": round(percentile(durations, 50), 2),
+            "p95_ms": round(percentile(durations, 95), 2),
+            "mean_ms": round(statistics.mean(durations), 2),
+            "queries": max(queries),
+            "bytes": len(response.content),
+        }
+
+    def write_results(self, results):
+        self.stdout.write(
+            f"{'endpoint':<30}{'p50':>10}{'p95':>10}{'queries':>9}{'bytes':>10}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<30}{result['p50_ms']:>7.2f} ms{result['p95_ms']:>7.2f} ms"
+                f"{result['queries']:>9}{result['bytes']:>10}"
+            )
+
+    def compare(self, results, baseline, options):
+        """
+        Returns the descriptions of the regressions of the results against the baseline
+        """
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            base = baseline[name]
+
+            latency_limit = max(
+                base["p95_ms"] * (1 + options["latency_tolerance"]),
+                base["p95_ms"] + options["min_latency_regression"],
+            )
+            if result["p95_ms"] > latency_limit:
+                regressions.append(
+                    f"{name}: p95 latency {result['p95_ms']:.2f} ms, baseline {base['p95_ms']:.2f} ms"
+                )
+            if result["queries"] > base["queries"] + options["query_tolerance"]:
+                regressions.append(
+                    f"{name}: {result['queries']} queries, baseline {base['queries']}"
+                )
+            if result["bytes"] > base["bytes"] * (1 + options["bytes_tolerance"]):
+                regressions.append(
+                    f"{name}: {result['bytes']} bytes, baseline {base['bytes']}"
+                )
+        return regressions
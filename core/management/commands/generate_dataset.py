@@ -0,0 +1,609 @@
+import csv
+import io
+import json
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+
+from cities_light.models import City
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+from faker import Faker
+
+from advertisements.models import AdType, Advertisement
+from advertisements.models import Comment as AdvertisementComment
+from bookmarks.models import Bookmark
+from core.cache_utils import bump_version, get_namespace
+from core.signals import CACHED_MODELS
+from inbox.models import Conversation, ConversationMembership, InboxMessage
+from openmics.models import Comment as OpenMicComment
+from openmics.models import OpenMic
+from profiles.models import Genre, Profile, ProfileType, Skill
+
+# Number of objects generated at scale 1, multiplied by the --scale option
+BASE_COUNTS = {
+    "profiles": 1000,
+    "advertisements": 1500,
+    "openmics": 200,
+    "conversations": 2000,
+    "messages": 20000,
+    "bookmarks": 5000,
+    "comments": 3000,
+}
+
+# Number of distinct values of each kind of generated text, picked at random for every object
+POOL_SIZE = 500
+
+# Days in the past the generated objects are created over
+DATA_SPAN_DAYS = 365
+
+
+def batched(iterable, size):
+    """
+    Yields lists of at most `size` items of the iterable
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+@contextmanager
+def keep_dates(*models):
+    """
+    Disables auto_now and auto_now_add on the date fields of the models,
+    so the generated objects keep the creation and update dates they are given.
+    """
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class BulkWriter:
+    """
+    Inserts unsaved model instances in batches: with COPY on PostgreSQL, with bulk_create on the other databases.
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.use_copy = connection.vendor == "postgresql"
+
+    def insert(self, model, objs):
+        """
+        Inserts the objects, returns the number of objects inserted
+        """
+        count = 0
+        for batch in batched(objs, self.batch_size):
+            if self.use_copy:
+                self.copy(model, batch)
+            else:
+                model._default_manager.bulk_create(batch)
+            count += len(batch)
+        return count
+
+    def insert_returning_ids(self, model, objs):
+        """
+        Inserts the objects, returns the primary keys of the inserted rows in insertion order.
+        COPY does not return the generated keys, they are read back as the keys above the previous maximum.
+        """
+        last_pk = model._default_manager.aggregate(last_pk=Max("pk"))["last_pk"] or 0
+        self.insert(model, objs)
+        return list(
+            model._default_manager.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+    def copy(self, model, objs):
+        fields = [
+            field
+            for field in model._meta.local_concrete_fields
+            if field is not model._meta.auto_field
+        ]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for obj in objs:
+            writer.writerow(
+                [
+                    self.format_value(
+                        field.get_db_prep_save(field.pre_save(obj, True), connection)
+                    )
+                    for field in fields
+                ]
+            )
+        buffer.seek(0)
+
+        quote_name = connection.ops.quote_name
+        columns = ", ".join(quote_name(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.cursor.copy_expert(
+                f"COPY {quote_name(model._meta.db_table)} ({columns}) "
+                f"FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer,
+            )
+
+    @staticmethod
+    def format_value(value):
+        if value is None:
+            return "\\N"
+        if isinstance(value, bool):
+            return "t" if value else "f"
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        if hasattr(value, "adapted"):
+            # JSON values are wrapped for psycopg2, COPY takes their plain JSON text
+            return json.dumps(value.adapted)
+        return str(value)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a large synthetic dataset (profiles, advertisements, open mics, conversations, messages, "
+        "bookmarks and comments) for load testing, reproducible from its seed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1,
+            help="Multiplies the number of generated objects, 1 generates 1000 profiles",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the generated values"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=5000, help="Number of rows per insert"
+        )
+        parser.add_argument(
+            "--password",
+            default="password123",
+            help="Password of every generated user",
+        )
+        parser.add_argument(
+            "--skip-search-index",
+            action="store_true",
+            help="Do not rebuild the search index after generating the data",
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.fake = Faker()
+        self.fake.seed_instance(options["seed"])
+        self.writer = BulkWriter(options["batch_size"])
+        self.password = options["password"]
+        self.now = timezone.now()
+        counts = {
+            name: max(1, round(count * options["scale"]))
+            for name, count in BASE_COUNTS.items()
+        }
+
+        # The genres, skills and types are needed by the generated objects
+        if not Genre.objects.exists() or not AdType.objects.exists():
+            call_command("populate_filter_values", stdout=self.stdout)
+        self.profile_type_ids = list(
+            ProfileType.objects.order_by("pk").values_list("pk", flat=True)
+        )
+        self.ad_type_ids = list(
+            AdType.objects.order_by("pk").values_list("pk", flat=True)
+        )
+        self.genre_ids = list(Genre.objects.order_by("pk").values_list("pk", flat=True))
+        self.skill_ids = list(Skill.objects.order_by("pk").values_list("pk", flat=True))
+        self.city_ids = list(
+            City.objects.order_by("pk").values_list("pk", flat=True)
+        ) or [None]
+        self.build_pools()
+
+        with keep_dates(
+            get_user_model(),
+            Profile,
+            Advertisement,
+            OpenMic,
+            AdvertisementComment,
+            OpenMicComment,
+            Bookmark,
+            InboxMessage,
+        ):
+            steps = [
+                ("profiles", lambda: self.generate_profiles(counts["profiles"])),
+                (
+                    "advertisements",
+                    lambda: self.generate_advertisements(counts["advertisements"]),
+                ),
+                ("open mics", lambda: self.generate_openmics(counts["openmics"])),
+                ("comments", lambda: self.generate_comments(counts["comments"])),
+                (
+                    "conversations and messages",
+                    lambda: self.generate_conversations(
+                        counts["conversations"], counts["messages"]
+                    ),
+                ),
+                ("bookmarks", lambda: self.generate_bookmarks(counts["bookmarks"])),
+            ]
+            for name, generate in steps:
+                start = time.perf_counter()
+                generate()
+                self.stdout.write(
+                    f"Generated {name} in {time.perf_counter() - start:.1f} s"
+                )
+
+        if not options["skip_search_index"]:
+            call_command("rebuild_search_index", stdout=self.stdout)
+
+        # The rows were inserted without signals, invalidate the cached lists, counts and pages
+        for model in CACHED_MODELS:
+            bump_version(get_namespace(model))
+
+        self.stdout.write(self.style.SUCCESS("Successfully generated the dataset"))
+
+    def build_pools(self):
+        """
+        Generates the pools of names and texts picked from, since generating a value per object is slow
+        """
+        fake = self.fake
+        self.first_names = [fake.first_name() for _ in range(POOL_SIZE)]
+        self.last_names = [fake.last_name() for _ in range(POOL_SIZE)]
+        self.paragraphs = [fake.paragraph(nb_sentences=5) for _ in range(POOL_SIZE)]
+        self.titles = [fake.sentence(nb_words=6)[:100] for _ in range(POOL_SIZE)]
+        self.sentences = [fake.sentence(nb_words=10)[:150] for _ in range(POOL_SIZE)]
+        self.addresses = [fake.address() for _ in range(POOL_SIZE)]
+
+    def random_datetime(self, after=None):
+        """
+        Returns a random datetime between `after` (by default DATA_SPAN_DAYS ago) and now
+        """
+        start = after or self.now - timedelta(days=DATA_SPAN_DAYS)
+        span = (self.now - start).total_seconds()
+        return start + timedelta(seconds=self.random.random() * span)
+
+    def sample(self, ids, low, high):
+        return self.random.sample(ids, min(len(ids), self.random.randint(low, high)))
+
+    def allocate(self, base, taken, counters):
+        """
+        Returns the base, or the base followed by the first free "-N" suffix, like Profile.save
+        """
+        suffix = counters.get(base, 0)
+        value = f"{base}-{suffix}" if suffix else base
+        while value in taken:
+            suffix += 1
+            value = f"{base}-{suffix}"
+        counters[base] = suffix + 1
+        taken.add(value)
+        return value
+
+    def generate_profiles(self, count):
+        User = get_user_model()
+        # A single hash for every user, hashing a password per user takes most of the time otherwise
+        password = make_password(self.password)
+        usernames = set(User.objects.values_list("username", flat=True))
+        slugs = set(Profile.objects.values_list("slug", flat=True))
+        username_counters, slug_counters = {}, {}
+
+        profiles = []
+        for _ in range(count):
+            display_name = (
+                f"{self.random.choice(self.first_names)} "
+                f"{self.random.choice(self.last_names)}"
+            )
+            base = slugify(display_name)
+            created = self.random_datetime()
+            profiles.append(
+                {
+                    "display_name": display_name,
+                    "username": self.allocate(base, usernames, username_counters),
+                    "slug": self.allocate(base, slugs, slug_counters),
+                    "created": created,
+                    "last_updated": self.random_datetime(created),
+                    # Most users logged in during the last weeks, used by the last login filter
+                    "last_login": (
+                        self.random_datetime(self.now - timedelta(weeks=8))
+                        if self.random.random() < 0.7
+                        else None
+                    ),
+                }
+            )
+
+        user_ids = self.writer.insert_returning_ids(
+            User,
+            (
+                User(
+                    username=profile["username"],
+                    email=f"{profile['username']}@example.com",
+                    password=password,
+                    date_joined=profile["created"],
+                    last_login=profile["last_login"],
+                )
+                for profile in profiles
+            ),
+        )
+        self.profile_ids = self.writer.insert_returning_ids(
+            Profile,
+            (
+                Profile(
+                    user_id=user_id,
+                    display_name=profile["display_name"],
+                    slug=profile["slug"],
+                    profile_type_id=self.random.choice(self.profile_type_ids),
+                    location_id=self.random.choice(self.city_ids),
+                    bio=self.random.choice(self.paragraphs),
+                    influences=self.random.choice(self.sentences),
+                    created=profile["created"],
+                    last_updated=profile["last_updated"],
+                )
+                for user_id, profile in zip(user_ids, profiles)
+            ),
+        )
+        self.generate_relations(Profile, self.profile_ids)
+
+    def generate_relations(self, model, ids):
+        """
+        Inserts the genres and skills of the objects directly in the through tables of the relations
+        """
+        for name, related_ids in [
+            ("genres", self.genre_ids),
+            ("skills", self.skill_ids),
+        ]:
+            if not hasattr(model, name):
+                continue
+            relation = getattr(model, name)
+            through = relation.through
+            source = relation.field.m2m_field_name()
+            target = relation.field.m2m_reverse_field_name()
+            self.writer.insert(
+                through,
+                (
+                    through(**{f"{source}_id": pk, f"{target}_id": related_id})
+                    for pk in ids
+                    for related_id in self.sample(related_ids, 1, 3)
+                ),
+            )
+
+    def generate_advertisements(self, count):
+        def advertisements():
+            for _ in range(count):
+                created = self.random_datetime()
+                yield Advertisement(
+                    title=self.random.choice(self.titles),
+                    ad_type_id=self.random.choice(self.ad_type_ids),
+                    description=self.random.choice(self.paragraphs),
+                    author_id=self.random.choice(self.profile_ids),
+                    location_id=self.random.choice(self.city_ids),
+                    created=created,
+                    last_updated=self.random_datetime(created),
+                )
+
+        self.advertisement_ids = self.writer.insert_returning_ids(
+            Advertisement, advertisements()
+        )
+        self.generate_relations(Advertisement, self.advertisement_ids)
+
+    def generate_openmics(self, count):
+        def openmics():
+            for _ in range(count):
+                created = self.random_datetime()
+                # Past and upcoming events
+                event_date = (
+                    self.now + timedelta(days=self.random.randint(-180, 180))
+                ).date()
+                start_hour = self.random.randint(12, 21)
+                # Venue anywhere on the inhabited latitudes
+                latitude = self.random.uniform(-55, 70)
+                longitude = self.random.uniform(-180, 180)
+                openmic = OpenMic(
+                    title=self.random.choice(self.titles),
+                    description=self.random.choice(self.paragraphs),
+                    author_id=self.random.choice(self.profile_ids),
+                    location_id=self.random.choice(self.city_ids),
+                    address=self.random.choice(self.addresses),
+                    google_maps_link=f"https://www.google.com/maps/@{latitude:.6f},{longitude:.6f},15z",
+                    event_date=event_date,
+                    start_time=f"{start_hour:02d}:00",
+                    end_time=f"{start_hour + 2:02d}:00",
+                    entry_fee_currency="USD",
+                    entry_fee=Decimal(self.random.choice([0, 0, 5, 10, 15])),
+                    created=created,
+                    last_updated=self.random_datetime(created),
+                )
+                # Bulk inserts skip save(), which stores the coordinates and geo cell of the link
+                openmic.update_coordinates()
+                yield openmic
+
+        self.openmic_ids = self.writer.insert_returning_ids(OpenMic, openmics())
+        self.generate_relations(OpenMic, self.openmic_ids)
+
+    def generate_comments(self, count):
+        # Half of the comments on advertisements, the other half on open mics
+        self.writer.insert(
+            AdvertisementComment,
+            (
+                AdvertisementComment(
+                    author_id=self.random.choice(self.profile_ids),
+                    parent_advertisement_id=self.random.choice(self.advertisement_ids),
+                    body=self.random.choice(self.sentences),
+                    created=self.random_datetime(),
+                )
+                for _ in range(count - count // 2)
+            ),
+        )
+        self.writer.insert(
+            OpenMicComment,
+            (
+                OpenMicComment(
+                    author_id=self.random.choice(self.profile_ids),
+                    parent_openmic_id=self.random.choice(self.openmic_ids),
+                    body=self.random.choice(self.sentences),
+                    created=self.random_datetime(),
+                )
+                for _ in range(count // 2)
+            ),
+        )
+
+    def generate_conversations(self, count, message_count):
+        """
+        Generates one to one conversations with their messages, participants and read state,
+        as maintained by the inbox signals for conversations created through the views.
+        """
+        pairs = set()
+        max_pairs = len(self.profile_ids) * (len(self.profile_ids) - 1) // 2
+        while len(pairs) < min(count, max_pairs):
+            pairs.add(tuple(sorted(self.random.sample(self.profile_ids, 2))))
+        pairs = sorted(pairs)
+
+        participants = Conversation.participants.through
+        for offset, batch in enumerate(batched(pairs, self.writer.batch_size)):
+            first = offset * self.writer.batch_size
+            plans = [
+                self.plan_conversation(
+                    pair,
+                    message_count // len(pairs)
+                    + (1 if first + i < message_count % len(pairs) else 0),
+                )
+                for i, pair in enumerate(batch)
+            ]
+
+            conversation_ids = self.writer.insert_returning_ids(
+                Conversation,
+                (
+                    Conversation(
+                        pair_key=Conversation.make_pair_key(*plan["pair"]),
+                        lastmessage_created=plan["last_message"],
+                        is_seen=not plan["unread_count"],
+                    )
+                    for plan in plans
+                ),
+            )
+            self.writer.insert(
+                participants,
+                (
+                    participants(conversation_id=conversation_id, profile_id=profile_id)
+                    for conversation_id, plan in zip(conversation_ids, plans)
+                    for profile_id in plan["pair"]
+                ),
+            )
+            self.writer.insert(
+                ConversationMembership,
+                (
+                    ConversationMembership(
+                        conversation_id=conversation_id,
+                        profile_id=profile_id,
+                        **plan["read_state"][profile_id],
+                    )
+                    for conversation_id, plan in zip(conversation_ids, plans)
+                    for profile_id in plan["pair"]
+                ),
+            )
+            self.writer.insert(
+                InboxMessage,
+                (
+                    InboxMessage(
+                        conversation_id=conversation_id,
+                        sender_id=sender_id,
+                        body=self.random.choice(self.sentences),
+                        created=created,
+                    )
+                    for conversation_id, plan in zip(conversation_ids, plans)
+                    for sender_id, created in plan["messages"]
+                ),
+            )
+
+    def plan_conversation(self, pair, message_count):
+        """
+        Returns the messages of a conversation between a pair of profiles, and the read state of both profiles.
+        Some conversations end with messages the recipient has not read yet.
+        """
+        created = self.random_datetime()
+        messages = []
+        for _ in range(message_count):
+            messages.append((self.random.choice(pair), created))
+            created += timedelta(minutes=self.random.randint(1, 600))
+        last_message = messages[-1][1] if messages else created
+
+        read_state = {
+            profile_id: {"last_read_at": last_message, "unread_count": 0}
+            for profile_id in pair
+        }
+        unread_count = 0
+        if messages and self.random.random() < 0.3:
+            # The messages sent since the recipient last replied are unread
+            sender_id = messages[-1][0]
+            recipient_id = pair[1] if sender_id == pair[0] else pair[0]
+            while (
+                unread_count < len(messages)
+                and messages[-1 - unread_count][0] == sender_id
+            ):
+                unread_count += 1
+            read_state[recipient_id] = {
+                "last_read_at": (
+                    messages[-1 - unread_count][1]
+                    if unread_count < len(messages)
+                    else None
+                ),
+                "unread_count": unread_count,
+            }
+
+        return {
+            "pair": pair,
+            "messages": messages,
+            "last_message": last_message,
+            "read_state": read_state,
+            "unread_count": unread_count,
+        }
+
+    def generate_bookmarks(self, count):
+        content_types = [
+            (ContentType.objects.get_for_model(model), ids)
+            for model, ids in [
+                (Profile, self.profile_ids),
+                (Advertisement, self.advertisement_ids),
+                (OpenMic, self.openmic_ids),
+            ]
+        ]
+        max_bookmarks = len(self.profile_ids) * sum(
+            len(ids) for _, ids in content_types
+        )
+
+        # A profile bookmarks an object at most once
+        bookmarks = set()
+        while len(bookmarks) < min(count, max_bookmarks):
+            content_type, ids = self.random.choice(content_types)
+            bookmarks.add(
+                (
+                    self.random.choice(self.profile_ids),
+                    content_type.pk,
+                    self.random.choice(ids),
+                )
+            )
+
+        self.writer.insert(
+            Bookmark,
+            (
+                Bookmark(
+                    profile_id=profile_id,
+                    content_type_id=content_type_id,
+                    object_id=object_id,
+                    created=self.random_datetime(),
+                )
+                for profile_id, content_type_id, object_id in sorted(bookmarks)
+            ),
+        )
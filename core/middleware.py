@@ -0,0 +1,76 @@
+import json
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .instrumentation import instrument_templates, start_metrics, stop_metrics
+
+logger = logging.getLogger("core.instrumentation")
+
+
+class InstrumentationMiddleware:
+    """
+    Middleware recording the performance of each request: number and time of the SQL queries,
+    template render time and total time.
+
+    The metrics are sent in a Server-Timing header (if INSTRUMENTATION_SERVER_TIMING is set, they show in the
+    browser developer tools) and logged as JSON on the "core.instrumentation" logger, HTMX partial requests
+    being tagged separately. Requests slower than INSTRUMENTATION_SLOW_REQUEST_MS are logged as warnings
+    with their slowest queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_templates()
+
+    def __call__(self, request):
+        metrics, token = start_metrics()
+        try:
+            # Record the queries of every database connection
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            stop_metrics(metrics, token)
+
+        if getattr(settings, "INSTRUMENTATION_SERVER_TIMING", False):
+            response.headers["Server-Timing"] = self.get_server_timing(metrics)
+        self.log(request, response, metrics)
+        return response
+
+    def get_server_timing(self, metrics):
+        return ", ".join(
+            [
+                f'db;dur={metrics.query_time * 1000:.1f};desc="{metrics.query_count} queries"',
+                f"tpl;dur={metrics.template_time * 1000:.1f}",
+                f"total;dur={metrics.total_time * 1000:.1f}",
+            ]
+        )
+
+    def log(self, request, response, metrics):
+        data = {
+            "method": request.method,
+            "path": request.path,
+            "view": getattr(request.resolver_match, "view_name", None),
+            "status": response.status_code,
+            # HTMX requests render partials, they are measured apart from the full pages
+            "kind": "htmx" if request.headers.get("HX-Request") else "page",
+            "total_ms": round(metrics.total_time * 1000, 1),
+            "db_ms": round(metrics.query_time * 1000, 1),
+            "queries": metrics.query_count,
+            "template_ms": round(metrics.template_time * 1000, 1),
+        }
+
+        slow_request_ms = getattr(settings, "INSTRUMENTATION_SLOW_REQUEST_MS", None)
+        if slow_request_ms is not None and data["total_ms"] >= slow_request_ms:
+            top_queries = getattr(settings, "INSTRUMENTATION_TOP_QUERIES", 5)
+            data["top_queries"] = [
+                {"sql": sql[:1000], "ms": round(duration * 1000, 1)}
+                for sql, duration in metrics.top_queries(top_queries)
+            ]
+            logger.warning(json.dumps(data), extra={"performance": data})
+        else:
+            logger.info(json.dumps(data), extra={"performance": data})
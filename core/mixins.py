@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from core import cache_utils
+
+
+class CachedObjectMixin:
+    """
+    Mixin for detail views caching the object they display for DETAIL_CACHE_TIMEOUT seconds.
+    The cached object is versioned by its model and the models listed in `cache_dependencies`,
+    so it is invalidated as soon as one of their objects changes.
+    The queryset of the view should load everything the page renders (e.g. with select_related and prefetch_related),
+    since only the object itself is cached.
+    """
+
+    # Models rendered with the object, whose changes also invalidate the cached object
+    cache_dependencies = []
+
+    def get_object(self, queryset=None):
+        timeout = getattr(settings, "DETAIL_CACHE_TIMEOUT", None)
+        if not timeout or queryset is not None:
+            return super().get_object(queryset)
+
+        # The URL keyword arguments (pk or slug) identify the object
+        namespaces = [cache_utils.get_namespace(self.get_queryset().model)] + [
+            cache_utils.get_namespace(model) for model in self.cache_dependencies
+        ]
+        key = cache_utils.make_key(namespaces, "detail", sorted(self.kwargs.items()))
+
+        obj = cache.get(key)
+        if obj is None:
+            # Raises Http404 when the object does not exist, which is not cached
+            obj = super().get_object()
+            cache.set(key, obj, timeout)
+        return obj
@@ -0,0 +1,235 @@
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import uuid
+from collections.abc import Sequence
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import F, Q
+
+
+class InvalidCursor(InvalidPage):
+    """
+    Raised when a cursor cannot be decoded or does not match the paginator ordering.
+    """
+
+    pass
+
+
+class CursorEncoder(json.JSONEncoder):
+    """
+    JSON encoder for cursor values.
+    Unlike DjangoJSONEncoder it keeps full microsecond precision on datetimes,
+    otherwise rows created within the same millisecond could be skipped.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+            return o.isoformat()
+        if isinstance(o, (decimal.Decimal, uuid.UUID)):
+            return str(o)
+        return super().default(o)
+
+
+class CursorPage(Sequence):
+    """
+    A single page of results returned by CursorPaginator.
+    Mirrors the parts of django.core.paginator.Page used by the list templates.
+    """
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __repr__(self):
+        return f"<CursorPage next_cursor={self.next_cursor!r}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class CursorPaginator:
+    """
+    Keyset (cursor) paginator for infinite scrolling lists.
+
+    Instead of an OFFSET and a COUNT(*), each page is fetched with a WHERE clause on the
+    sort key of the last row from the previous page, so every page costs the same.
+    The primary key is always appended to the ordering as a tie-breaker.
+    Nullable sort keys are ordered with NULLs last on every database backend.
+    """
+
+    def __init__(self, queryset, per_page, ordering=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+
+        # Fall back to the ordering of the queryset (or the model Meta) if none is given
+        ordering = list(
+            ordering or queryset.query.order_by or queryset.model._meta.ordering
+        )
+        self.keys = self._get_keys(ordering)
+
+    def _get_keys(self, ordering):
+        """
+        Returns a list of (name, descending, nullable) tuples describing the sort key.
+        """
+
+        keys = []
+        for expression in ordering:
+            if not isinstance(expression, str) or expression == "?":
+                raise ValueError(
+                    f"CursorPaginator only supports field name ordering, got {expression!r}."
+                )
+            descending = expression.startswith("-")
+            name = expression.lstrip("-")
+            keys.append((name, descending, self._is_nullable(name)))
+
+        # Append the primary key as a tie-breaker, following the direction of the first key
+        pk_name = self.queryset.model._meta.pk.name
+        if not any(name in ("pk", pk_name) for name, _, _ in keys):
+            descending = keys[0][1] if keys else False
+            keys.append(("pk", descending, False))
+
+        return keys
+
+    def _get_field_path(self, name):
+        """
+        Returns the chain of model fields followed by a (possibly related) lookup path.
+        Returns an empty list for annotations, which are not model fields.
+        """
+
+        if name in self.queryset.query.annotations:
+            return []
+
+        model = self.queryset.model
+        fields = []
+        for part in name.split("__"):
+            field = model._meta.pk if part == "pk" else model._meta.get_field(part)
+            fields.append(field)
+            if field.is_relation:
+                model = field.related_model
+        return fields
+
+    def _is_nullable(self, name):
+        return any(field.null for field in self._get_field_path(name))
+
+    def _get_order_by(self):
+        order_by = []
+        for name, descending, nullable in self.keys:
+            if nullable:
+                # Make NULL placement explicit so the cursor filter matches the ordering
+                expression = F(name)
+                order_by.append(
+                    expression.desc(nulls_last=True)
+                    if descending
+                    else expression.asc(nulls_last=True)
+                )
+            else:
+                order_by.append(f"-{name}" if descending else name)
+        return order_by
+
+    def _cursor_attribute(self, index, name):
+        """
+        Returns the attribute holding the value of a sort key on a fetched row.
+        Keys that span relations are annotated onto the rows so no extra query is needed.
+        """
+
+        if "__" in name:
+            return f"_cursor_{index}"
+        return name
+
+    def encode_cursor(self, obj):
+        """
+        Encodes the sort key of the given object into an opaque, URL safe cursor.
+        """
+
+        values = [
+            getattr(obj, self._cursor_attribute(index, name))
+            for index, (name, _, _) in enumerate(self.keys)
+        ]
+        payload = json.dumps(values, cls=CursorEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        """
+        Decodes a cursor produced by encode_cursor back into a list of sort key values.
+        """
+
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        except (ValueError, TypeError, binascii.Error):
+            raise InvalidCursor("Invalid cursor.")
+
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            raise InvalidCursor("Cursor does not match the list ordering.")
+
+        decoded = []
+        for (name, _, _), value in zip(self.keys, values):
+            fields = self._get_field_path(name)
+            if value is not None and fields:
+                try:
+                    value = fields[-1].to_python(value)
+                except (ValidationError, TypeError, ValueError):
+                    raise InvalidCursor("Invalid cursor value.")
+            decoded.append(value)
+        return decoded
+
+    def _after(self, values):
+        """
+        Builds the keyset condition selecting rows that sort after the given position.
+        """
+
+        condition = Q()
+        equal = Q()
+        for (name, descending, nullable), value in zip(self.keys, values):
+            if value is None:
+                # NULLs sort last, so no row can come strictly after a NULL on this key
+                following = None
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                following = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+                if nullable:
+                    following |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+
+            if following is not None:
+                condition |= equal & following
+            equal &= same
+        return condition
+
+    def page(self, cursor=None):
+        """
+        Returns the page of results following the given cursor, or the first page if no cursor is given.
+        Runs exactly one query and never counts the rows.
+        """
+
+        queryset = self.queryset.order_by(*self._get_order_by())
+
+        # Annotate values of keys spanning relations so they can be read from the fetched rows
+        annotations = {
+            self._cursor_attribute(index, name): F(name)
+            for index, (name, _, _) in enumerate(self.keys)
+            if "__" in name
+        }
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode_cursor(cursor)))
+
+        # Fetch one extra row to find out if there is a next page
+        rows = list(queryset[: self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        next_cursor = self.encode_cursor(rows[-1]) if has_next else None
+        return CursorPage(rows, next_cursor)
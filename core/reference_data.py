@@ -0,0 +1,140 @@
+import threading
+
+from django import forms
+from django.forms.models import ModelChoiceIterator
+
+from core import cache_utils
+
+
+class ReferenceDataRegistry:
+    """
+    Registry of the small reference data tables (profile types, ad types, genres, skills).
+
+    The objects of a registered model are loaded lazily, in a single query, the first time they are needed,
+    then served from the memory of the process. They are reloaded when the cache version of the model
+    changes, which core.signals bumps whenever one of its objects is saved or deleted.
+    """
+
+    def __init__(self):
+        self._models = []
+        self._objects = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def register(self, model):
+        """
+        Registers a reference data model, usable as a class decorator
+        """
+        if model not in self._models:
+            self._models.append(model)
+        return model
+
+    def is_registered(self, model):
+        return model in self._models
+
+    def get_models(self):
+        """
+        Returns the registered models
+        """
+        return list(self._models)
+
+    def get_objects(self, model):
+        """
+        Returns the list of every object of a registered model, loading it if it changed since it was last loaded
+        """
+        (version,) = cache_utils.get_versions([cache_utils.get_namespace(model)])
+        if self._versions.get(model) != version:
+            with self._lock:
+                if self._versions.get(model) != version:
+                    queryset = model._default_manager.all()
+                    if not queryset.ordered:
+                        queryset = queryset.order_by("pk")
+                    self._objects[model] = list(queryset)
+                    self._versions[model] = version
+        return self._objects[model]
+
+    def get_choices(self, model):
+        """
+        Returns the (id, label) choices of every object of a registered model
+        """
+        return [(obj.pk, str(obj)) for obj in self.get_objects(model)]
+
+    def get(self, model, pk):
+        """
+        Returns the object of a registered model with the given primary key, or None
+        """
+        for obj in self.get_objects(model):
+            if str(obj.pk) == str(pk):
+                return obj
+        return None
+
+    def clear(self):
+        """
+        Forgets every loaded object, they are loaded again on their next use
+        """
+        with self._lock:
+            self._objects.clear()
+            self._versions.clear()
+
+
+# The registry of the current process
+registry = ReferenceDataRegistry()
+
+
+def register(model):
+    """
+    Class decorator registering a reference data model in the registry
+    """
+    return registry.register(model)
+
+
+class ReferenceModelChoiceIterator(ModelChoiceIterator):
+    """
+    Choice iterator of the model choice fields of a registered model,
+    rendering the choices from the registry instead of querying the database.
+    Also handles the null choice of the django-filter fields.
+    """
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        if getattr(self.field, "null_label", None) is not None:
+            yield (self.field.null_value, self.field.null_label)
+        for obj in registry.get_objects(self.queryset.model):
+            yield self.choice(obj)
+
+    def __len__(self):
+        return (
+            len(registry.get_objects(self.queryset.model))
+            + (1 if self.field.empty_label is not None else 0)
+            + (1 if getattr(self.field, "null_label", None) is not None else 0)
+        )
+
+    def __bool__(self):
+        return len(self) > 0
+
+
+class ReferenceDataFormMixin:
+    """
+    Form mixin making the model choice fields of the registered models (e.g. genres, skills)
+    render their choices from the reference data registry.
+    Only the fields choosing among every object of the model are changed, a filtered queryset still queries the database.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            if (
+                isinstance(field, forms.ModelChoiceField)
+                and registry.is_registered(field.queryset.model)
+                and not field.queryset.query.has_filters()
+            ):
+                field.iterator = ReferenceModelChoiceIterator
+                # The widget got its choices from the default iterator when the field was copied
+                field.widget.choices = field.choices
+
+
+class ReferenceDataForm(ReferenceDataFormMixin, forms.Form):
+    """
+    Form of the FilterSets (set as their Meta.form), rendering the choices of the reference data from the registry
+    """
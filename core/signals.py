@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django_cleanup.signals import cleanup_pre_delete
+
+from advertisements.models import Advertisement
+from cities_light.models import City
+from bookmarks.models import Bookmark
+from core.cache_utils import bump_version, get_namespace
+from core.reference_data import registry
+from core.tasks import DeferredDeletionStorage
+from inbox.models import Conversation
+from openmics.models import OpenMic
+from profiles.models import Profile
+
+# Models whose cached lists, counts, choices and detail contexts are invalidated when one of them changes
+CACHED_MODELS = [
+    get_user_model(),
+    Profile,
+    Advertisement,
+    OpenMic,
+    Bookmark,
+    Conversation,
+    City,
+]
+
+# The reference data models (profile types, ad types, genres, skills) are registered in core.reference_data,
+# their objects held in memory are reloaded when their version is bumped
+CACHED_MODELS += [
+    model for model in registry.get_models() if model not in CACHED_MODELS
+]
+
+# Fields of the cached models whose changes alone do not invalidate their cache: the last login of the users
+# is saved on every login, and would otherwise clear the cached profile pages each time.
+# Pages displaying it show it as of when they were cached.
+UNCACHED_FIELDS = {
+    get_user_model(): {"last_login"},
+}
+
+# Many-to-many relations whose changes invalidate the cache of the model holding them
+CACHED_RELATIONS = [
+    Profile.genres.through,
+    Profile.skills.through,
+    Advertisement.genres.through,
+    Advertisement.skills.through,
+    OpenMic.genres.through,
+]
+
+
+def invalidate_model_cache(sender, update_fields=None, **kwargs):
+    """
+    Signal receiver that invalidates the cached values of a model when one of its objects is saved or deleted,
+    unless the save only updates fields which are not cached (see UNCACHED_FIELDS).
+    """
+    if update_fields and set(update_fields) <= UNCACHED_FIELDS.get(sender, set()):
+        return
+    bump_version(get_namespace(sender))
+
+
+def invalidate_relation_cache(sender, instance, action, model, **kwargs):
+    """
+    Signal receiver that invalidates the cached values of both related models when a many-to-many relation changes.
+    """
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_version(get_namespace(instance))
+        bump_version(get_namespace(model))
+
+
+for model in CACHED_MODELS:
+    post_save.connect(invalidate_model_cache, sender=model)
+    post_delete.connect(invalidate_model_cache, sender=model)
+
+for through in CACHED_RELATIONS:
+    m2m_changed.connect(invalidate_relation_cache, sender=through)
+
+
+def defer_file_deletion(sender, file, model_name, field_name, **kwargs):
+    """
+    Signal receiver that makes django-cleanup queue the deletion of the files of deleted or replaced uploads
+    as background jobs, instead of deleting them from the storage during the request.
+    """
+    file.storage = DeferredDeletionStorage(file.storage, model_name, field_name)
+
+
+cleanup_pre_delete.connect(defer_file_deletion)
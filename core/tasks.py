@@ -0,0 +1,35 @@
+from django.apps import apps
+
+from jobs.queue import job
+
+
+@job
+def delete_files(model_label, field_name, names):
+    """
+    Deletes files of a file field (e.g. "profiles.profile", "profile_picture") from the storage of the field.
+    Files already gone are ignored, so the job can be retried.
+    """
+
+    storage = apps.get_model(model_label)._meta.get_field(field_name).storage
+    for name in names:
+        storage.delete(name)
+
+
+class DeferredDeletionStorage:
+    """
+    Wraps the storage of a file field so deleting a file queues a `delete_files` job instead,
+    the other operations going to the wrapped storage.
+    Used for the files deleted by django-cleanup, which are otherwise deleted during the request
+    (a round trip to S3 per file).
+    """
+
+    def __init__(self, storage, model_label, field_name):
+        self.storage = storage
+        self.model_label = model_label
+        self.field_name = field_name
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+    def delete(self, name):
+        delete_files.delay(self.model_label, self.field_name, [name])
@@ -0,0 +1,50 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from core.images import FALLBACK_FORMAT
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(image, size, sizes=None, **attributes):
+    """
+    Renders an image with its derivatives (a core.images.DerivativeImage) as a <picture> element:
+    a WebP srcset for the browsers supporting it, a JPEG one otherwise, with the derivative of the given size
+    as `src`. `sizes` is the displayed width of the image the browser picks the derivative for,
+    the other keyword arguments are attributes of the <img> element.
+    Renders the original image until its derivatives are generated.
+
+    Usage: {% picture profile.profile_picture_image "avatar" sizes="40px" class="rounded-circle" alt="" %}
+    """
+
+    srcset = image.get_srcset(FALLBACK_FORMAT)
+    img_attributes = flatatt(
+        {
+            "src": image.get_url(size),
+            "srcset": srcset or None,
+            "sizes": sizes if srcset else None,
+            **attributes,
+        }
+    )
+
+    webp_srcset = image.get_srcset("webp")
+    if not webp_srcset:
+        return format_html("<img{}>", img_attributes)
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}"{}><img{}></picture>',
+        webp_srcset,
+        flatatt({"sizes": sizes}),
+        img_attributes,
+    )
+
+
+@register.simple_tag
+def picture_url(image, size, format=FALLBACK_FORMAT):
+    """
+    Returns the URL of the derivative of the given size and format of an image, e.g. for CSS backgrounds.
+    Returns the URL of the original image until its derivatives are generated.
+    """
+
+    return image.get_url(size, format)
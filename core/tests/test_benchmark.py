@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core.management.commands.benchmark import ENDPOINTS, percentile
+
+
+class BenchmarkCommandTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output = os.path.join(directory.name, "results.json")
+
+    def benchmark(self, *endpoints, **options):
+        call_command(
+            "benchmark",
+            *endpoints,
+            scale=0.01,
+            repeat=2,
+            warmup=1,
+            stdout=StringIO(),
+            stderr=StringIO(),
+            **options,
+        )
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile([3], 95), 3)
+
+    def test_writes_results_of_every_endpoint(self):
+        self.benchmark(output=self.output)
+
+        with open(self.output) as file:
+            results = json.load(file)["endpoints"]
+        self.assertEqual(list(results), [endpoint[0] for endpoint in ENDPOINTS])
+        for result in results.values():
+            self.assertGreater(result["queries"], 0)
+            self.assertGreater(result["bytes"], 0)
+            self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+
+    def test_fails_on_regression_against_baseline(self):
+        self.benchmark("profile_list", "inbox", output=self.output)
+
+        # Passes against its own results, with a latency tolerance ignoring the noise of the short runs
+        self.benchmark(
+            "profile_list", "inbox", baseline=self.output, latency_tolerance=100
+        )
+
+        with open(self.output) as file:
+            baseline = json.load(file)
+        baseline["endpoints"]["inbox"]["queries"] -= 1
+        with open(self.output, "w") as file:
+            json.dump(baseline, file)
+
+        with self.assertRaisesMessage(CommandError, "1 regressions"):
+            self.benchmark(
+                "profile_list",
+                "inbox",
+                baseline=self.output,
+                latency_tolerance=100,
+            )
+
+    def test_unknown_endpoint(self):
+        with self.assertRaisesMessage(CommandError, "Unknown endpoints: unknown"):
+            self.benchmark("unknown")
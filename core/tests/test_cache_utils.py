@@ -0,0 +1,144 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import cache_utils
+from openmics.models import OpenMic
+from profiles.models import Genre, Profile
+
+User = get_user_model()
+
+
+class CacheUtilsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_bump_version_changes_key(self):
+        key = cache_utils.make_key("tests.namespace", "part")
+        self.assertEqual(cache_utils.make_key("tests.namespace", "part"), key)
+
+        cache_utils.bump_version("tests.namespace")
+        self.assertNotEqual(cache_utils.make_key("tests.namespace", "part"), key)
+
+    def test_key_depends_on_every_namespace(self):
+        key = cache_utils.make_key(["tests.first", "tests.second"], "part")
+
+        cache_utils.bump_version("tests.second")
+        self.assertNotEqual(
+            cache_utils.make_key(["tests.first", "tests.second"], "part"), key
+        )
+
+    def test_version_is_restored_after_eviction(self):
+        key = cache_utils.make_key("tests.namespace", "part")
+        cache.delete(f"{cache_utils.VERSION_KEY_PREFIX}:tests.namespace")
+
+        # An evicted version never comes back to a previously used number
+        self.assertNotEqual(cache_utils.make_key("tests.namespace", "part"), key)
+
+    def test_get_or_set(self):
+        self.assertEqual(cache_utils.get_or_set("tests.namespace", ["a"], lambda: 1), 1)
+        self.assertEqual(cache_utils.get_or_set("tests.namespace", ["a"], lambda: 2), 1)
+
+        cache_utils.bump_version("tests.namespace")
+        self.assertEqual(cache_utils.get_or_set("tests.namespace", ["a"], lambda: 2), 2)
+
+
+class CacheInvalidationSignalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=self.user, display_name="Test User")
+        self.genre = Genre.objects.create(name="Jazz")
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_profile_key(self):
+        return cache_utils.make_key(cache_utils.get_namespace(Profile), "part")
+
+    def test_save_invalidates(self):
+        key = self.get_profile_key()
+        self.profile.save()
+        self.assertNotEqual(self.get_profile_key(), key)
+
+    def test_login_does_not_invalidate_the_users(self):
+        namespace = cache_utils.get_namespace(User)
+        key = cache_utils.make_key(namespace, "part")
+
+        self.assertTrue(self.client.login(username="testuser", password="password"))
+        self.assertEqual(cache_utils.make_key(namespace, "part"), key)
+
+        # Other changes of the users still invalidate them
+        self.user.email = "test@email.com"
+        self.user.save(update_fields=["email"])
+        self.assertNotEqual(cache_utils.make_key(namespace, "part"), key)
+
+    def test_delete_invalidates(self):
+        other_user = User.objects.create_user(username="other", password="password")
+        other_profile = Profile.objects.create(user=other_user, display_name="Other")
+
+        key = self.get_profile_key()
+        other_profile.delete()
+        self.assertNotEqual(self.get_profile_key(), key)
+
+    def test_many_to_many_change_invalidates_both_models(self):
+        profile_key = self.get_profile_key()
+        genre_key = cache_utils.make_key(cache_utils.get_namespace(Genre), "part")
+
+        self.profile.genres.add(self.genre)
+
+        self.assertNotEqual(self.get_profile_key(), profile_key)
+        self.assertNotEqual(
+            cache_utils.make_key(cache_utils.get_namespace(Genre), "part"), genre_key
+        )
+
+
+@override_settings(DETAIL_CACHE_TIMEOUT=60)
+class CachedObjectMixinTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=self.user, display_name="Test User")
+        self.openmic = OpenMic.objects.create(
+            title="Open Mic",
+            event_date=date.today() + timedelta(days=1),
+            start_time=time(19, 0),
+            end_time=time(23, 0),
+            author=self.profile,
+            google_maps_link="https://maps.google.com/?q=37.7749,-122.4194",
+        )
+        self.url = reverse("openmics:openmic_detail", kwargs={"pk": self.openmic.pk})
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_detail_object_is_cached(self):
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertContains(response, "Open Mic")
+        self.assertFalse(
+            any('FROM "openmics_openmic"' in query["sql"] for query in queries)
+        )
+
+    def test_detail_object_is_invalidated_on_edit(self):
+        self.client.get(self.url)
+
+        self.openmic.title = "Renamed Open Mic"
+        self.openmic.save()
+
+        self.assertContains(self.client.get(self.url), "Renamed Open Mic")
+
+    def test_missing_object(self):
+        url = reverse("openmics:openmic_detail", kwargs={"pk": self.openmic.pk + 1})
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from advertisements.models import Advertisement
+from bookmarks.models import Bookmark
+from inbox.models import Conversation, ConversationMembership, InboxMessage
+from openmics.models import OpenMic
+from profiles.models import Profile
+from search.models import SearchDocument
+
+User = get_user_model()
+
+
+class GenerateDatasetTests(TestCase):
+    def generate(self, **options):
+        call_command(
+            "generate_dataset", scale=0.01, batch_size=7, stdout=StringIO(), **options
+        )
+
+    def test_generates_the_scaled_dataset(self):
+        self.generate()
+
+        self.assertEqual(Profile.objects.count(), 10)
+        self.assertEqual(Advertisement.objects.count(), 15)
+        self.assertEqual(OpenMic.objects.count(), 2)
+        self.assertEqual(Conversation.objects.count(), 20)
+        self.assertEqual(InboxMessage.objects.count(), 200)
+        self.assertEqual(Bookmark.objects.count(), 50)
+        self.assertEqual(SearchDocument.objects.count(), 27)
+
+        # Every profile has genres and skills, and its user the shared password
+        profile = Profile.objects.first()
+        self.assertTrue(profile.genres.exists())
+        self.assertTrue(profile.skills.exists())
+        self.assertTrue(profile.user.check_password("password123"))
+
+    def test_conversations_are_consistent(self):
+        self.generate(skip_search_index=True)
+
+        self.assertEqual(
+            ConversationMembership.objects.count(), 2 * Conversation.objects.count()
+        )
+        for conversation in Conversation.objects.prefetch_related("participants"):
+            participant_ids = [
+                profile.pk for profile in conversation.participants.all()
+            ]
+            self.assertEqual(
+                conversation.pair_key, Conversation.make_pair_key(*participant_ids)
+            )
+            last_message = conversation.messages.order_by("-created").first()
+            self.assertEqual(conversation.lastmessage_created, last_message.created)
+            self.assertIn(last_message.sender_id, participant_ids)
+
+    def test_dataset_is_reproducible_from_its_seed(self):
+        def snapshot():
+            return list(
+                Profile.objects.order_by("pk").values_list(
+                    "display_name", "slug", "profile_type", "genres"
+                )
+            )
+
+        self.generate(seed=42, skip_search_index=True)
+        first = snapshot()
+
+        User.objects.all().delete()
+        self.generate(seed=42, skip_search_index=True)
+        self.assertEqual(snapshot(), first)
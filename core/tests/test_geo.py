@@ -0,0 +1,108 @@
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from core import geo
+from openmics.models import OpenMic
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class GeoGridTests(SimpleTestCase):
+    def assertCovered(self, latitude, longitude, radius_km, point):
+        cell = geo.get_cell(*point)
+        ranges = geo.get_cell_ranges(latitude, longitude, radius_km)
+        self.assertTrue(
+            any(first <= cell <= last for first, last in ranges),
+            f"{point} is not covered by the cells around {latitude}, {longitude}",
+        )
+
+    def test_get_cell(self):
+        self.assertIsNone(geo.get_cell(None, 10))
+        self.assertEqual(geo.get_cell(-90, -180), 0)
+        self.assertEqual(geo.get_cell(90, 179.99), geo.CELL_ROWS * geo.CELL_COLUMNS - 1)
+        # Neighbouring cells of a row are consecutive
+        self.assertEqual(
+            geo.get_cell(10, 10 + geo.CELL_DEGREES), geo.get_cell(10, 10) + 1
+        )
+
+    def test_get_cells_matches_get_cell(self):
+        latitudes = [-90, -17.0, 0, 37.7749, 89.99]
+        longitudes = [-180, 179.95, 0, -122.4194, 180]
+        self.assertEqual(
+            geo.get_cells(latitudes, longitudes).tolist(),
+            [geo.get_cell(*point) for point in zip(latitudes, longitudes)],
+        )
+
+    def test_cell_ranges_cover_the_circle(self):
+        # San Francisco and Oakland (about 13 km)
+        self.assertCovered(37.7749, -122.4194, 25, (37.8044, -122.2712))
+        # Both sides of the antimeridian, in Fiji
+        self.assertCovered(-17.0, 179.95, 50, (-17.0, -179.9))
+        self.assertCovered(-17.0, -179.95, 50, (-17.0, 179.9))
+        # Around the north pole every longitude is covered
+        self.assertCovered(89.9, 0, 50, (89.9, 180))
+
+    def test_cell_ranges_cross_the_antimeridian(self):
+        ranges = geo.get_cell_ranges(0, 179.95, 10)
+        self.assertEqual(
+            len(ranges), 2 * len({first // geo.CELL_COLUMNS for first, _ in ranges})
+        )
+
+    def test_haversine(self):
+        # Paris to London is about 344 km
+        distances = geo.haversine_km(
+            48.8566, 2.3522, [51.5074, 48.8566], [-0.1278, 2.3522]
+        )
+        self.assertAlmostEqual(distances[0], 343.5, delta=1)
+        self.assertEqual(distances[1], 0)
+
+
+class FilterWithinRadiusTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="testuser", password="password")
+        profile = Profile.objects.create(user=user, display_name="Test User")
+        for title, latitude, longitude in [
+            ("San Francisco", 37.7749, -122.4194),
+            ("Oakland", 37.8044, -122.2712),
+            ("San Jose", 37.3382, -121.8863),
+            ("Los Angeles", 34.0522, -118.2437),
+        ]:
+            OpenMic.objects.create(
+                title=title,
+                event_date=date.today(),
+                start_time=time(19, 0),
+                end_time=time(23, 0),
+                author=profile,
+                google_maps_link=f"https://www.google.com/maps/@{latitude},{longitude},15z",
+            )
+
+    def test_filter_within_radius(self):
+        openmics = geo.filter_within_radius(
+            OpenMic.objects.all(), 37.7749, -122.4194, 100
+        ).order_by("distance")
+
+        self.assertEqual(
+            [openmic.title for openmic in openmics],
+            ["San Francisco", "Oakland", "San Jose"],
+        )
+        # The distances computed by the database match the NumPy ones
+        expected = geo.haversine_km(
+            37.7749,
+            -122.4194,
+            [openmic.latitude for openmic in openmics],
+            [openmic.longitude for openmic in openmics],
+        )
+        for openmic, distance in zip(openmics, expected):
+            self.assertAlmostEqual(openmic.distance, distance, places=6)
+
+    def test_filter_within_radius_excludes_the_corners_of_the_cells(self):
+        # San Jose is in the candidate cells of a 60 km search, but 68 km away
+        openmics = geo.filter_within_radius(
+            OpenMic.objects.all(), 37.7749, -122.4194, 60
+        )
+        self.assertEqual(
+            {openmic.title for openmic in openmics}, {"San Francisco", "Oakland"}
+        )
@@ -0,0 +1,96 @@
+from django.template import Context, Template
+from django.test import SimpleTestCase
+from PIL import Image
+
+from core.images import DerivativeImage, encode, get_derivative_name, resize
+
+
+class FakeFieldFile:
+    """File field file of a fake storage serving the files under /media/"""
+
+    def __init__(self, name):
+        self.name = name
+        self.storage = FakeStorage()
+
+    def __bool__(self):
+        return bool(self.name)
+
+    @property
+    def url(self):
+        return f"/media/{self.name}"
+
+
+class FakeStorage:
+    def url(self, name):
+        return f"/media/{name}"
+
+
+class DerivativeTests(SimpleTestCase):
+    def test_derivative_name(self):
+        self.assertEqual(
+            get_derivative_name("profiles/profile_pics/me.png", "card", "webp"),
+            "profiles/profile_pics/derivatives/me_card.webp",
+        )
+
+    def test_resize(self):
+        image = Image.new("RGB", (800, 400))
+        self.assertEqual(resize(image, 400).size, (400, 200))
+        self.assertEqual(resize(image, 96, 96).size, (96, 96))
+        # Images are not upscaled
+        self.assertEqual(resize(image, 1920).size, (800, 400))
+        self.assertEqual(resize(image, 500, 500).size, (400, 400))
+
+    def test_encode_flattens_transparency_for_jpeg(self):
+        image = Image.new("RGBA", (10, 10), (0, 0, 0, 0))
+        self.assertEqual(encode(image, "jpeg")[:2], b"\xff\xd8")
+        self.assertEqual(encode(image, "webp")[8:12], b"WEBP")
+
+
+class PictureTagTests(SimpleTestCase):
+    def render(self, image):
+        return Template(
+            '{% load images %}{% picture image "avatar" sizes="40px" class="rounded-circle" alt="" %}'
+        ).render(Context({"image": image}))
+
+    def test_renders_derivatives(self):
+        image = DerivativeImage(
+            FakeFieldFile("pics/me.png"),
+            {
+                "source": "pics/me.png",
+                "sizes": {
+                    "card": {
+                        "width": 320,
+                        "webp": "d/me_card.webp",
+                        "jpeg": "d/me_card.jpg",
+                    },
+                    "avatar": {
+                        "width": 96,
+                        "webp": "d/me_avatar.webp",
+                        "jpeg": "d/me_avatar.jpg",
+                    },
+                },
+            },
+        )
+
+        self.assertHTMLEqual(
+            self.render(image),
+            '<picture><source type="image/webp" sizes="40px" '
+            'srcset="/media/d/me_avatar.webp 96w, /media/d/me_card.webp 320w">'
+            '<img src="/media/d/me_avatar.jpg" srcset="/media/d/me_avatar.jpg 96w, /media/d/me_card.jpg 320w" '
+            'sizes="40px" class="rounded-circle" alt=""></picture>',
+        )
+
+    def test_renders_original_until_derivatives_are_generated(self):
+        # Derivatives of the previous picture
+        image = DerivativeImage(
+            FakeFieldFile("pics/new.png"),
+            {
+                "source": "pics/old.png",
+                "sizes": {"avatar": {"width": 96, "webp": "a.webp", "jpeg": "a.jpg"}},
+            },
+        )
+
+        self.assertHTMLEqual(
+            self.render(image),
+            '<img src="/media/pics/new.png" class="rounded-circle" alt="">',
+        )
@@ -0,0 +1,101 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from bookmarks.models import Bookmark
+from core.listing import ListPipeline
+from openmics.filters import OpenMicFilter
+from openmics.models import OpenMic
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class ListPipelineTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=self.user, display_name="Test User")
+
+        self.openmics = [
+            OpenMic.objects.create(
+                title=f"Open Mic {i}",
+                event_date=date.today() + timedelta(days=i),
+                start_time=time(19, 0),
+                end_time=time(23, 0),
+                author=self.profile,
+            )
+            for i in range(5)
+        ]
+
+    def get_pipeline(self, data=None, per_page=2):
+        request = self.factory.get("/", data or {})
+        request.user = self.user
+        return ListPipeline(
+            request,
+            OpenMicFilter,
+            OpenMic.objects.for_cards().order_by("event_date"),
+            per_page=per_page,
+        )
+
+    def test_has_filter(self):
+        self.assertFalse(self.get_pipeline().has_filter)
+        self.assertTrue(self.get_pipeline({"q": "Open Mic 1"}).has_filter)
+
+    def test_filtered_page_and_count(self):
+        pipeline = self.get_pipeline({"q": "Open Mic 1"})
+
+        self.assertEqual(
+            [openmic.pk for openmic in pipeline.page()], [self.openmics[1].pk]
+        )
+        self.assertEqual(pipeline.count(), 1)
+
+    def test_count_runs_once(self):
+        pipeline = self.get_pipeline()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(pipeline.count(), 5)
+            self.assertEqual(pipeline.count(), 5)
+
+    def test_count_is_cached_across_requests(self):
+        cache.clear()
+        with self.settings(LIST_COUNT_CACHE_TIMEOUT=60):
+            self.assertEqual(self.get_pipeline().count(), 5)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.get_pipeline().count(), 5)
+
+            # Different filters are counted separately
+            self.assertEqual(self.get_pipeline({"q": "Open Mic 1"}).count(), 1)
+        cache.clear()
+
+    def test_cached_count_is_invalidated_on_change(self):
+        cache.clear()
+        with self.settings(LIST_COUNT_CACHE_TIMEOUT=60):
+            self.assertEqual(self.get_pipeline().count(), 5)
+
+            self.openmics[0].delete()
+            self.assertEqual(self.get_pipeline().count(), 4)
+        cache.clear()
+
+    def test_bookmark_lookup_is_limited_to_page(self):
+        content_type = ContentType.objects.get_for_model(OpenMic)
+        for openmic in self.openmics:
+            Bookmark.objects.create(
+                profile=self.profile, content_type=content_type, object_id=openmic.pk
+            )
+
+        pipeline = self.get_pipeline()
+        page = pipeline.page()
+        with CaptureQueriesContext(connection) as queries:
+            context = pipeline.get_bookmark_context(page)
+
+        self.assertEqual(
+            set(context["bookmarked_objects"]), {openmic.pk for openmic in page}
+        )
+        # The bookmark query does not scan the filtered open mics
+        self.assertNotIn("LIKE", queries[-1]["sql"])
@@ -0,0 +1,64 @@
+import json
+import re
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from profiles.models import ProfileType
+
+
+@override_settings(
+    INSTRUMENTATION_SERVER_TIMING=True, INSTRUMENTATION_SLOW_REQUEST_MS=None
+)
+class InstrumentationMiddlewareTests(TestCase):
+    def setUp(self):
+        ProfileType.objects.create(name="Musician")
+
+    def get_log(self, url, level="INFO", **kwargs):
+        """Requests the url, returns the response and the data of its log record."""
+        with self.assertLogs("core.instrumentation", level) as logs:
+            response = self.client.get(url, **kwargs)
+        return response, logs.records[-1].performance
+
+    def test_server_timing_header(self):
+        response, data = self.get_log(reverse("profiles:profile_list"))
+
+        timing = response.headers["Server-Timing"]
+        self.assertRegex(
+            timing,
+            r'^db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+        queries = int(re.search(r'desc="(\d+) queries"', timing).group(1))
+        self.assertEqual(queries, data["queries"])
+        self.assertGreater(data["queries"], 0)
+        self.assertGreater(data["template_ms"], 0)
+        self.assertLessEqual(data["template_ms"], data["total_ms"])
+
+    @override_settings(INSTRUMENTATION_SERVER_TIMING=False)
+    def test_server_timing_header_disabled(self):
+        response = self.client.get(reverse("pages:home"))
+        self.assertNotIn("Server-Timing", response.headers)
+
+    def test_log_record(self):
+        response, data = self.get_log(reverse("profiles:profile_list"))
+        self.assertEqual(data["kind"], "page")
+        self.assertEqual(data["view"], "profiles:profile_list")
+        self.assertEqual(data["status"], 200)
+        self.assertNotIn("top_queries", data)
+
+    def test_htmx_requests_are_tagged(self):
+        _, data = self.get_log(
+            reverse("profiles:get_profiles"), headers={"HX-Request": "true"}
+        )
+        self.assertEqual(data["kind"], "htmx")
+
+    @override_settings(INSTRUMENTATION_SLOW_REQUEST_MS=0, INSTRUMENTATION_TOP_QUERIES=2)
+    def test_slow_requests_are_logged_with_top_queries(self):
+        with self.assertLogs("core.instrumentation", "WARNING") as logs:
+            self.client.get(reverse("profiles:profile_list"))
+
+        data = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(len(data["top_queries"]), 2)
+        first, second = data["top_queries"]
+        self.assertGreaterEqual(first["ms"], second["ms"])
+        self.assertIn("SELECT", first["sql"])
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.pagination import CursorPaginator, InvalidCursor
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.profiles = []
+        for i in range(7):
+            user = User.objects.create_user(username=f"user{i}", password="password")
+            profile = Profile.objects.create(user=user, display_name=f"User {i}")
+            self.profiles.append(profile)
+
+        # Give some profiles the same creation date to exercise the primary key tie-breaker
+        for i, profile in enumerate(self.profiles):
+            Profile.objects.filter(pk=profile.pk).update(
+                created=self.now - timedelta(minutes=i // 2)
+            )
+
+    def collect_pages(self, paginator):
+        """Walks all pages of the paginator and returns the pks in page order."""
+        pks = []
+        page = paginator.page()
+        pks.extend(profile.pk for profile in page)
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            pks.extend(profile.pk for profile in page)
+        return pks
+
+    def test_pages_cover_all_rows_in_order(self):
+        queryset = Profile.objects.order_by("-created")
+        paginator = CursorPaginator(queryset, 3)
+
+        expected = list(
+            queryset.order_by("-created", "-pk").values_list("pk", flat=True)
+        )
+        self.assertEqual(self.collect_pages(paginator), expected)
+
+    def test_ascending_ordering(self):
+        queryset = Profile.objects.order_by("created")
+        paginator = CursorPaginator(queryset, 2)
+
+        expected = list(queryset.order_by("created", "pk").values_list("pk", flat=True))
+        self.assertEqual(self.collect_pages(paginator), expected)
+
+    def test_nullable_related_ordering(self):
+        # Only some users have logged in, the rest have a NULL last_login
+        for i, profile in enumerate(self.profiles[:3]):
+            User.objects.filter(pk=profile.user_id).update(
+                last_login=self.now - timedelta(days=i)
+            )
+
+        queryset = Profile.objects.order_by("-user__last_login")
+        paginator = CursorPaginator(queryset, 2)
+        pks = self.collect_pages(paginator)
+
+        self.assertEqual(len(pks), len(self.profiles))
+        self.assertEqual(len(set(pks)), len(self.profiles))
+        # Profiles that logged in come first, most recent login first
+        self.assertEqual(pks[:3], [profile.pk for profile in self.profiles[:3]])
+
+    def test_page_runs_a_single_query(self):
+        paginator = CursorPaginator(Profile.objects.order_by("-created"), 3)
+        first_page = paginator.page()
+
+        with self.assertNumQueries(1):
+            page = paginator.page(first_page.next_cursor)
+            list(page)
+
+    def test_last_page_has_no_next_cursor(self):
+        paginator = CursorPaginator(Profile.objects.order_by("-created"), 10)
+        page = paginator.page()
+
+        self.assertEqual(len(page), len(self.profiles))
+        self.assertFalse(page.has_next())
+        self.assertIsNone(page.next_cursor)
+
+    def test_invalid_cursor(self):
+        paginator = CursorPaginator(Profile.objects.order_by("-created"), 3)
+
+        with self.assertRaises(InvalidCursor):
+            paginator.page("not-a-cursor")
+
+    def test_get_profiles_follows_cursor(self):
+        paginator = CursorPaginator(Profile.objects.order_by("-created"), 3)
+        first_page = paginator.page()
+
+        with self.settings(PAGE_SIZE=3):
+            response = self.client.get(
+                reverse("profiles:get_profiles"),
+                {"cursor": first_page.next_cursor},
+                HTTP_HX_REQUEST="true",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        for profile in paginator.page(first_page.next_cursor):
+            self.assertContains(response, profile.display_name)
+        for profile in first_page:
+            self.assertNotContains(response, profile.display_name)
+
+    def test_get_profiles_invalid_cursor(self):
+        response = self.client.get(
+            reverse("profiles:get_profiles"),
+            {"cursor": "not-a-cursor"},
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from advertisements.filters import AdvertisementFilter
+from advertisements.forms import AdvertisementCreateForm
+from advertisements.models import AdType, Advertisement
+from core.reference_data import registry
+from openmics.filters import OpenMicFilter
+from openmics.models import OpenMic
+from profiles.filters import ProfileFilter
+from profiles.forms import ProfileEditGenresForm
+from profiles.models import Genre, Profile, ProfileType, Skill
+
+
+class ReferenceDataRegistryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.jazz = Genre.objects.create(name="Jazz")
+
+    def tearDown(self):
+        cache.clear()
+        registry.clear()
+
+    def test_reference_models_are_registered(self):
+        for model in (ProfileType, AdType, Genre, Skill):
+            self.assertTrue(registry.is_registered(model))
+        self.assertFalse(registry.is_registered(Profile))
+
+    def test_objects_are_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(registry.get_objects(Genre), [self.jazz])
+        with self.assertNumQueries(0):
+            self.assertEqual(registry.get_choices(Genre), [(self.jazz.pk, "Jazz")])
+            self.assertEqual(registry.get(Genre, str(self.jazz.pk)), self.jazz)
+
+    def test_objects_are_reloaded_when_changed(self):
+        registry.get_objects(Genre)
+
+        rock = Genre.objects.create(name="Rock")
+        self.assertEqual(
+            registry.get_choices(Genre), [(self.jazz.pk, "Jazz"), (rock.pk, "Rock")]
+        )
+
+        rock.delete()
+        self.assertEqual(registry.get_choices(Genre), [(self.jazz.pk, "Jazz")])
+
+    def test_filter_forms_render_choices_without_queries(self):
+        ProfileType.objects.create(name="Musician")
+        AdType.objects.create(name="Band looking for musician")
+        Skill.objects.create(name="Guitar")
+
+        filtersets = [
+            (ProfileFilter, Profile),
+            (AdvertisementFilter, Advertisement),
+            (OpenMicFilter, OpenMic),
+        ]
+        for filterset_class, model in filtersets:
+            # The first render loads the reference data
+            str(filterset_class(queryset=model.objects.none()).form)
+
+        with self.assertNumQueries(0):
+            for filterset_class, model in filtersets:
+                html = str(filterset_class(queryset=model.objects.none()).form)
+                self.assertIn("Jazz", html)
+
+    def test_forms_render_choices_without_queries(self):
+        Skill.objects.create(name="Guitar")
+        str(AdvertisementCreateForm())
+
+        with self.assertNumQueries(0):
+            html = str(AdvertisementCreateForm())
+        self.assertIn("Jazz", html)
+        self.assertIn("Guitar", html)
+
+    def test_form_validates_registered_choices(self):
+        form = ProfileEditGenresForm(data={"genres": [self.jazz.pk]})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(list(form.cleaned_data["genres"]), [self.jazz])
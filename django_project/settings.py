@@ -84,12 +84,18 @@ INSTALLED_APPS = [
     "bookmarks.apps.BookmarksConfig",
     "htmx_messages.apps.HtmxMessagesConfig",
     "reports.apps.ReportsConfig",
+    "core.apps.CoreConfig",
+    "search.apps.SearchConfig",
+    "jobs.apps.JobsConfig",
+    "mailer.apps.MailerConfig",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     # Whitenoise
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    # Performance instrumentation, measures everything after the static files
+    "core.middleware.InstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -116,6 +122,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "inbox.context_processors.inbox_events",
                 # `allauth` needs this from django
                 "django.template.context_processors.request",
             ],
@@ -183,6 +190,77 @@ MEDIA_ROOT = BASE_DIR / "media"
 # Pagination page size
 PAGE_SIZE = 20
 
+# Number of messages of a conversation loaded at once in the inbox
+INBOX_PAGE_SIZE = 30
+
+# Real time inbox events pushed over Server-Sent Events (see inbox.views.InboxEventsView).
+# Off by default: the header badge is refreshed on page load and the conversation list when the page is shown again.
+# Only enable it when served with ASGI (django_project.asgi) and a broker reaching every process,
+# under WSGI each open stream holds a worker and the events are only sent when the stream closes.
+INBOX_EVENTS_ENABLED = env.bool("INBOX_EVENTS_ENABLED", default=False)
+
+# Broker delivering the real time inbox events, the in process broker only reaches subscribers of the same process
+INBOX_EVENTS_BROKER = "inbox.events.InProcessBroker"
+
+# Seconds an inbox event stream stays open before the browser reconnects, and between keep alive comments
+INBOX_EVENTS_STREAM_TIMEOUT = 300
+INBOX_EVENTS_KEEPALIVE = 15
+
+# Seconds the total counts of the filtered lists are cached for, 0 disables caching
+# Cached values are versioned per model and invalidated when an object changes (see core.cache_utils)
+LIST_COUNT_CACHE_TIMEOUT = 300
+
+# Seconds the objects of the detail pages are cached for, 0 disables caching
+DETAIL_CACHE_TIMEOUT = 300
+
+# Maximum number of cities suggested by the location autocomplete for a query,
+# and seconds the suggestions of a query are cached for
+CITY_AUTOCOMPLETE_LIMIT = 50
+CITY_AUTOCOMPLETE_CACHE_TIMEOUT = 60 * 60
+
+# Seconds the rendered maps of the open mic venues are cached for
+OPENMIC_MAP_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Resized derivatives of the profile pictures (see core.images), generated by background jobs
+# Quality of the WebP and JPEG derivatives
+IMAGE_DERIVATIVE_QUALITY = 82
+
+# Background jobs (see jobs.queue), run by the `run_worker` command
+# Run the jobs right away when they are queued instead, during the request. On by default so nothing is left
+# unprocessed where no worker runs: set JOBS_EAGER=False once the worker process of the Procfile is deployed (see README)
+JOBS_EAGER = env.bool("JOBS_EAGER", default=True)
+# Seconds an idle worker waits before looking for due jobs again
+JOBS_POLL_INTERVAL = 1
+# Seconds after which a running job is considered abandoned by its worker and queued again
+JOBS_LOCK_TIMEOUT = 60 * 10
+
+# Performance instrumentation (see core.middleware.InstrumentationMiddleware)
+# Sends the query, template and total times of each request in a Server-Timing header
+INSTRUMENTATION_SERVER_TIMING = env.bool("INSTRUMENTATION_SERVER_TIMING", default=DEBUG)
+# Requests slower than this (ms) are logged as warnings with their slowest queries
+INSTRUMENTATION_SLOW_REQUEST_MS = env.int(
+    "INSTRUMENTATION_SLOW_REQUEST_MS", default=500
+)
+INSTRUMENTATION_TOP_QUERIES = 5
+
+# Logging
+# https://docs.djangoproject.com/en/4.2/topics/logging/
+# The metrics of every request are logged at the INFO level, only slow requests are logged by default
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core.instrumentation": {
+            "handlers": ["console"],
+            "level": env("INSTRUMENTATION_LOG_LEVEL", default="WARNING"),
+            "propagate": False,
+        },
+    },
+}
+
 # 3rd Party
 # Crispy Forms
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
@@ -201,7 +279,11 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 # EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# Set to "mailer.backends.OutboxEmailBackend" to store the emails in the outbox and send them in the background
+# (see mailer). Only once the worker process is deployed, which sends them (see README)
+EMAIL_BACKEND = env(
+    "EMAIL_BACKEND", default="django.core.mail.backends.smtp.EmailBackend"
+)
 ACCOUNT_EMAIL_REQUIRED = True
 ACCOUNT_USERNAME_REQUIRED = False
 ACCOUNT_AUTHENTICATION_METHOD = "email"
@@ -233,6 +315,18 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = "apikey"  # Name for all the SenGrid accounts
 EMAIL_HOST_PASSWORD = env("SENDGRID_API_KEY")
+# Seconds before giving up on an unresponsive SMTP server
+EMAIL_TIMEOUT = 30
+
+# Outbox (see mailer.delivery)
+# Backend the emails of the outbox are delivered with
+OUTBOX_DELIVERY_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# Number of emails sent over each SMTP connection
+OUTBOX_BATCH_SIZE = 50
+# Attempts at sending an email the server refuses before giving up,
+# and seconds before the first retry (doubled at each retry)
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_RETRY_DELAY = 60
 
 # The email you'll be sending emails from
 DEFAULT_FROM_EMAIL = env("FROM_EMAIL", default="noreply@gmail.com")
@@ -279,6 +373,15 @@ if DEBUG:
         },
     }
 
+    # Cache
+    # https://docs.djangoproject.com/en/4.2/topics/cache/
+    # Local memory cache, per process, also used by the tests
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 else:
     ALLOWED_HOSTS = []
     RENDER_EXTERNAL_HOSTNAME = env("RENDER_EXTERNAL_HOSTNAME")
@@ -294,6 +397,16 @@ else:
         "default": dj_database_url.parse(env("DATABASE_URL"), conn_max_age=600)
     }
 
+    # Cache
+    # https://docs.djangoproject.com/en/4.2/topics/cache/
+    # Shared between the worker processes, e.g. CACHE_URL=redis://host:6379/0,
+    # defaults to a file based cache on the local disk
+    CACHES = {
+        "default": env.cache_url(
+            "CACHE_URL", default="filecache:///var/tmp/band_together_cache"
+        )
+    }
+
     STATIC_ROOT = BASE_DIR / "staticfiles"
     STORAGES = {
         # Media file (image) management
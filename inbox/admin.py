@@ -1,7 +1,9 @@
 from django.contrib import admin
-from .models import InboxMessage, Conversation
+from .models import InboxMessage, Conversation, ConversationMembership
 
 # Register the InboxMessage model with the Django admin site.
 admin.site.register(InboxMessage)
 # Register the Conversation model with the Django admin site.
 admin.site.register(Conversation)
+# Register the ConversationMembership model with the Django admin site.
+admin.site.register(ConversationMembership)
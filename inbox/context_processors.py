@@ -0,0 +1,9 @@
+from django.conf import settings
+
+
+def inbox_events(request):
+    """
+    Context processor telling the templates whether the real time inbox events are enabled,
+    in which case the pages open the event stream of the logged-in user.
+    """
+    return {"inbox_events_enabled": settings.INBOX_EVENTS_ENABLED}
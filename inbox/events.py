@@ -0,0 +1,122 @@
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .models import ConversationMembership
+
+
+class BaseBroker:
+    """
+    Interface of the publish/subscribe brokers delivering inbox events.
+    A broker for several processes (e.g. Redis pub/sub) implements the same two methods
+    and is selected with the INBOX_EVENTS_BROKER setting.
+    """
+
+    def publish(self, channel, event):
+        """
+        Publishes an event (a JSON serializable dict) to every subscriber of the channel.
+        Called from synchronous code, must not block.
+        """
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        """
+        Returns an async context manager yielding an asyncio.Queue receiving the events of the channel.
+        """
+        raise NotImplementedError
+
+
+class InProcessBroker(BaseBroker):
+    """
+    Broker delivering events to the subscribers of the current process.
+    Enough for development, tests and single process deployments.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+
+        # Subscribers wait in their own event loop, hand the event over to it thread safely
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # The event loop of the subscriber has been closed
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers[channel].remove(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """
+    Returns the broker configured with the INBOX_EVENTS_BROKER setting
+    """
+    return import_string(settings.INBOX_EVENTS_BROKER)()
+
+
+def profile_channel(profile_id):
+    """
+    Returns the channel of the inbox events of a profile
+    """
+    return f"inbox:profile:{profile_id}"
+
+
+def format_event(event):
+    """
+    Formats an event as a Server-Sent Events message, the event type being the "type" key of the event
+    """
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def publish_message_events(message):
+    """
+    Publishes the events of a new message to the other participants of its conversation:
+    a "message" event, and an "unread" event with their new number of unread conversations.
+    """
+    broker = get_broker()
+    memberships = (
+        ConversationMembership.objects.filter(conversation_id=message.conversation_id)
+        .exclude(profile_id=message.sender_id)
+        .select_related("profile")
+    )
+    for membership in memberships:
+        channel = profile_channel(membership.profile_id)
+        broker.publish(
+            channel,
+            {
+                "type": "message",
+                "conversation": message.conversation_id,
+                "message": message.pk,
+                "sender": message.sender_id,
+            },
+        )
+        broker.publish(
+            channel,
+            {
+                "type": "unread",
+                "count": ConversationMembership.objects.unread_conversation_count(
+                    membership.profile
+                ),
+            },
+        )
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.13 on 2026-10-18 13:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0024_alter_profile_youtube_link_1_and_more"),
+        ("inbox", "0002_remove_conversation_room_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConversationMembership",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("last_read_at", models.DateTimeField(blank=True, null=True)),
+                ("unread_count", models.PositiveIntegerField(default=0)),
+                (
+                    "conversation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="memberships",
+                        to="inbox.conversation",
+                    ),
+                ),
+                (
+                    "profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="conversation_memberships",
+                        to="profiles.profile",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["profile", "unread_count"],
+                        name="inbox_conve_profile_2c9589_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="conversationmembership",
+            constraint=models.UniqueConstraint(
+                fields=("conversation", "profile"),
+                name="unique_conversation_membership",
+            ),
+        ),
+    ]
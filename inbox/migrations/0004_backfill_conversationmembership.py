@@ -0,0 +1,43 @@
+from django.db import migrations
+
+
+def backfill_memberships(apps, schema_editor):
+    """
+    Creates the memberships of the existing conversations.
+    A participant has one unread message if the conversation is not seen
+    and its latest message was sent by someone else, matching the previous notification logic.
+    """
+    Conversation = apps.get_model("inbox", "Conversation")
+    ConversationMembership = apps.get_model("inbox", "ConversationMembership")
+
+    memberships = []
+    for conversation in Conversation.objects.prefetch_related("participants"):
+        latest_message = conversation.messages.order_by("-created").first()
+        for profile in conversation.participants.all():
+            unread = (
+                latest_message is not None
+                and not conversation.is_seen
+                and latest_message.sender_id != profile.pk
+            )
+            memberships.append(
+                ConversationMembership(
+                    conversation=conversation,
+                    profile=profile,
+                    unread_count=1 if unread else 0,
+                    last_read_at=None if unread else conversation.lastmessage_created,
+                )
+            )
+    ConversationMembership.objects.bulk_create(
+        memberships, batch_size=1000, ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inbox", "0003_conversationmembership"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_memberships, migrations.RunPython.noop),
+    ]
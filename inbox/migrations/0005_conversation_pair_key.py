@@ -0,0 +1,44 @@
+# Generated by Django 4.2.13 on 2026-10-18 13:38
+
+from django.db import migrations, models
+
+
+def backfill_pair_keys(apps, schema_editor):
+    """
+    Sets the pair key of the existing one to one conversations, including those of a profile with itself.
+    If a pair of profiles has several conversations, the most recently active one keeps the key.
+    """
+    Conversation = apps.get_model("inbox", "Conversation")
+
+    taken = set()
+    conversations = Conversation.objects.prefetch_related("participants").order_by(
+        "-lastmessage_created"
+    )
+    for conversation in conversations:
+        participant_ids = sorted(p.pk for p in conversation.participants.all())
+        # A conversation of a profile with itself has a single participant
+        if len(participant_ids) not in (1, 2):
+            continue
+        pair_key = f"{participant_ids[0]}:{participant_ids[-1]}"
+        if pair_key in taken:
+            continue
+        taken.add(pair_key)
+        Conversation.objects.filter(pk=conversation.pk).update(pair_key=pair_key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inbox", "0004_backfill_conversationmembership"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversation",
+            name="pair_key",
+            field=models.CharField(
+                blank=True, editable=False, max_length=41, null=True, unique=True
+            ),
+        ),
+        migrations.RunPython(backfill_pair_keys, migrations.RunPython.noop),
+    ]
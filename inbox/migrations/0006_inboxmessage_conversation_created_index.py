@@ -0,0 +1,20 @@
+# Generated by Django 4.2.13 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inbox", "0005_conversation_pair_key"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inboxmessage",
+            index=models.Index(
+                fields=["conversation", "-created", "-id"],
+                name="inbox_inbox_convers_f31eda_idx",
+            ),
+        ),
+    ]
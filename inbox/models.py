@@ -1,9 +1,62 @@
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, OuterRef, Prefetch, Subquery
 from profiles.models import Profile
+from core.pagination import CursorPaginator
 from django.utils import timezone
 from django.utils.timesince import timesince
 
 
+class ConversationQuerySet(models.QuerySet):
+    """
+    QuerySet for Conversations
+    """
+
+    def get_or_create_between(self, profile, other_profile):
+        """
+        Returns the one to one conversation between the two profiles, creating it if it does not exist yet.
+        The conversation is found with a single lookup on the unique pair key,
+        and created atomically so two profiles messaging each other at the same time end up in the same conversation.
+        Returns a (conversation, created) tuple like get_or_create.
+        """
+        pair_key = Conversation.make_pair_key(profile.pk, other_profile.pk)
+        try:
+            return self.get(pair_key=pair_key), False
+        except self.model.DoesNotExist:
+            pass
+
+        try:
+            # Create the conversation and its participants together,
+            # the unique pair key makes a concurrent creation of the same conversation fail
+            with transaction.atomic():
+                conversation = self.create(pair_key=pair_key)
+                conversation.participants.add(profile, other_profile)
+            return conversation, True
+        except IntegrityError:
+            # The conversation was created by a concurrent request in the meantime
+            return self.get(pair_key=pair_key), False
+
+    def for_inbox(self, profile):
+        """
+        Returns the conversations of the profile for the inbox conversation list.
+        Each conversation is annotated with the number of messages the profile has not read yet,
+        and the participants are prefetched with the fields rendered in the list,
+        so the whole list is rendered with a fixed number of queries.
+        """
+        unread_count = ConversationMembership.objects.filter(
+            conversation=OuterRef("pk"), profile=profile
+        ).values("unread_count")[:1]
+
+        return (
+            self.filter(participants=profile)
+            .annotate(unread_count=Subquery(unread_count))
+            .prefetch_related(
+                Prefetch("participants", queryset=Profile.objects.for_cards())
+            )
+        )
+
+
 class Conversation(models.Model):
     """
     Model to store conversations
@@ -14,6 +67,13 @@ class Conversation(models.Model):
     )  # Participants are many-to-many to accommodate future needs if there needs to be a room with more than 2 participants
     lastmessage_created = models.DateTimeField(default=timezone.now)
     is_seen = models.BooleanField(default=False)
+    # Canonical "<lower profile id>:<higher profile id>" key of one to one conversations, used to find them with a single lookup.
+    # Left empty for conversations with any other number of participants.
+    pair_key = models.CharField(
+        max_length=41, unique=True, null=True, blank=True, editable=False
+    )
+
+    objects = ConversationQuerySet.as_manager()
 
     class Meta:
         ordering = ["-lastmessage_created"]  # Ordered by lastmessage_created by default
@@ -24,6 +84,48 @@ class Conversation(models.Model):
         )
         return f"[{profile_names}]"
 
+    @staticmethod
+    def make_pair_key(profile_id, other_profile_id):
+        """
+        Returns the pair key of the one to one conversation between two profiles, independent of their order
+        """
+        low, high = sorted([profile_id, other_profile_id])
+        return f"{low}:{high}"
+
+    def get_messages_page(self, cursor=None):
+        """
+        Returns a window of the messages of the conversation, newest first.
+        Without a cursor the latest INBOX_PAGE_SIZE messages are returned,
+        the cursor of the page points to the next window of earlier messages.
+        """
+        paginator = CursorPaginator(
+            self.messages.order_by("-created"), settings.INBOX_PAGE_SIZE
+        )
+        return paginator.page(cursor)
+
+    def refresh_pair_key(self):
+        """
+        Updates the pair key after the participants of the conversation have changed.
+        A conversation of a profile with itself has a single participant, keyed as the pair of it with itself.
+        """
+        participant_ids = list(self.participants.values_list("pk", flat=True))
+        pair_key = (
+            self.make_pair_key(participant_ids[0], participant_ids[-1])
+            if len(participant_ids) in (1, 2)
+            else None
+        )
+        if pair_key == self.pair_key:
+            return
+
+        try:
+            with transaction.atomic():
+                Conversation.objects.filter(pk=self.pk).update(pair_key=pair_key)
+            self.pair_key = pair_key
+        except IntegrityError:
+            # Another conversation between the same profiles already holds the key,
+            # it stays the canonical conversation of the pair
+            pass
+
 
 class InboxMessage(models.Model):
     """
@@ -41,7 +143,95 @@ class InboxMessage(models.Model):
 
     class Meta:
         ordering = ["-created"]
+        indexes = [models.Index(fields=["conversation", "-created", "-id"])]
 
     def __str__(self):
         time_since = timesince(self.created, timezone.now())
         return f"[{self.sender.display_name} : {time_since} ago]"
+
+
+def unread_count_cache_key(profile_id):
+    """
+    Returns the cache key of the number of unread conversations of a profile
+    """
+    return f"inbox:unread-count:{profile_id}"
+
+
+class ConversationMembershipQuerySet(models.QuerySet):
+    """
+    QuerySet for Conversation Memberships
+    """
+
+    def unread_conversation_count(self, profile):
+        """
+        Returns the number of conversations of the profile with unread messages.
+        The count is a single indexed lookup, cached until a message is sent to or read by the profile.
+        """
+        return cache.get_or_set(
+            unread_count_cache_key(profile.pk),
+            lambda: self.filter(profile=profile, unread_count__gt=0).count(),
+        )
+
+    def record_message(self, message):
+        """
+        Updates the unread state of the conversation participants for a new message.
+        The sender has read the conversation up to their message, every other participant has one more unread message.
+        """
+        memberships = self.filter(conversation_id=message.conversation_id)
+        memberships.exclude(profile_id=message.sender_id).update(
+            unread_count=F("unread_count") + 1
+        )
+        memberships.filter(profile_id=message.sender_id).update(
+            unread_count=0, last_read_at=message.created
+        )
+
+        # Invalidate the cached unread counts of the participants
+        cache.delete_many(
+            [
+                unread_count_cache_key(profile_id)
+                for profile_id in memberships.values_list("profile_id", flat=True)
+            ]
+        )
+
+    def mark_read(self, conversation, profile):
+        """
+        Marks the conversation as read by the profile
+        """
+        updated = self.filter(
+            conversation=conversation, profile=profile, unread_count__gt=0
+        ).update(unread_count=0, last_read_at=timezone.now())
+
+        # Only invalidate the cached unread count if the conversation had unread messages
+        if updated:
+            cache.delete(unread_count_cache_key(profile.pk))
+
+
+class ConversationMembership(models.Model):
+    """
+    Model to store the read state of a conversation for each participant.
+    Kept in sync with Conversation.participants and updated whenever a message is sent or read,
+    so the unread state of a profile never has to be computed from the messages.
+    """
+
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, related_name="memberships"
+    )
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="conversation_memberships"
+    )
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    unread_count = models.PositiveIntegerField(default=0)
+
+    objects = ConversationMembershipQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["conversation", "profile"],
+                name="unique_conversation_membership",
+            )
+        ]
+        indexes = [models.Index(fields=["profile", "unread_count"])]
+
+    def __str__(self):
+        return f"{self.profile.display_name} in {self.conversation} ({self.unread_count} unread)"
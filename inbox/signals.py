@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+from .events import publish_message_events
+from .models import Conversation, ConversationMembership, InboxMessage
+
+
+@receiver(m2m_changed, sender=Conversation.participants.through)
+def sync_conversation_memberships(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Signal receiver that keeps the conversation memberships and pair key in sync with the participants of a conversation.
+    Handles both sides of the relation (conversation.participants and profile.conversations).
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if action == "post_add":
+        # Create a membership for each newly added participant
+        if reverse:
+            memberships = [
+                ConversationMembership(conversation_id=pk, profile=instance)
+                for pk in pk_set
+            ]
+        else:
+            memberships = [
+                ConversationMembership(conversation=instance, profile_id=pk)
+                for pk in pk_set
+            ]
+        ConversationMembership.objects.bulk_create(memberships, ignore_conflicts=True)
+
+    elif action == "post_remove":
+        # Delete the memberships of the removed participants
+        if reverse:
+            ConversationMembership.objects.filter(
+                profile=instance, conversation_id__in=pk_set
+            ).delete()
+        else:
+            ConversationMembership.objects.filter(
+                conversation=instance, profile_id__in=pk_set
+            ).delete()
+
+    elif action == "post_clear":
+        # Delete all the memberships of the conversation (or profile)
+        if reverse:
+            ConversationMembership.objects.filter(profile=instance).delete()
+        else:
+            ConversationMembership.objects.filter(conversation=instance).delete()
+
+    # Keep the pair key of the changed conversations up to date
+    if not reverse:
+        conversations = [instance]
+    elif action == "post_clear":
+        # The cleared conversations of the profile are no longer known, find them by their pair key
+        conversations = Conversation.objects.filter(
+            Q(pair_key__startswith=f"{instance.pk}:")
+            | Q(pair_key__endswith=f":{instance.pk}")
+        )
+    else:
+        conversations = Conversation.objects.filter(pk__in=pk_set)
+    for conversation in conversations:
+        conversation.refresh_pair_key()
+
+
+@receiver(post_save, sender=InboxMessage)
+def update_unread_state_on_message(sender, instance, created, **kwargs):
+    """
+    Signal receiver that updates the unread state of the participants when a new message is sent,
+    and pushes the new message to the inbox event streams of the participants once it is committed
+    (if INBOX_EVENTS_ENABLED).
+    """
+    if created:
+        ConversationMembership.objects.record_message(instance)
+        if settings.INBOX_EVENTS_ENABLED:
+            transaction.on_commit(lambda: publish_message_events(instance))
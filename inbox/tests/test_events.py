@@ -0,0 +1,138 @@
+import json
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from inbox.events import InProcessBroker, get_broker, profile_channel
+from inbox.models import Conversation, InboxMessage
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class RecordingBroker(InProcessBroker):
+    """Broker keeping the published events for the assertions."""
+
+    events = []
+
+    def publish(self, channel, event):
+        self.events.append((channel, event))
+        super().publish(channel, event)
+
+
+class InProcessBrokerTests(TestCase):
+    def test_publish_reaches_subscribers_of_the_channel(self):
+        broker = InProcessBroker()
+
+        async def receive():
+            async with broker.subscribe("channel") as queue:
+                broker.publish("other-channel", {"type": "ignored"})
+                broker.publish("channel", {"type": "message"})
+                return await queue.get()
+
+        self.assertEqual(async_to_sync(receive)(), {"type": "message"})
+        # Subscribers are removed when they leave
+        self.assertEqual(broker._subscribers, {})
+
+    def test_publish_without_subscribers(self):
+        InProcessBroker().publish("channel", {"type": "message"})
+
+
+@override_settings(
+    INBOX_EVENTS_ENABLED=True,
+    INBOX_EVENTS_BROKER="inbox.tests.test_events.RecordingBroker",
+)
+class InboxEventsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_broker.cache_clear()
+        RecordingBroker.events = []
+
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=self.user, display_name="Test User")
+        self.other_profile = Profile.objects.create(
+            user=User.objects.create_user(username="otheruser", password="password"),
+            display_name="Other User",
+        )
+        self.conversation, _ = Conversation.objects.get_or_create_between(
+            self.profile, self.other_profile
+        )
+
+    def tearDown(self):
+        get_broker.cache_clear()
+
+    def test_new_message_is_published_to_recipient_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            message = InboxMessage.objects.create(
+                sender=self.other_profile, conversation=self.conversation, body="Hi!"
+            )
+
+        channel = profile_channel(self.profile.pk)
+        self.assertEqual(
+            RecordingBroker.events,
+            [
+                (
+                    channel,
+                    {
+                        "type": "message",
+                        "conversation": self.conversation.pk,
+                        "message": message.pk,
+                        "sender": self.other_profile.pk,
+                    },
+                ),
+                (channel, {"type": "unread", "count": 1}),
+            ],
+        )
+
+    @override_settings(INBOX_EVENTS_STREAM_TIMEOUT=0)
+    def test_event_stream_starts_with_unread_count(self):
+        InboxMessage.objects.create(
+            sender=self.other_profile, conversation=self.conversation, body="Hi!"
+        )
+        self.client.login(username="testuser", password="password")
+
+        response = self.client.get(reverse("inbox:inbox_events"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        async def read():
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        content = async_to_sync(read)().decode()
+        event_type, data = content.strip().split("\n")
+        self.assertEqual(event_type, "event: unread")
+        self.assertEqual(
+            json.loads(data.removeprefix("data: ")), {"type": "unread", "count": 1}
+        )
+
+    def test_event_stream_requires_login(self):
+        response = self.client.get(reverse("inbox:inbox_events"))
+        self.assertEqual(response.status_code, 403)
+
+    def test_pages_open_the_event_stream(self):
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(reverse("pages:home"))
+        self.assertContains(response, "js/inbox/inbox_events.js")
+
+    @override_settings(INBOX_EVENTS_ENABLED=False)
+    def test_disabled_by_default(self):
+        self.client.login(username="testuser", password="password")
+
+        # The pages keep refreshing the inbox badge with requests, without opening a stream
+        response = self.client.get(reverse("pages:home"))
+        self.assertNotContains(response, "js/inbox/inbox_events.js")
+        self.assertContains(response, reverse("inbox:notify_inbox"))
+        self.assertEqual(
+            self.client.get(reverse("inbox:inbox_events")).status_code, 404
+        )
+
+        # Nothing is published
+        with self.captureOnCommitCallbacks(execute=True):
+            InboxMessage.objects.create(
+                sender=self.other_profile, conversation=self.conversation, body="Hi!"
+            )
+        self.assertEqual(RecordingBroker.events, [])
@@ -1,7 +1,16 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
 from profiles.models import Profile
-from inbox.models import Conversation, InboxMessage
+from inbox.models import (
+    Conversation,
+    ConversationMembership,
+    ConversationQuerySet,
+    InboxMessage,
+)
 from django.utils import timezone
 
 User = get_user_model()
@@ -71,3 +80,169 @@ class InboxMessageModelTests(TestCase):
         message_str = str(self.inbox_message)
         self.assertIn("Test User", message_str)
         self.assertIn("minutes ago", message_str)
+
+
+class ConversationMembershipModelTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=self.user, display_name="Test User")
+        self.other_user = User.objects.create_user(
+            username="otheruser", password="password"
+        )
+        self.other_profile = Profile.objects.create(
+            user=self.other_user, display_name="Other User"
+        )
+
+        self.conversation = Conversation.objects.create()
+        self.conversation.participants.set([self.profile, self.other_profile])
+
+    def get_membership(self, profile):
+        return ConversationMembership.objects.get(
+            conversation=self.conversation, profile=profile
+        )
+
+    def test_memberships_follow_participants(self):
+        self.assertEqual(self.conversation.memberships.count(), 2)
+
+        self.conversation.participants.remove(self.other_profile)
+        self.assertEqual(
+            list(self.conversation.memberships.values_list("profile", flat=True)),
+            [self.profile.pk],
+        )
+
+        self.other_profile.conversations.add(self.conversation)
+        self.assertEqual(self.conversation.memberships.count(), 2)
+
+    def test_message_updates_unread_state(self):
+        for body in ["Hello!", "Are you there?"]:
+            InboxMessage.objects.create(
+                sender=self.profile, conversation=self.conversation, body=body
+            )
+
+        self.assertEqual(self.get_membership(self.other_profile).unread_count, 2)
+        sender_membership = self.get_membership(self.profile)
+        self.assertEqual(sender_membership.unread_count, 0)
+        self.assertIsNotNone(sender_membership.last_read_at)
+
+    def test_mark_read(self):
+        InboxMessage.objects.create(
+            sender=self.profile, conversation=self.conversation, body="Hello!"
+        )
+        ConversationMembership.objects.mark_read(self.conversation, self.other_profile)
+
+        membership = self.get_membership(self.other_profile)
+        self.assertEqual(membership.unread_count, 0)
+        self.assertIsNotNone(membership.last_read_at)
+
+    def test_unread_conversation_count_is_cached_and_invalidated(self):
+        manager = ConversationMembership.objects
+        self.assertEqual(manager.unread_conversation_count(self.other_profile), 0)
+
+        InboxMessage.objects.create(
+            sender=self.profile, conversation=self.conversation, body="Hello!"
+        )
+        self.assertEqual(manager.unread_conversation_count(self.other_profile), 1)
+        with self.assertNumQueries(0):
+            manager.unread_conversation_count(self.other_profile)
+
+        manager.mark_read(self.conversation, self.other_profile)
+        self.assertEqual(manager.unread_conversation_count(self.other_profile), 0)
+
+
+class ConversationPairKeyTests(TestCase):
+    def setUp(self):
+        self.profile = Profile.objects.create(
+            user=User.objects.create_user(username="testuser", password="password"),
+            display_name="Test User",
+        )
+        self.other_profile = Profile.objects.create(
+            user=User.objects.create_user(username="otheruser", password="password"),
+            display_name="Other User",
+        )
+
+    def test_get_or_create_between(self):
+        conversation, created = Conversation.objects.get_or_create_between(
+            self.profile, self.other_profile
+        )
+        self.assertTrue(created)
+        self.assertEqual(
+            set(conversation.participants.all()), {self.profile, self.other_profile}
+        )
+
+        # The conversation is found with a single query, whatever the order of the profiles
+        with self.assertNumQueries(1):
+            found, created = Conversation.objects.get_or_create_between(
+                self.other_profile, self.profile
+            )
+        self.assertFalse(created)
+        self.assertEqual(found, conversation)
+
+    def test_pair_key_follows_participants(self):
+        conversation = Conversation.objects.create()
+        conversation.participants.set([self.profile, self.other_profile])
+        conversation.refresh_from_db()
+        self.assertEqual(
+            conversation.pair_key,
+            Conversation.make_pair_key(self.profile.pk, self.other_profile.pk),
+        )
+
+        # A conversation left with a single participant is keyed as the conversation with itself
+        conversation.participants.remove(self.other_profile)
+        conversation.refresh_from_db()
+        self.assertEqual(
+            conversation.pair_key,
+            Conversation.make_pair_key(self.profile.pk, self.profile.pk),
+        )
+
+        conversation.participants.clear()
+        conversation.refresh_from_db()
+        self.assertIsNone(conversation.pair_key)
+
+    def test_conversation_with_itself(self):
+        conversation, created = Conversation.objects.get_or_create_between(
+            self.profile, self.profile
+        )
+        self.assertTrue(created)
+        self.assertEqual(list(conversation.participants.all()), [self.profile])
+
+        # The single participant keeps the key, so the conversation is found again
+        found, created = Conversation.objects.get_or_create_between(
+            self.profile, self.profile
+        )
+        self.assertFalse(created)
+        self.assertEqual(found, conversation)
+
+    def test_pair_key_is_unique(self):
+        conversation, _ = Conversation.objects.get_or_create_between(
+            self.profile, self.other_profile
+        )
+
+        # A second conversation between the same profiles does not take over the key
+        duplicate = Conversation.objects.create()
+        duplicate.participants.set([self.profile, self.other_profile])
+        duplicate.refresh_from_db()
+        self.assertIsNone(duplicate.pair_key)
+
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Conversation.objects.create(pair_key=conversation.pair_key)
+
+    def test_concurrent_creation_returns_existing_conversation(self):
+        existing, _ = Conversation.objects.get_or_create_between(
+            self.profile, self.other_profile
+        )
+
+        # Simulate a concurrent request creating the conversation between the lookup and the creation
+        with mock.patch.object(
+            ConversationQuerySet,
+            "get",
+            side_effect=[Conversation.DoesNotExist, existing],
+        ):
+            conversation, created = Conversation.objects.get_or_create_between(
+                self.profile, self.other_profile
+            )
+
+        self.assertFalse(created)
+        self.assertEqual(conversation, existing)
+        self.assertEqual(Conversation.objects.count(), 1)
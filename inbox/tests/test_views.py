@@ -1,4 +1,7 @@
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from profiles.models import Profile
@@ -114,15 +117,8 @@ class InboxViewsTests(TestCase):
             "This endpoint only accepts HTMX requests.", response.content.decode()
         )
 
-    def test_htmx_required_for_notify_new_message_view(self):
-        response = self.client.get(
-            reverse(
-                "inbox:notify_newmessage",
-                kwargs={
-                    "conversation_pk": self.conversation.pk,
-                },
-            ),
-        )
+    def test_htmx_required_for_notify_conversations_view(self):
+        response = self.client.get(reverse("inbox:notify_conversations"))
         self.assertEqual(response.status_code, 400)
         self.assertIn(
             "This endpoint only accepts HTMX requests.", response.content.decode()
@@ -175,6 +171,23 @@ class InboxViewsTests(TestCase):
         # Assert that the body of the latest message is "Hello!"
         self.assertEqual(latest_message.body, "Hello!")
 
+    def test_messages_to_own_profile_share_a_conversation(self):
+        url = reverse(
+            "inbox:inbox_createmessage", kwargs={"profile_slug": self.profile.slug}
+        )
+        first = self.client.post(url, HTTP_HX_REQUEST="true", data={"body": "Note"})
+        second = self.client.post(url, HTTP_HX_REQUEST="true", data={"body": "Again"})
+
+        self.assertEqual(first.status_code, 302)
+        self.assertEqual(second.url, first.url)
+        self.assertEqual(
+            InboxMessage.objects.filter(body__in=["Note", "Again"])
+            .values("conversation")
+            .distinct()
+            .count(),
+            1,
+        )
+
     def test_create_reply_view_get(self):
         url = reverse(
             "inbox:inbox_createreply", kwargs={"conversation_pk": self.conversation.pk}
@@ -212,22 +225,55 @@ class InboxViewsTests(TestCase):
         # Assert that the body of the latest message is "Hello!"
         self.assertEqual(latest_message.body, "Reply!")
 
-    def test_notify_new_message_view(self):
+    def test_notify_conversations_view(self):
         # Create a new unread message in the conversation
         new_message = InboxMessage.objects.create(
             sender=self.other_profile,
             conversation=self.conversation,
             body="New message",
         )
-        self.conversation.is_seen = False
-        self.conversation.save()
 
-        url = reverse(
-            "inbox:notify_newmessage", kwargs={"conversation_pk": self.conversation.pk}
+        response = self.client.get(
+            reverse("inbox:notify_conversations"), HTTP_HX_REQUEST="true"
         )
-        response = self.client.get(url, HTTP_HX_REQUEST="true")
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "inbox/notify_icon.html")
+        self.assertContains(
+            response, f'id="notify-conversation-{self.conversation.pk}"'
+        )
+
+    def test_inbox_view_renders_new_message_indicator(self):
+        InboxMessage.objects.create(
+            sender=self.other_profile,
+            conversation=self.conversation,
+            body="New message",
+        )
+
+        response = self.client.get(reverse("inbox:inbox"))
+        self.assertTemplateUsed(response, "inbox/notify_icon.html")
+        self.assertEqual(response.context["my_conversations"][0].unread_count, 1)
+
+    def test_inbox_view_query_count_does_not_grow_with_conversations(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse("inbox:inbox"))
+            return len(queries)
+
+        few_conversations = count_queries()
+        for i in range(10):
+            other_user = User.objects.create_user(
+                username=f"user{i}", password="password"
+            )
+            other_profile = Profile.objects.create(
+                user=other_user, display_name=f"User {i}"
+            )
+            conversation = Conversation.objects.create()
+            conversation.participants.set([self.profile, other_profile])
+            InboxMessage.objects.create(
+                sender=other_profile, conversation=conversation, body="Hello!"
+            )
+
+        self.assertEqual(count_queries(), few_conversations)
 
     def test_notify_inbox_view(self):
         # Create a new unread message in the conversation
@@ -245,3 +291,153 @@ class InboxViewsTests(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "inbox/notify_icon.html")
+
+
+class NotifyInboxQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=self.user, display_name="Test User")
+        self.client.login(username="testuser", password="password")
+        self.profile_count = 0
+
+    def add_conversations(self, count):
+        """Adds conversations with an unread message from another profile."""
+        for _ in range(count):
+            self.profile_count += 1
+            other_user = User.objects.create_user(
+                username=f"otheruser{self.profile_count}", password="password"
+            )
+            other_profile = Profile.objects.create(
+                user=other_user, display_name=f"Other User {self.profile_count}"
+            )
+            conversation = Conversation.objects.create()
+            conversation.participants.set([self.profile, other_profile])
+            InboxMessage.objects.create(
+                sender=other_profile, conversation=conversation, body="Hello!"
+            )
+
+    def count_queries(self):
+        """Returns the number of queries of an uncached inbox badge request."""
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("inbox:notify_inbox"), HTTP_HX_REQUEST="true"
+            )
+        self.assertTemplateUsed(response, "inbox/notify_icon.html")
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_conversations(self):
+        self.add_conversations(2)
+        few_conversations = self.count_queries()
+
+        self.add_conversations(30)
+        self.assertEqual(self.count_queries(), few_conversations)
+
+    def test_read_conversation_clears_badge(self):
+        self.add_conversations(1)
+        conversation = Conversation.objects.get()
+
+        self.client.get(
+            reverse("inbox:inbox_detail", kwargs={"conversation_pk": conversation.pk})
+        )
+        response = self.client.get(
+            reverse("inbox:notify_inbox"), HTTP_HX_REQUEST="true"
+        )
+        self.assertEqual(response.content, b"")
+
+
+@override_settings(INBOX_PAGE_SIZE=3)
+class InboxMessagesWindowTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=self.user, display_name="Test User")
+        self.client.login(username="testuser", password="password")
+        self.other_profile = Profile.objects.create(
+            user=User.objects.create_user(username="otheruser", password="password"),
+            display_name="Other User",
+        )
+        self.conversation, _ = Conversation.objects.get_or_create_between(
+            self.profile, self.other_profile
+        )
+        self.add_messages(5)
+
+    def add_messages(self, count):
+        start = self.conversation.messages.count()
+        for i in range(start, start + count):
+            InboxMessage.objects.create(
+                sender=self.other_profile,
+                conversation=self.conversation,
+                body=f"Message number {i}.",
+            )
+
+    def detail_url(self):
+        return reverse(
+            "inbox:inbox_detail", kwargs={"conversation_pk": self.conversation.pk}
+        )
+
+    def test_detail_view_renders_latest_messages(self):
+        response = self.client.get(self.detail_url())
+
+        self.assertEqual(
+            [message.body for message in response.context["conversation_messages"]],
+            ["Message number 2.", "Message number 3.", "Message number 4."],
+        )
+        self.assertNotContains(response, "Message number 1.")
+        self.assertContains(response, "Load earlier messages")
+
+    def test_load_earlier_messages(self):
+        response = self.client.get(self.detail_url())
+        cursor = response.context["messages_page"].next_cursor
+
+        response = self.client.get(
+            reverse(
+                "inbox:inbox_messages", kwargs={"conversation_pk": self.conversation.pk}
+            ),
+            {"cursor": cursor},
+            HTTP_HX_REQUEST="true",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Message number 0.")
+        self.assertContains(response, "Message number 1.")
+        self.assertNotContains(response, "Message number 2.")
+        self.assertNotContains(response, "Load earlier messages")
+
+    def test_load_earlier_messages_requires_participant(self):
+        other_conversation, _ = Conversation.objects.get_or_create_between(
+            self.other_profile,
+            Profile.objects.create(
+                user=User.objects.create_user(username="third", password="password"),
+                display_name="Third User",
+            ),
+        )
+
+        response = self.client.get(
+            reverse(
+                "inbox:inbox_messages",
+                kwargs={"conversation_pk": other_conversation.pk},
+            ),
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_load_earlier_messages_invalid_cursor(self):
+        response = self.client.get(
+            reverse(
+                "inbox:inbox_messages", kwargs={"conversation_pk": self.conversation.pk}
+            ),
+            {"cursor": "not-a-cursor"},
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_detail_view_query_count_does_not_grow_with_messages(self):
+        def count_queries():
+            self.client.get(self.detail_url())
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(self.detail_url())
+            return len(queries)
+
+        few_messages = count_queries()
+        self.add_messages(20)
+        self.assertEqual(count_queries(), few_messages)
@@ -2,17 +2,24 @@ from django.urls import path
 from .views import (
     InboxView,
     InboxDetailView,
+    InboxMessagesView,
     SearchProfilesView,
     CreateMessageView,
     CreateReplyView,
-    NotifyNewMessageView,
+    NotifyConversationsView,
     NotifyInboxView,
+    InboxEventsView,
 )
 
 app_name = "inbox"
 urlpatterns = [
     path("", InboxView.as_view(), name="inbox"),
     path("<int:conversation_pk>/", InboxDetailView.as_view(), name="inbox_detail"),
+    path(
+        "<int:conversation_pk>/messages/",
+        InboxMessagesView.as_view(),
+        name="inbox_messages",
+    ),
     path("search-profiles/", SearchProfilesView.as_view(), name="inbox_searchprofiles"),
     path(
         "create-message/<slug:profile_slug>/",
@@ -25,9 +32,10 @@ urlpatterns = [
         name="inbox_createreply",
     ),
     path(
-        "notify/<int:conversation_pk>/",
-        NotifyNewMessageView.as_view(),
-        name="notify_newmessage",
+        "notify-conversations/",
+        NotifyConversationsView.as_view(),
+        name="notify_conversations",
     ),
     path("notify-inbox/", NotifyInboxView.as_view(), name="notify_inbox"),
+    path("events/", InboxEventsView.as_view(), name="inbox_events"),
 ]
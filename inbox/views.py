@@ -1,12 +1,23 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Conversation, InboxMessage
+from .models import Conversation, ConversationMembership, InboxMessage
 from profiles.models import Profile
 from django.views import View
 from django.views.generic import ListView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from profiles.mixins import ProfileRequiredMixin
-from django.http import HttpResponse
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
+from django.db.models import Prefetch
+from core.pagination import InvalidCursor
 from .forms import InboxCreateMessageForm
+from .events import format_event, get_broker, profile_channel
 from django.utils import timezone
 
 
@@ -30,9 +41,10 @@ class InboxView(LoginRequiredMixin, ProfileRequiredMixin, ListView):
 
         context = super().get_context_data(**kwargs)
 
-        # Retrieve the conversations where the current user's profile is a participant.
-        context["my_conversations"] = Conversation.objects.filter(
-            participants=self.request.user.profile
+        # Retrieve the conversations where the current user's profile is a participant,
+        # with their unread state for the new message indicators.
+        context["my_conversations"] = Conversation.objects.for_inbox(
+            self.request.user.profile
         )
         return context
 
@@ -61,8 +73,11 @@ class InboxDetailView(LoginRequiredMixin, ProfileRequiredMixin, DetailView):
         Ensures that the user only accesses conversations they are a participant in.
         """
         # Filter conversations to include only those where the current user's profile is a participant.
+        # The participants are prefetched with the fields rendered in the conversation header.
         my_conversations = Conversation.objects.filter(
             participants=self.request.user.profile
+        ).prefetch_related(
+            Prefetch("participants", queryset=Profile.objects.for_cards())
         )
 
         # Retrieve the specific conversation based on the primary key from the URL, ensuring the user is a participant.
@@ -81,29 +96,74 @@ class InboxDetailView(LoginRequiredMixin, ProfileRequiredMixin, DetailView):
         # Initialize the base context provided by the superclass.
         context = super().get_context_data(**kwargs)
 
-        # Retrieve the conversation object for the current view.
-        conversation = self.get_object()
+        # The conversation object retrieved by DetailView for the current view.
+        conversation = self.object
 
-        # Get the latest message in the conversation.
-        latest_message = conversation.messages.first()
+        # Only the latest messages are loaded, earlier ones are loaded on demand by InboxMessagesView
+        messages_page = conversation.get_messages_page()
+        context["messages_page"] = messages_page
+        context["conversation_messages"] = list(reversed(messages_page))
 
         # Mark conversation as seen if it hasn't been seen and the latest message is not from the current user
+        latest_message = messages_page[0] if messages_page else None
         if (
             not conversation.is_seen
-            and latest_message.sender != self.request.user.profile
+            and latest_message is not None
+            and latest_message.sender_id != self.request.user.profile.pk
         ):
             conversation.is_seen = True
-            conversation.save()
+            conversation.save(update_fields=["is_seen"])
 
-        # Add the user's conversations to the context.
-        context["my_conversations"] = Conversation.objects.filter(
-            participants=self.request.user.profile
+        # Reset the unread state of the current user for this conversation
+        ConversationMembership.objects.mark_read(
+            conversation, self.request.user.profile
+        )
+
+        # Add the user's conversations to the context, with their unread state for the new message indicators.
+        context["my_conversations"] = Conversation.objects.for_inbox(
+            self.request.user.profile
         )
 
         # Return the updated context to be used in the template.
         return context
 
 
+class InboxMessagesView(LoginRequiredMixin, ProfileRequiredMixin, View):
+    """
+    View to load earlier messages of a conversation ("Load earlier messages" button).
+    Requires the user to be logged in and to have a profile.
+    """
+
+    def get(self, request, conversation_pk):
+        """
+        Handles HTMX GET requests for the window of messages before the given cursor.
+        """
+        # Check if the request is an HTMX request by looking for the "HX-Request" header.
+        if not request.headers.get("HX-Request"):
+            return HttpResponse("This endpoint only accepts HTMX requests.", status=400)
+
+        # Retrieve the conversation, ensuring the current user is a participant.
+        conversation = get_object_or_404(
+            Conversation.objects.filter(participants=request.user.profile),
+            id=conversation_pk,
+        )
+
+        # Keyset pagination, so the earliest messages of a long conversation cost the same as the latest ones
+        try:
+            messages_page = conversation.get_messages_page(request.GET.get("cursor"))
+        except InvalidCursor:
+            return HttpResponseBadRequest("Invalid cursor.")
+
+        context = {
+            "conversation": conversation,
+            "messages_page": messages_page,
+            "conversation_messages": list(reversed(messages_page)),
+        }
+        return render(
+            request, "inbox/inbox_conversation.html#conversation_messages", context
+        )
+
+
 class SearchProfilesView(ListView):
     """
     Search profiles view for displaying list of profiles when creating a new message.
@@ -129,11 +189,11 @@ class SearchProfilesView(ListView):
 
         # If the search term is provided, filter profiles by display name, excluding the current user's profile.
         if len(letters) > 0:
-            return Profile.objects.filter(display_name__icontains=letters).exclude(
-                display_name=self.request.user.profile.display_name
-            )[
-                :5
-            ]  # Limit results to the first 5 profiles.
+            return (
+                Profile.objects.for_cards()
+                .filter(display_name__icontains=letters)
+                .exclude(display_name=self.request.user.profile.display_name)[:5]
+            )  # Limit results to the first 5 profiles.
 
         # If no search term is provided, return an empty queryset.
         else:
@@ -222,37 +282,23 @@ class CreateMessageView(LoginRequiredMixin, ProfileRequiredMixin, View):
             # Assign the sender of the message to the current user's profile.
             message.sender = request.user.profile
 
-            # Retrieve all conversations involving the current user.
-            my_conversations = request.user.profile.conversations.all()
-
-            # Check if there is an existing conversation with the recipient.
-            for c in my_conversations:
-                if self.recipient in c.participants.all():
-                    # If a conversation exists, assign the message to this conversation.
-                    message.conversation = c
-                    message.save()
+            # Find the conversation with the recipient with a single indexed lookup,
+            # or create it atomically if they have not talked yet.
+            conversation, created = Conversation.objects.get_or_create_between(
+                request.user.profile, self.recipient
+            )
 
-                    # Update the conversation's metadata.
-                    c.lastmessage_created = timezone.now()
-                    c.is_seen = False  # Set the conversation is_seen = false since only the sender will see the message first, not the recipient
-                    c.save()
-
-                    # Redirect to the conversation detail page.
-                    return redirect("inbox:inbox_detail", conversation_pk=c.pk)
-
-            # If no conversation exists, create a new one.
-            new_conversation = Conversation.objects.create()
-
-            # Add both the current user and the recipient to the conversation.
-            new_conversation.participants.add(request.user.profile, self.recipient)
-            new_conversation.save()
-
-            # Assign the message to the new conversation.
-            message.conversation = new_conversation
+            # Assign the message to the conversation.
+            message.conversation = conversation
             message.save()
 
-            # Redirect to the new conversation's detail page.
-            return redirect("inbox:inbox_detail", conversation_pk=new_conversation.pk)
+            # Update the conversation's metadata.
+            conversation.lastmessage_created = timezone.now()
+            conversation.is_seen = False  # Set the conversation is_seen = false since only the sender will see the message first, not the recipient
+            conversation.save(update_fields=["lastmessage_created", "is_seen"])
+
+            # Redirect to the conversation detail page.
+            return redirect("inbox:inbox_detail", conversation_pk=conversation.pk)
 
         # If the form is invalid, prepare the context and re-render the form with errors.
         context = {
@@ -356,38 +402,29 @@ class CreateReplyView(LoginRequiredMixin, ProfileRequiredMixin, View):
         return render(request, self.template_name, context)
 
 
-class NotifyNewMessageView(LoginRequiredMixin, ProfileRequiredMixin, View):
+class NotifyConversationsView(LoginRequiredMixin, ProfileRequiredMixin, View):
     """
-    View to notify the user of a new unread message in a conversation.
+    View to refresh the new message indicators of all the conversations in the inbox conversation list at once.
     Requires the user to be logged in and to have a profile.
     """
 
-    def get(self, request, conversation_pk):
+    def get(self, request):
         """
-        Handles GET requests to check for new unread messages in a conversation.
-        Only processes HTMX requests.
+        Handles GET requests to refresh the new message indicators.
+        Only processes HTMX requests, the indicators are swapped out of band into the conversation list.
         """
         # Check if the request is an HTMX request by looking for the "HX-Request" header.
         # If not, return error 400
         if not request.headers.get("HX-Request"):
             return HttpResponse("This endpoint only accepts HTMX requests.", status=400)
 
-        # Retrieve the conversation object based on the primary key (conversation_pk) from the URL.
-        conversation = get_object_or_404(Conversation, id=conversation_pk)
-
-        # Get the latest message in the conversation.
-        latest_message = conversation.messages.first()
-
-        # Check if the conversation has not been seen by the recipient and the latest message is not from the current user.
-        if (
-            conversation.is_seen == False
-            and latest_message.sender != request.user.profile
-        ):
-            # If conditions are met, render the notify icon template to indicate a new unread message.
-            return render(request, "inbox/notify_icon.html")
-        else:
-            # If conditions are not met, return an empty HTTP response.
-            return HttpResponse("")
+        # Retrieve the conversations of the current user with their unread state, in a single query.
+        context = {
+            "my_conversations": Conversation.objects.for_inbox(
+                request.user.profile
+            ).prefetch_related(None)
+        }
+        return render(request, "inbox/notify_conversations.html", context)
 
 
 class NotifyInboxView(LoginRequiredMixin, ProfileRequiredMixin, View):
@@ -405,20 +442,77 @@ class NotifyInboxView(LoginRequiredMixin, ProfileRequiredMixin, View):
         if not request.headers.get("HX-Request"):
             return HttpResponse("This endpoint only accepts HTMX requests.", status=400)
 
-        # Retrieve all conversations where the current user's profile is a participant and the conversation is not seen.
-        my_conversations = Conversation.objects.filter(
-            participants=request.user.profile, is_seen=False
+        # Look up the number of conversations with unread messages of the current user,
+        # kept up to date when messages are sent and read, so no messages are inspected here.
+        unread_count = ConversationMembership.objects.unread_conversation_count(
+            request.user.profile
         )
 
-        # Iterate through the user's unseen conversations to check if there are any unread messages.
-        for c in my_conversations:
-            # Get the latest message in the conversation.
-            latest_message = c.messages.first()
-
-            # Check if the latest message was sent by someone other than the current user.
-            if latest_message.sender != request.user.profile:
-                # If there is an unread message from another participant, render the notify icon template.
-                return render(request, "inbox/notify_icon.html")
+        # If there are unread messages, render the notify icon template.
+        if unread_count:
+            return render(request, "inbox/notify_icon.html")
 
         # If no unread messages are found, return an empty HTTP response.
         return HttpResponse("")
+
+
+class InboxEventsView(View):
+    """
+    Server-Sent Events stream of the inbox events of the logged-in user, pushing new messages and unread counts.
+    Asynchronous so an open stream does not hold a worker thread when served with ASGI.
+    The stream is closed after INBOX_EVENTS_STREAM_TIMEOUT seconds, the browser reconnects automatically.
+    Only available if INBOX_EVENTS_ENABLED is set, on ASGI deployments.
+    """
+
+    async def get(self, request):
+        """
+        Handles GET requests by opening the event stream of the current user's profile.
+        """
+        if not settings.INBOX_EVENTS_ENABLED:
+            raise Http404("The inbox events are disabled.")
+
+        # The login and profile checks hit the database, which is only accessible synchronously
+        profile = await sync_to_async(self.get_profile)(request)
+        if profile is None:
+            return HttpResponse("Login with a profile required.", status=403)
+
+        response = StreamingHttpResponse(
+            self.stream(profile), content_type="text/event-stream"
+        )
+        # Disable caching and proxy buffering so events are delivered immediately
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def get_profile(self, request):
+        """
+        Returns the profile of the logged-in user, or None if the user is anonymous or has no profile.
+        """
+        if request.user.is_authenticated and hasattr(request.user, "profile"):
+            return request.user.profile
+        return None
+
+    async def stream(self, profile):
+        """
+        Yields the events published to the profile until the stream times out,
+        with keep alive comments in between so idle connections are not dropped.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.INBOX_EVENTS_STREAM_TIMEOUT
+
+        async with get_broker().subscribe(profile_channel(profile.pk)) as queue:
+            # Start with the current unread count, so the badge is right after a reconnect
+            count = await sync_to_async(
+                ConversationMembership.objects.unread_conversation_count
+            )(profile)
+            yield format_event({"type": "unread", "count": count})
+
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), min(remaining, settings.INBOX_EVENTS_KEEPALIVE)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(event)
@@ -0,0 +1,35 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    """
+    Admin class for inspecting the background jobs, mostly the failed ones, and queueing them again.
+    """
+
+    list_display = ("name", "status", "attempts", "max_attempts", "run_at", "created")
+    list_filter = ("status", "name")
+    search_fields = ("name", "last_error")
+    readonly_fields = (
+        "name",
+        "args",
+        "kwargs",
+        "attempts",
+        "locked_by",
+        "locked_at",
+        "last_error",
+        "created",
+    )
+    actions = ["retry"]
+
+    @admin.action(description="Queue the selected jobs again")
+    def retry(self, request, queryset):
+        count = queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, attempts=0, run_at=timezone.now()
+        )
+        self.message_user(request, f"{count} jobs queued again.")
+
+
+admin.site.register(Job, JobAdmin)
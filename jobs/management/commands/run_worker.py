@@ -0,0 +1,71 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import get_worker_name, requeue_stale, run_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the background jobs (picture derivatives, emails, file deletions...) as they are queued, "
+        "several workers can run side by side"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the jobs which are due then exit, instead of waiting for new ones",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10,
+            help="Number of jobs claimed at once (default: 10)",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=None,
+            help="Seconds to wait when no job is due (default: JOBS_POLL_INTERVAL)",
+        )
+
+    def handle(self, *args, **options):
+        sleep = options["sleep"]
+        if sleep is None:
+            sleep = getattr(settings, "JOBS_POLL_INTERVAL", 1)
+        worker = get_worker_name()
+
+        # Finish the claimed jobs before stopping on Ctrl+C or SIGTERM (e.g. on deploys)
+        self.stopping = False
+
+        def stop(signum, frame):
+            self.stopping = True
+
+        if not options["once"]:
+            signal.signal(signal.SIGINT, stop)
+            signal.signal(signal.SIGTERM, stop)
+            self.stdout.write(f"Worker {worker} waiting for jobs...")
+
+        total = 0
+        while not self.stopping:
+            # Release the jobs of the workers that died
+            requeue_stale()
+            count = run_pending(
+                worker,
+                batch_size=options["batch_size"],
+                max_jobs=options["batch_size"],
+            )
+            total += count
+            if count:
+                continue
+            if options["once"]:
+                break
+            # Drop the connections broken or expired while idle, as requests do
+            close_old_connections()
+            time.sleep(sleep)
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully ran {total} jobs"))
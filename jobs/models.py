@@ -0,0 +1,50 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Model to store the background jobs, the work taken off the request path (see jobs.queue).
+    Jobs are run by the `run_worker` command, which claims the queued ones whose time has come.
+    Succeeded jobs are deleted, failed ones are kept with their last error.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (FAILED, "Failed"),
+    ]
+
+    # Dotted path of the task function, e.g. "profiles.images.update_picture_derivatives"
+    name = models.CharField(max_length=255)
+    args = models.JSONField(default=list, blank=True, encoder=DjangoJSONEncoder)
+    kwargs = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    # The job is not run before this time, pushed back after each failed attempt
+    run_at = models.DateTimeField(default=timezone.now)
+
+    # Worker running the job and since when, to requeue the jobs of workers that died
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["run_at", "pk"]
+        indexes = [
+            # The workers look for the queued jobs which are due
+            models.Index(
+                fields=["status", "run_at"], name="jobs_job_status_run_at_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
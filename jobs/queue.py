@@ -0,0 +1,254 @@
+import functools
+import json
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Defaults of the tasks: number of attempts before a job is marked failed,
+# seconds before the first retry (doubled at each retry) and the longest wait between retries
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF = 10
+MAX_BACKOFF = 60 * 60
+
+# Tasks created by the `job` decorator, by name
+_registry = {}
+
+
+class Task:
+    """
+    A function run in the background by the workers, created by the `job` decorator.
+    Calling the task runs the function right away, `delay()` queues it.
+    """
+
+    def __init__(self, function, name, max_attempts, backoff):
+        functools.update_wrapper(self, function)
+        self.function = function
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+    def __call__(self, *args, **kwargs):
+        return self.function(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        """
+        Queues the task with the given arguments (see enqueue)
+        """
+
+        return self.enqueue(args, kwargs)
+
+    def enqueue(self, args=(), kwargs=None, countdown=0):
+        """
+        Queues the task with the given arguments, which must be JSON serializable, to run in `countdown` seconds.
+        Returns the queued job.
+
+        The job is inserted in the current transaction, so the workers only see it once it is committed
+        and never run it against data they cannot read yet. In eager mode (JOBS_EAGER) the task is run
+        right away instead and None is returned.
+        """
+
+        # The arguments go through JSON in both modes, so eager mode fails on what workers could not run
+        args, kwargs = json.loads(
+            json.dumps([list(args), kwargs or {}], cls=DjangoJSONEncoder)
+        )
+        if getattr(settings, "JOBS_EAGER", False):
+            self.function(*args, **kwargs)
+            return None
+
+        return Job.objects.create(
+            name=self.name,
+            args=args,
+            kwargs=kwargs,
+            max_attempts=self.max_attempts,
+            run_at=timezone.now() + timedelta(seconds=countdown),
+        )
+
+
+def job(
+    function=None,
+    *,
+    name=None,
+    max_attempts=DEFAULT_MAX_ATTEMPTS,
+    backoff=DEFAULT_BACKOFF,
+):
+    """
+    Decorator turning a function into a task which can be queued with `delay()` and run by the workers:
+
+        @job(max_attempts=3)
+        def update_picture_derivatives(profile_pk, field_name): ...
+
+        update_picture_derivatives.delay(profile.pk, "profile_picture")
+
+    Failed jobs are retried up to `max_attempts` times, `backoff` seconds after the first failure
+    then twice as long after each one. Jobs may run more than once, tasks should be safe to repeat.
+    """
+
+    def decorator(function):
+        task_name = name or f"{function.__module__}.{function.__qualname__}"
+        task = Task(function, task_name, max_attempts, backoff)
+        _registry[task_name] = task
+        return task
+
+    if function is not None:
+        return decorator(function)
+    return decorator
+
+
+def get_retry_delay(backoff, attempts):
+    """
+    Returns the seconds to wait before retrying a job which failed `attempts` times
+    """
+
+    return min(backoff * 2 ** (attempts - 1), MAX_BACKOFF)
+
+
+def get_task(name):
+    """
+    Returns the task of the given name, importing its module if it is not registered yet
+    (the worker only imports the modules of the jobs it runs).
+    """
+
+    if name not in _registry:
+        import_module(name.rpartition(".")[0])
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"Unknown task {name!r}") from None
+
+
+def get_worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(worker, limit=1):
+    """
+    Claims up to `limit` queued jobs which are due for the worker, marks them running and returns them.
+
+    The jobs are selected with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent workers skip the rows
+    another one is claiming instead of waiting for it. Each job is then only claimed if it is still queued,
+    which also keeps the workers apart on databases without row locks (SQLite).
+    """
+
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        jobs = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED, run_at__lte=now)
+            .order_by("run_at", "pk")[:limit]
+        )
+        for job in jobs:
+            updated = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+                status=Job.RUNNING,
+                locked_by=worker,
+                locked_at=now,
+                attempts=F("attempts") + 1,
+            )
+            if updated:
+                job.status = Job.RUNNING
+                job.locked_by = worker
+                job.locked_at = now
+                job.attempts += 1
+                claimed.append(job)
+    return claimed
+
+
+def run_job(job):
+    """
+    Runs a claimed job. Returns True if it succeeded, in which case it is deleted,
+    otherwise it is queued again after the backoff delay of its task, or marked failed once out of attempts.
+    """
+
+    task = None
+    try:
+        task = get_task(job.name)
+        task.function(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error(
+                "Job %s #%s failed after %s attempts",
+                job.name,
+                job.pk,
+                job.attempts,
+                exc_info=True,
+            )
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.FAILED, locked_by="", locked_at=None, last_error=error
+            )
+        else:
+            delay = get_retry_delay(
+                task.backoff if task else DEFAULT_BACKOFF, job.attempts
+            )
+            logger.warning(
+                "Job %s #%s failed, retrying in %s seconds",
+                job.name,
+                job.pk,
+                delay,
+                exc_info=True,
+            )
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED,
+                locked_by="",
+                locked_at=None,
+                run_at=timezone.now() + timedelta(seconds=delay),
+                last_error=error,
+            )
+        return False
+
+    Job.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def requeue_stale(timeout=None):
+    """
+    Queues again the jobs running for longer than `timeout` seconds (JOBS_LOCK_TIMEOUT),
+    whose worker most likely died, or marks them failed if they are out of attempts.
+    Returns the number of jobs released.
+    """
+
+    if timeout is None:
+        timeout = getattr(settings, "JOBS_LOCK_TIMEOUT", 60 * 10)
+    stale = Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=timezone.now() - timedelta(seconds=timeout)
+    )
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED,
+        locked_by="",
+        locked_at=None,
+        last_error="The worker running the job stopped",
+    )
+    requeued = stale.update(status=Job.QUEUED, locked_by="", locked_at=None)
+    return failed + requeued
+
+
+def run_pending(worker=None, batch_size=10, max_jobs=None):
+    """
+    Runs the jobs which are due until there are none left (or `max_jobs` were run).
+    Returns the number of jobs run.
+    """
+
+    worker = worker or get_worker_name()
+    count = 0
+    while max_jobs is None or count < max_jobs:
+        limit = batch_size if max_jobs is None else min(batch_size, max_jobs - count)
+        jobs = claim(worker, limit)
+        if not jobs:
+            break
+        for job in jobs:
+            run_job(job)
+            count += 1
+    return count
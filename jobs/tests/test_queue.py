@@ -0,0 +1,136 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import claim, job, requeue_stale, run_job, run_pending
+
+# Arguments of the calls of the test tasks
+calls = []
+
+
+@job
+def record(*args, **kwargs):
+    calls.append((args, kwargs))
+
+
+@job(max_attempts=2, backoff=30)
+def fail():
+    raise RuntimeError("Failed on purpose")
+
+
+@override_settings(JOBS_EAGER=False)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_delay_queues_a_job(self):
+        queued = record.delay(1, "two", three=3)
+
+        self.assertEqual(calls, [])
+        queued.refresh_from_db()
+        self.assertEqual(queued.name, "jobs.tests.test_queue.record")
+        self.assertEqual(queued.args, [1, "two"])
+        self.assertEqual(queued.kwargs, {"three": 3})
+        self.assertEqual(queued.status, Job.QUEUED)
+
+        # Calling the task runs it right away
+        record(4)
+        self.assertEqual(calls, [((4,), {})])
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_mode_runs_right_away(self):
+        self.assertIsNone(record.delay(1, three=3))
+        self.assertEqual(calls, [((1,), {"three": 3})])
+        self.assertFalse(Job.objects.exists())
+
+        # The arguments must be serializable as they would be for the workers
+        with self.assertRaises(TypeError):
+            record.delay(object())
+
+    def test_claim(self):
+        first = record.delay(1)
+        second = record.delay(2)
+        record.enqueue([3], countdown=60)
+
+        claimed = claim("worker-1", limit=5)
+        self.assertEqual([job.pk for job in claimed], [first.pk, second.pk])
+        first.refresh_from_db()
+        self.assertEqual(first.status, Job.RUNNING)
+        self.assertEqual(first.attempts, 1)
+        self.assertEqual(first.locked_by, "worker-1")
+
+        # Running and future jobs are not claimed
+        self.assertEqual(claim("worker-2", limit=5), [])
+
+    def test_run_pending(self):
+        record.delay(1)
+        record.delay(2)
+
+        self.assertEqual(run_pending(batch_size=1), 2)
+        self.assertEqual(calls, [((1,), {}), ((2,), {})])
+        # Succeeded jobs are deleted
+        self.assertFalse(Job.objects.exists())
+
+    def test_failed_jobs_are_retried_with_backoff(self):
+        queued = fail.delay()
+
+        with self.assertLogs("jobs.queue", "WARNING"):
+            self.assertFalse(run_job(claim("worker")[0]))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.QUEUED)
+        self.assertIn("Failed on purpose", queued.last_error)
+        self.assertAlmostEqual(
+            (queued.run_at - timezone.now()).total_seconds(), 30, delta=5
+        )
+        # Not due yet
+        self.assertEqual(claim("worker"), [])
+
+        # The last attempt marks the job failed
+        Job.objects.update(run_at=timezone.now())
+        with self.assertLogs("jobs.queue", "ERROR"):
+            run_job(claim("worker")[0])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.FAILED)
+        self.assertEqual(queued.attempts, 2)
+
+    def test_unknown_tasks_fail(self):
+        queued = Job.objects.create(
+            name="jobs.tests.test_queue.missing", max_attempts=1
+        )
+
+        with self.assertLogs("jobs.queue", "ERROR"):
+            run_job(claim("worker")[0])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.FAILED)
+        self.assertIn("Unknown task", queued.last_error)
+
+    def test_requeue_stale(self):
+        record.delay(1)
+        fail.delay()
+        claim("worker", limit=2)
+        Job.objects.filter(name__endswith="fail").update(attempts=2)
+
+        self.assertEqual(requeue_stale(timeout=60), 0)
+        Job.objects.update(locked_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(requeue_stale(timeout=60), 2)
+
+        self.assertEqual(
+            dict(Job.objects.values_list("name", "status")),
+            {
+                "jobs.tests.test_queue.record": Job.QUEUED,
+                "jobs.tests.test_queue.fail": Job.FAILED,
+            },
+        )
+
+    def test_run_worker_command(self):
+        record.delay(1)
+        record.delay(2)
+
+        out = StringIO()
+        call_command("run_worker", once=True, batch_size=1, stdout=out)
+        self.assertEqual(len(calls), 2)
+        self.assertIn("Successfully ran 2 jobs", out.getvalue())
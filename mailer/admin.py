@@ -0,0 +1,37 @@
+from django.contrib import admin
+from django.db import transaction
+from django.utils import timezone
+
+from .delivery import schedule_delivery
+from .models import OutgoingEmail
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """
+    Admin class for inspecting the emails waiting in the outbox, mostly the undelivered ones, and queueing them again.
+    """
+
+    list_display = ("subject", "recipients", "status", "attempts", "run_at", "created")
+    list_filter = ("status",)
+    search_fields = ("subject", "recipients", "last_error")
+    readonly_fields = (
+        "subject",
+        "recipients",
+        "data",
+        "attempts",
+        "locked_at",
+        "last_error",
+        "created",
+    )
+    actions = ["retry"]
+
+    @admin.action(description="Queue the selected emails again")
+    def retry(self, request, queryset):
+        count = queryset.exclude(status=OutgoingEmail.SENDING).update(
+            status=OutgoingEmail.QUEUED, attempts=0, run_at=timezone.now()
+        )
+        transaction.on_commit(schedule_delivery)
+        self.message_user(request, f"{count} emails queued again.")
+
+
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
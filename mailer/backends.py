@@ -0,0 +1,33 @@
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+
+from .delivery import schedule_delivery
+from .models import OutgoingEmail
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Email backend storing the messages in the outbox and returning right away,
+    so the requests sending emails (signups, confirmations, password resets...) do not wait for the SMTP server.
+
+    The messages are stored in the current transaction, and a job delivering them (see mailer.delivery)
+    is queued once it is committed, run by the `run_worker` command through OUTBOX_DELIVERY_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        try:
+            emails = [
+                OutgoingEmail.from_message(message)
+                for message in email_messages
+                if message.recipients()
+            ]
+        except ValueError:
+            if not self.fail_silently:
+                raise
+            return 0
+        if not emails:
+            return 0
+
+        OutgoingEmail.objects.bulk_create(emails)
+        transaction.on_commit(schedule_delivery)
+        return len(emails)
@@ -0,0 +1,203 @@
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import get_retry_delay, job
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+# Errors of the SMTP server about a message (refused sender, recipients or data),
+# the connection can still be used for the next messages
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException)
+
+
+def is_permanent(error):
+    """
+    Returns True if the SMTP server rejected the message for good (5xx replies),
+    in which case sending it again would fail the same way.
+    """
+
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+    else:
+        codes = [getattr(error, "smtp_code", 0)]
+    return bool(codes) and all(code >= 500 for code in codes)
+
+
+def claim_emails(limit):
+    """
+    Claims up to `limit` queued emails which are due, marks them sending and returns them.
+    As for the jobs (see jobs.queue.claim), the rows are selected with SKIP LOCKED and only claimed
+    if they are still queued, so concurrent senders never send an email twice.
+    """
+
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        emails = (
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutgoingEmail.QUEUED, run_at__lte=now)
+            .order_by("run_at", "pk")[:limit]
+        )
+        for email in emails:
+            updated = OutgoingEmail.objects.filter(
+                pk=email.pk, status=OutgoingEmail.QUEUED
+            ).update(status=OutgoingEmail.SENDING, locked_at=now)
+            if updated:
+                claimed.append(email)
+    return claimed
+
+
+def release(emails):
+    """
+    Queues again emails which were claimed but not sent
+    """
+
+    OutgoingEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+        status=OutgoingEmail.QUEUED, locked_at=None
+    )
+
+
+def record_failure(email, error):
+    """
+    Records a failed attempt at sending an email, which is tried again after a growing delay
+    or marked failed if it was rejected for good or is out of attempts.
+    Returns the seconds before the next attempt, None if it failed.
+    """
+
+    email.attempts += 1
+    max_attempts = getattr(settings, "OUTBOX_MAX_ATTEMPTS", 6)
+    if is_permanent(error) or email.attempts >= max_attempts:
+        logger.error(
+            "Could not send the email %r to %s: %s",
+            email.subject,
+            email.recipients,
+            error,
+        )
+        OutgoingEmail.objects.filter(pk=email.pk).update(
+            status=OutgoingEmail.FAILED,
+            attempts=email.attempts,
+            locked_at=None,
+            last_error=repr(error),
+        )
+        return None
+
+    delay = get_retry_delay(getattr(settings, "OUTBOX_RETRY_DELAY", 60), email.attempts)
+    logger.warning(
+        "Could not send the email %r to %s, retrying in %s seconds: %s",
+        email.subject,
+        email.recipients,
+        delay,
+        error,
+    )
+    OutgoingEmail.objects.filter(pk=email.pk).update(
+        status=OutgoingEmail.QUEUED,
+        attempts=email.attempts,
+        locked_at=None,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        last_error=repr(error),
+    )
+    return delay
+
+
+def send_batch(emails):
+    """
+    Sends the claimed emails over a single connection to the SMTP server (OUTBOX_DELIVERY_BACKEND).
+    Returns the seconds before the earliest retry of the emails which could not be sent, None if there is none.
+
+    If the server cannot be reached, or the connection is lost, the failed attempt is recorded on
+    each unsent email, which is tried again later like the emails the server refused.
+    """
+
+    connection = get_connection(settings.OUTBOX_DELIVERY_BACKEND)
+    sent = []
+    # Emails sent or whose failure was recorded
+    handled = set()
+    retry_delays = []
+
+    def fail(email, error):
+        delay = record_failure(email, error)
+        if delay is not None:
+            retry_delays.append(delay)
+        handled.add(email.pk)
+
+    try:
+        connection.open()
+        for email in emails:
+            try:
+                connection.send_messages([email.get_message(connection)])
+            except MESSAGE_ERRORS as error:
+                fail(email, error)
+            else:
+                sent.append(email.pk)
+                handled.add(email.pk)
+    except OSError as error:
+        # Socket, TLS and SMTP connection errors
+        for email in emails:
+            if email.pk not in handled:
+                fail(email, error)
+    except Exception:
+        release([email for email in emails if email.pk not in handled])
+        raise
+    finally:
+        OutgoingEmail.objects.filter(pk__in=sent).delete()
+        connection.close()
+
+    return min(retry_delays, default=None)
+
+
+def requeue_stale():
+    """
+    Queues again the emails left sending by a sender which died (see jobs.queue.requeue_stale)
+    """
+
+    timeout = getattr(settings, "JOBS_LOCK_TIMEOUT", 60 * 10)
+    return OutgoingEmail.objects.filter(
+        status=OutgoingEmail.SENDING,
+        locked_at__lt=timezone.now() - timedelta(seconds=timeout),
+    ).update(status=OutgoingEmail.QUEUED, locked_at=None)
+
+
+@job
+def deliver_outbox():
+    """
+    Sends the emails of the outbox which are due, by batches of OUTBOX_BATCH_SIZE emails
+    each sent over one SMTP connection, instead of a connection (and TLS handshake) per email.
+    Schedules another delivery for the emails to retry, so no queued email is left without one.
+    """
+
+    requeue_stale()
+    batch_size = getattr(settings, "OUTBOX_BATCH_SIZE", 50)
+    retry_delays = []
+    while True:
+        emails = claim_emails(batch_size)
+        if not emails:
+            break
+        delay = send_batch(emails)
+        if delay is not None:
+            retry_delays.append(delay)
+
+    if retry_delays:
+        deliver_outbox.enqueue(countdown=min(retry_delays))
+
+
+def schedule_delivery():
+    """
+    Queues a delivery of the outbox, unless one which has not started yet is already queued:
+    it claims the emails when it starts, so it sends the new ones as well.
+    Called once the new emails are committed, so the worker running the delivery can read them.
+    """
+
+    pending = Job.objects.filter(
+        name=deliver_outbox.name, status=Job.QUEUED, run_at__lte=timezone.now()
+    )
+    if not pending.exists():
+        deliver_outbox.delay()
@@ -0,0 +1,67 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+from core.mail import deserialize_email, serialize_email
+
+
+class OutgoingEmail(models.Model):
+    """
+    Model to store the emails of the outbox, sent in the background (see mailer.delivery).
+    Sent emails are deleted, those which could not be delivered are kept with their last error.
+    """
+
+    QUEUED = "queued"
+    SENDING = "sending"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (SENDING, "Sending"),
+        (FAILED, "Failed"),
+    ]
+
+    # Subject and recipients, displayed in the admin
+    subject = models.CharField(max_length=255, blank=True)
+    recipients = models.TextField(blank=True)
+    # The whole message, as serialized by core.mail.serialize_email
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # The email is not sent before this time, pushed back after each failed attempt
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["run_at", "pk"]
+        indexes = [
+            # The sender looks for the queued emails which are due
+            models.Index(
+                fields=["status", "run_at"], name="mailer_email_status_run_at_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
+
+    @classmethod
+    def from_message(cls, message):
+        """
+        Returns the (unsaved) outgoing email of an email message
+        """
+
+        return cls(
+            subject=str(message.subject)[: cls._meta.get_field("subject").max_length],
+            recipients=", ".join(message.recipients()),
+            data=serialize_email(message),
+        )
+
+    def get_message(self, connection=None):
+        """
+        Returns the email message, sent through the given connection
+        """
+
+        return deserialize_email(self.data, connection=connection)
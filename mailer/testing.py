@@ -0,0 +1,138 @@
+import socketserver
+import threading
+from email import message_from_bytes, policy
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """
+    Handles an SMTP session of the sink: the commands of smtplib without TLS nor authentication
+    (HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT).
+    """
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        sink = self.server.sink
+        with sink.lock:
+            sink.connections += 1
+
+        self.reply("220 localhost SMTP sink")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command, _, argument = line.decode().strip().partition(" ")
+            command = command.upper()
+
+            if command in ("HELO", "EHLO"):
+                self.reply("250 localhost")
+            elif command == "MAIL":
+                sender, recipients = self.get_address(argument), []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                address = self.get_address(argument)
+                if address in sink.refused_recipients:
+                    self.reply(f"{sink.refused_recipients[address]} Recipient refused")
+                else:
+                    recipients.append(address)
+                    self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = self.read_data()
+                with sink.lock:
+                    sink.messages.append(
+                        (
+                            sender,
+                            recipients,
+                            message_from_bytes(data, policy=policy.default),
+                        )
+                    )
+                self.reply("250 OK")
+            elif command == "RSET":
+                sender, recipients = None, []
+                self.reply("250 OK")
+            elif command == "NOOP":
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+    def get_address(self, argument):
+        # "FROM:<address> SIZE=123" or "TO:<address>"
+        return argument.partition("<")[2].partition(">")[0]
+
+    def read_data(self):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if line in (b".\r\n", b".\n", b""):
+                return b"".join(lines)
+            # Remove the dot stuffing of the lines starting with a dot
+            if line.startswith(b".."):
+                line = line[1:]
+            lines.append(line)
+
+
+class SMTPSink:
+    """
+    Local SMTP server keeping the messages it receives in memory, to test the email delivery
+    over real SMTP connections without sending anything:
+
+        with SMTPSink() as sink, override_settings(**sink.settings):
+            ...
+        sink.messages  # [(sender, recipients, email.message.EmailMessage)]
+
+    `refused_recipients` maps addresses to the SMTP code they are refused with (e.g. {"a@b.c": 550}).
+    """
+
+    def __init__(self, refused_recipients=None):
+        self.messages = []
+        self.connections = 0
+        self.refused_recipients = refused_recipients or {}
+        self.lock = threading.Lock()
+        self.server = socketserver.ThreadingTCPServer(
+            ("127.0.0.1", 0), SMTPSinkHandler, bind_and_activate=True
+        )
+        self.server.daemon_threads = True
+        self.server.sink = self
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    @property
+    def settings(self):
+        """
+        Settings sending the emails through the sink with the SMTP backend
+        """
+
+        return {
+            "OUTBOX_DELIVERY_BACKEND": "django.core.mail.backends.smtp.EmailBackend",
+            "EMAIL_HOST": "127.0.0.1",
+            "EMAIL_PORT": self.port,
+            "EMAIL_USE_TLS": False,
+            "EMAIL_USE_SSL": False,
+            "EMAIL_HOST_USER": "",
+            "EMAIL_HOST_PASSWORD": "",
+        }
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
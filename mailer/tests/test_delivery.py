@@ -0,0 +1,169 @@
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives, send_mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import run_pending
+from mailer.models import OutgoingEmail
+from mailer.testing import SMTPSink
+
+
+@override_settings(
+    EMAIL_BACKEND="mailer.backends.OutboxEmailBackend",
+    JOBS_EAGER=False,
+    OUTBOX_BATCH_SIZE=50,
+)
+class OutboxTests(TestCase):
+    def setUp(self):
+        # Deliver the emails to a local SMTP server
+        self.sink = SMTPSink(
+            refused_recipients={"later@email.com": 451, "nobody@email.com": 550}
+        )
+        self.sink.start()
+        self.addCleanup(self.sink.stop)
+        settings = override_settings(**self.sink.settings)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def send(self, count=1, to="will@email.com"):
+        # The delivery is queued once the emails are committed
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(count):
+                send_mail(f"Subject {i}", "Body", "noreply@email.com", [to])
+
+    def get_delivery_jobs(self):
+        return Job.objects.filter(name="mailer.delivery.deliver_outbox")
+
+    def test_emails_are_stored_and_delivered_in_the_background(self):
+        self.send(2)
+
+        # Nothing is sent while sending, a single delivery is queued for both emails
+        self.assertEqual(self.sink.messages, [])
+        self.assertEqual(OutgoingEmail.objects.count(), 2)
+        self.assertEqual(self.get_delivery_jobs().count(), 1)
+
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(
+            [
+                (sender, recipients, message["Subject"])
+                for sender, recipients, message in self.sink.messages
+            ],
+            [
+                ("noreply@email.com", ["will@email.com"], "Subject 0"),
+                ("noreply@email.com", ["will@email.com"], "Subject 1"),
+            ],
+        )
+        # Sent emails are deleted
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_delivery_is_queued_once_the_emails_are_committed(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            send_mail("Subject", "Body", "noreply@email.com", ["will@email.com"])
+            # A worker could run a queued delivery before the email is committed
+            self.assertFalse(self.get_delivery_jobs().exists())
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.get_delivery_jobs().count(), 1)
+
+        # A delivery which has started does not send the emails committed after it claimed the due ones
+        Job.objects.update(status=Job.RUNNING)
+        self.send()
+        self.assertEqual(
+            list(self.get_delivery_jobs().values_list("status", flat=True)),
+            [Job.RUNNING, Job.QUEUED],
+        )
+
+    def test_emails_are_sent_by_batches_over_one_connection(self):
+        self.send(5)
+
+        with self.settings(OUTBOX_BATCH_SIZE=2):
+            run_pending()
+        self.assertEqual(len(self.sink.messages), 5)
+        self.assertEqual(self.sink.connections, 3)
+
+    def test_html_and_attachments(self):
+        message = EmailMultiAlternatives(
+            "Welcome", "Text", "noreply@email.com", ["will@email.com"]
+        )
+        message.attach_alternative("<p>HTML</p>", "text/html")
+        message.attach("data.bin", b"\x00\x01", "application/octet-stream")
+        with self.captureOnCommitCallbacks(execute=True):
+            message.send()
+        run_pending()
+
+        _, _, received = self.sink.messages[0]
+        self.assertEqual(
+            received.get_body(("html",)).get_content().strip(), "<p>HTML</p>"
+        )
+        attachment = next(received.iter_attachments())
+        self.assertEqual(attachment.get_filename(), "data.bin")
+        self.assertEqual(attachment.get_content(), b"\x00\x01")
+
+    def test_refused_emails_are_retried_or_failed(self):
+        self.send(to="later@email.com")
+        self.send(to="nobody@email.com")
+        self.send(to="will@email.com")
+
+        with self.assertLogs("mailer.delivery", "WARNING") as logs:
+            run_pending()
+        self.assertEqual(len(logs.records), 2)
+
+        # The other emails are still sent over the connection
+        self.assertEqual(len(self.sink.messages), 1)
+        later = OutgoingEmail.objects.get(recipients="later@email.com")
+        self.assertEqual((later.status, later.attempts), (OutgoingEmail.QUEUED, 1))
+        self.assertGreater(later.run_at, timezone.now())
+        self.assertIn("451", later.last_error)
+        # Permanent errors are not retried
+        nobody = OutgoingEmail.objects.get(recipients="nobody@email.com")
+        self.assertEqual(nobody.status, OutgoingEmail.FAILED)
+
+        # Another delivery is queued for the retry
+        retry = self.get_delivery_jobs().get()
+        self.assertGreater(retry.run_at, timezone.now())
+
+    def test_unreachable_server(self):
+        self.send(2)
+        # Port of a closed server, refusing connections
+        closed = SMTPSink()
+        closed.server.server_close()
+
+        with self.settings(EMAIL_PORT=closed.port), self.assertLogs(
+            "mailer.delivery", "WARNING"
+        ):
+            run_pending()
+
+        # The emails are tried again later, with a delivery queued for them
+        for email in OutgoingEmail.objects.all():
+            self.assertEqual((email.status, email.attempts), (OutgoingEmail.QUEUED, 1))
+            self.assertGreater(email.run_at, timezone.now())
+        retry = self.get_delivery_jobs().get()
+        self.assertEqual((retry.status, retry.attempts), (Job.QUEUED, 0))
+        self.assertGreater(retry.run_at, timezone.now())
+
+        # Once the server is back, the retry sends them
+        Job.objects.update(run_at=timezone.now())
+        OutgoingEmail.objects.update(run_at=timezone.now())
+        run_pending()
+        self.assertEqual(len(self.sink.messages), 2)
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_account_emails_go_through_the_outbox(self):
+        get_user_model().objects.create_user(
+            username="will", email="will@email.com", password="testpass123"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("account_reset_password"), {"email": "will@email.com"}
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.sink.messages, [])
+
+        run_pending()
+        _, recipients, message = self.sink.messages[0]
+        self.assertEqual(recipients, ["will@email.com"])
+        self.assertIn("/accounts/password/reset/key/", message.get_body().get_content())
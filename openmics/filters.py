@@ -1,9 +1,13 @@
 import django_filters
-from django.forms import CheckboxSelectMultiple, CheckboxInput
+from django.forms import CheckboxSelectMultiple, CheckboxInput, HiddenInput
 from .models import OpenMic
 from profiles.models import Genre
 from dal import autocomplete
 from cities_light.models import City
+from core import reference_data
+from core.filters import NearbyFilterSet
+from core.geo import filter_within_radius
+from search.backends import search
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Row, Column, Submit
 from django_filters import DateFromToRangeFilter
@@ -16,16 +20,24 @@ def get_genre_choices():
     """
     Returns a list of tuples containing the id and name of each Genre for use in filter choices
     """
-    return [(genre.id, genre.name) for genre in Genre.objects.all()]
+    return reference_data.registry.get_choices(Genre)
 
 
-class OpenMicFilter(django_filters.FilterSet):
+class OpenMicFilter(NearbyFilterSet):
     """
     Filter class for Open Mic model
     """
 
-    # CharFilter for filtering advertisements by title, using case-insensitive containment matching
-    title = django_filters.CharFilter(field_name="title", lookup_expr="icontains")
+    # CharFilter for the full-text search of open mics by title, description and genres
+    q = django_filters.CharFilter(label="Search", method="filter_search")
+
+    def filter_search(self, queryset, name, value):
+        """
+        Custom method to filter the open mics matching the full-text search query, most relevant first.
+        This method is used by the `q` filter above.
+        """
+
+        return search(queryset, value)
 
     # A ModelChoiceFilter for filtering by location (City)
     # Uses an autocomplete widget for enhanced user experience
@@ -34,6 +46,23 @@ class OpenMicFilter(django_filters.FilterSet):
         widget=autocomplete.ModelSelect2(url="profiles:location_autocomplete"),
     )
 
+    # Coordinates of the user for the nearby search ("near me"), used when no city is selected
+    lat = django_filters.NumberFilter(
+        min_value=-90, max_value=90, method="filter_nearby", widget=HiddenInput
+    )
+    lng = django_filters.NumberFilter(
+        min_value=-180, max_value=180, method="filter_nearby", widget=HiddenInput
+    )
+    sort = django_filters.ChoiceFilter(
+        label="Sort by",
+        choices=[("distance", "Distance")],
+        empty_label="Event Date",
+        method="filter_nearby",
+    )
+
+    # Nearest open mics first, then the soonest
+    distance_ordering = ["distance", "event_date"]
+
     # A DateFromToRangeFilter for filtering events by a date range.
     # The filter widget allows users to select a start and end date.
     event_date = DateFromToRangeFilter(
@@ -67,6 +96,30 @@ class OpenMicFilter(django_filters.FilterSet):
             return queryset.filter(entry_fee=0)
         return queryset
 
+    def get_center(self):
+        """
+        Returns the (latitude, longitude) of the nearby search: those of the selected city if there is one,
+        otherwise the coordinates of the user. A city picked after "near me" is searched around,
+        even if the coordinates of the user are still submitted.
+        """
+
+        center = super().get_center()
+        data = self.form.cleaned_data
+        if (
+            center is None
+            and data.get("lat") is not None
+            and data.get("lng") is not None
+        ):
+            return float(data["lat"]), float(data["lng"])
+        return center
+
+    def filter_within_radius(self, queryset, latitude, longitude, radius_km):
+        # Open mics are located by the coordinates of their venue
+        return filter_within_radius(queryset, latitude, longitude, radius_km)
+
+    def sorts_by_distance(self):
+        return self.form.cleaned_data.get("sort") == "distance"
+
     def filter_by_order(self, queryset, name, value):
         """
         Custom method to order the filtered queryset.
@@ -77,10 +130,17 @@ class OpenMicFilter(django_filters.FilterSet):
         return queryset.order_by(expression)
 
     class Meta:
+        # Renders the choices of the genres from the reference data registry
+        form = reference_data.ReferenceDataForm
         model = OpenMic
         fields = [
-            "title",
+            "q",
             "location",
+            "near",
+            "radius",
+            "lat",
+            "lng",
+            "sort",
             "event_date",
             "genres",
             "free",
@@ -1,9 +1,10 @@
 from django import forms
 from .models import Comment, OpenMic
 from dal import autocomplete
+from core.reference_data import ReferenceDataFormMixin
 
 
-class OpenMicCreateForm(forms.ModelForm):
+class OpenMicCreateForm(ReferenceDataFormMixin, forms.ModelForm):
     """
     This form is used to create an open mic. It is used inside the Django admin interface.
     """
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from openmics.models import OpenMic
+
+# Fields computed from the Google Maps link
+FIELDS = ["latitude", "longitude", "geo_cell"]
+
+
+class Command(BaseCommand):
+    help = "Backfills the latitude, longitude and geo grid cell of every open mic from its Google Maps link"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="Number of open mics per update"
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Backfilling open mic coordinates...")
+
+        # Only load the link, the coordinates are extracted from it in Python
+        openmics = OpenMic.objects.only("google_maps_link").order_by("pk")
+
+        batch = []
+        updated = 0
+        for openmic in openmics.iterator(chunk_size=options["batch_size"]):
+            openmic.update_coordinates()
+            batch.append(openmic)
+            if len(batch) == options["batch_size"]:
+                updated += OpenMic.objects.bulk_update(batch, FIELDS)
+                batch = []
+        if batch:
+            updated += OpenMic.objects.bulk_update(batch, FIELDS)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully backfilled {updated} open mics")
+        )
@@ -0,0 +1,47 @@
+import hashlib
+
+import folium
+from django.conf import settings
+from django.core.cache import cache
+
+
+def get_map_cache_key(openmic):
+    """
+    Returns the cache key of the map of an open mic, which changes with everything the map renders
+    (coordinates, title and Google Maps link), so editing them invalidates the cached map.
+    """
+    digest = hashlib.md5(
+        f"{openmic.latitude}:{openmic.longitude}:{openmic.title}:{openmic.google_maps_link}".encode()
+    ).hexdigest()
+    return f"openmics:map:{openmic.pk}:{digest}"
+
+
+def render_map(openmic):
+    """
+    Renders the Folium map of the venue of an open mic, centered on its coordinates with a marker
+    """
+
+    # Create a Folium map centered on the coordinates of the venue
+    location = [openmic.latitude, openmic.longitude]
+    map = folium.Map(location=location, zoom_start=15, tiles="OpenStreetMap")
+
+    # Add a marker to the map
+    folium.Marker(
+        location=location,
+        popup=f'<a href="{openmic.google_maps_link}" target="_blank">View on Google Maps</a>',
+        tooltip=openmic.title,
+        icon=folium.Icon(color="green"),
+    ).add_to(map)
+
+    return map._repr_html_()
+
+
+def get_map_html(openmic):
+    """
+    Returns the HTML of the map of an open mic, rendered once and cached for OPENMIC_MAP_CACHE_TIMEOUT seconds
+    """
+    return cache.get_or_set(
+        get_map_cache_key(openmic),
+        lambda: render_map(openmic),
+        settings.OPENMIC_MAP_CACHE_TIMEOUT,
+    )
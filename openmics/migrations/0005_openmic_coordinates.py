@@ -0,0 +1,23 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("openmics", "0004_openmic_entry_fee_currency"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="openmic",
+            name="latitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="openmic",
+            name="longitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("openmics", "0005_openmic_coordinates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="openmic",
+            name="geo_cell",
+            field=models.IntegerField(
+                blank=True, db_index=True, editable=False, null=True
+            ),
+        ),
+    ]
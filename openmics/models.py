@@ -5,6 +5,50 @@ from profiles.models import Profile, Genre
 from datetime import datetime, date
 from phonenumber_field.modelfields import PhoneNumberField
 from django.core.validators import MinValueValidator
+from django.db.models.functions import Left
+from .utils import extract_lat_lng_from_url
+from core.geo import get_cell
+
+# Number of description characters loaded for the open mic cards
+CARD_DESCRIPTION_LENGTH = 500
+
+
+class OpenMicQuerySet(models.QuerySet):
+    """
+    QuerySet for Open Mics
+    """
+
+    def for_cards(self):
+        """
+        Shapes the queryset for open mic cards (open mic lists and bookmarks).
+        Joins the location rendered on every card and only loads the start of the description,
+        which is all the cards display, as `description_preview`.
+        """
+
+        return (
+            self.select_related("location")
+            .only(
+                "title",
+                "author",
+                "location__display_name",
+                "location__name",
+                "event_date",
+                "start_time",
+                "end_time",
+                "created",
+                "last_updated",
+            )
+            .annotate(description_preview=Left("description", CARD_DESCRIPTION_LENGTH))
+        )
+
+    def for_detail(self):
+        """
+        Shapes the queryset for the open mic detail page.
+        Joins the author and location, and prefetches the genres,
+        so the loaded open mic holds everything the page renders and can be cached as is.
+        """
+
+        return self.select_related("author", "location").prefetch_related("genres")
 
 
 class OpenMic(models.Model):
@@ -23,6 +67,11 @@ class OpenMic(models.Model):
     )
     address = models.CharField(max_length=255)
     google_maps_link = models.URLField(null=True, blank=True)
+    # Coordinates of the venue, extracted from the Google Maps link by save()
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+    # Cell of the geo grid holding the coordinates, indexed for the radius searches
+    geo_cell = models.IntegerField(null=True, blank=True, editable=False, db_index=True)
     venue_phone_number = PhoneNumberField(blank=True)
     genres = models.ManyToManyField(Genre, blank=True)
     event_date = models.DateField()
@@ -43,6 +92,8 @@ class OpenMic(models.Model):
     youtube_social_link = models.URLField(null=True, blank=True)
     instagram_social_link = models.URLField(null=True, blank=True)
 
+    objects = OpenMicQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.title} Open Mic - {self.author.user.email}"
 
@@ -53,6 +104,41 @@ class OpenMic(models.Model):
     def is_expired(self):
         return self.event_date < date.today()
 
+    @property
+    def has_coordinates(self):
+        return self.latitude is not None and self.longitude is not None
+
+    def update_coordinates(self):
+        """
+        Extracts the latitude and longitude of the venue from the Google Maps link,
+        both are None if the link does not hold coordinates, and updates the geo grid cell.
+        """
+
+        self.latitude, self.longitude = extract_lat_lng_from_url(self.google_maps_link)
+        self.geo_cell = get_cell(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        """
+        Custom save method keeping the coordinates in sync with the Google Maps link,
+        unless the save does not touch it (partial save, or link not loaded).
+        """
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            sync_coordinates = "google_maps_link" in update_fields
+        else:
+            sync_coordinates = "google_maps_link" not in self.get_deferred_fields()
+        if sync_coordinates:
+            self.update_coordinates()
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {
+                    "latitude",
+                    "longitude",
+                    "geo_cell",
+                }
+
+        super().save(*args, **kwargs)
+
     def clean(self):
 
         if self.event_date:
@@ -0,0 +1,58 @@
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.geo import get_cell
+from openmics.models import OpenMic
+from profiles.models import Profile
+
+User = get_user_model()
+
+
+class OpenMicCoordinatesTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=user, display_name="Test User")
+        self.openmic = OpenMic.objects.create(
+            title="Open Mic",
+            event_date=date.today() + timedelta(days=5),
+            start_time=time(19, 0),
+            end_time=time(23, 0),
+            author=self.profile,
+            google_maps_link="https://www.google.com/maps/@37.7749,-122.4194,15z",
+        )
+
+    def test_coordinates_are_stored_on_save(self):
+        self.assertEqual(
+            (self.openmic.latitude, self.openmic.longitude), (37.7749, -122.4194)
+        )
+        self.assertEqual(self.openmic.geo_cell, get_cell(37.7749, -122.4194))
+
+        self.openmic.google_maps_link = "https://maps.google.com/"
+        self.openmic.save()
+        self.openmic.refresh_from_db()
+        self.assertFalse(self.openmic.has_coordinates)
+        self.assertIsNone(self.openmic.geo_cell)
+
+    def test_partial_save_updates_coordinates_with_link(self):
+        self.openmic.google_maps_link = "https://www.google.com/maps/@-6.2,106.8,15z"
+        self.openmic.save(update_fields=["google_maps_link"])
+        self.openmic.refresh_from_db()
+        self.assertEqual((self.openmic.latitude, self.openmic.longitude), (-6.2, 106.8))
+        self.assertEqual(self.openmic.geo_cell, get_cell(-6.2, 106.8))
+
+    def test_backfill_command(self):
+        OpenMic.objects.update(latitude=None, longitude=None, geo_cell=None)
+
+        out = StringIO()
+        call_command("backfill_openmic_coordinates", stdout=out)
+
+        self.openmic.refresh_from_db()
+        self.assertEqual(
+            (self.openmic.latitude, self.openmic.longitude), (37.7749, -122.4194)
+        )
+        self.assertEqual(self.openmic.geo_cell, get_cell(37.7749, -122.4194))
+        self.assertIn("Successfully backfilled 1 open mics", out.getvalue())
@@ -1,8 +1,15 @@
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.utils import timezone
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from datetime import date, timedelta, time
+from decimal import Decimal
+from cities_light.models import City, Country
 from openmics.models import OpenMic, Comment, Profile
 
 User = get_user_model()  # Import the custom user model
@@ -11,6 +18,7 @@ User = get_user_model()  # Import the custom user model
 class OpenMicViewsTests(TestCase):
 
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user = User.objects.create_user(username="testuser", password="password")
         self.profile = Profile.objects.create(user=self.user, display_name="Test User")
@@ -42,7 +50,7 @@ class OpenMicViewsTests(TestCase):
 
     def test_openmic_list_view_with_filter(self):
         response = self.client.get(
-            reverse("openmics:openmic_list"), {"title": "Open Mic 1"}
+            reverse("openmics:openmic_list"), {"q": "Open Mic 1"}
         )
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "openmics/openmic_list.html")
@@ -67,8 +75,8 @@ class OpenMicViewsTests(TestCase):
             reverse("openmics:get_openmics"),
             {
                 "page": 1,
-                "title": "Open Mic 1",
-            },  # Assuming there is a 'title' filter in OpenMicFilter
+                "q": "Open Mic 1",
+            },  # Full-text search filter of OpenMicFilter
             HTTP_HX_REQUEST="true",
         )
 
@@ -109,6 +117,26 @@ class OpenMicViewsTests(TestCase):
         self.assertIn("error", response.context)
         self.assertEqual(response.context["error"], "Invalid Google Maps URL.")
 
+    def test_openmic_detail_view_map_is_cached(self):
+        self.openmic1.google_maps_link = (
+            "https://www.google.com/maps/@37.7749,-122.4194,15z"
+        )
+        self.openmic1.save()
+        url = reverse("openmics:openmic_detail", kwargs={"pk": self.openmic1.pk})
+
+        with mock.patch(
+            "openmics.maps.render_map", return_value="<div>map</div>"
+        ) as render_map:
+            self.assertEqual(self.client.get(url).context["map"], "<div>map</div>")
+            self.client.get(url)
+            self.assertEqual(render_map.call_count, 1)
+
+            # Editing the open mic renders its map again
+            self.openmic1.title = "Open Mic 1 (new venue)"
+            self.openmic1.save()
+            self.client.get(url)
+            self.assertEqual(render_map.call_count, 2)
+
     def test_comment_create_view_valid(self):
         self.client.login(username="testuser", password="password")
         response = self.client.post(
@@ -155,3 +183,149 @@ class OpenMicViewsTests(TestCase):
         )
         self.assertEqual(response.status_code, 403)
         self.assertTrue(Comment.objects.filter(pk=comment.pk).exists())
+
+
+class OpenMicListQueryCountTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=self.user, display_name="Test User")
+
+        for i in range(12):
+            OpenMic.objects.create(
+                title=f"Open Mic {i}",
+                description="Bring your guitar. " * 50,
+                event_date=date.today() + timedelta(days=i),
+                start_time=time(19, 0),
+                end_time=time(23, 0),
+                author=self.profile,
+            )
+
+    def count_queries(self, url, page_size, **kwargs):
+        """Returns the number of queries run to render the url with the given page size."""
+        with self.settings(PAGE_SIZE=page_size):
+            # Warm up process wide caches (e.g. content types) so only the page itself is measured
+            self.client.get(url, **kwargs)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_openmic_list_query_count_does_not_depend_on_page_size(self):
+        self.client.login(username="testuser", password="password")
+        url = reverse("openmics:openmic_list")
+        self.assertEqual(self.count_queries(url, 2), self.count_queries(url, 10))
+
+    def test_get_openmics_query_count_does_not_depend_on_page_size(self):
+        self.client.login(username="testuser", password="password")
+        url = reverse("openmics:get_openmics")
+        self.assertEqual(
+            self.count_queries(url, 2, HTTP_HX_REQUEST="true"),
+            self.count_queries(url, 10, HTTP_HX_REQUEST="true"),
+        )
+
+
+class OpenMicNearbySearchTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=self.user, display_name="Test User")
+
+        country = Country.objects.create(name="United States", code2="US")
+        self.san_francisco = City.objects.create(
+            name="San Francisco",
+            country=country,
+            latitude=Decimal("37.77493"),
+            longitude=Decimal("-122.41942"),
+        )
+
+        # Events are sooner the further away they are, so the distance sort differs from the date sort
+        for days, (title, latitude, longitude) in enumerate(
+            [
+                ("Los Angeles", 34.0522, -118.2437),
+                ("San Jose", 37.3382, -121.8863),
+                ("Oakland", 37.8044, -122.2712),
+                ("San Francisco", 37.7749, -122.4194),
+            ]
+        ):
+            OpenMic.objects.create(
+                title=title,
+                event_date=date.today() + timedelta(days=days),
+                start_time=time(19, 0),
+                end_time=time(23, 0),
+                author=self.profile,
+                google_maps_link=f"https://www.google.com/maps/@{latitude},{longitude},15z",
+            )
+        OpenMic.objects.create(
+            title="No venue",
+            event_date=date.today(),
+            start_time=time(19, 0),
+            end_time=time(23, 0),
+            author=self.profile,
+        )
+
+    def get_titles(self, params):
+        response = self.client.get(reverse("openmics:openmic_list"), params)
+        self.assertEqual(response.status_code, 200)
+        return [openmic.title for openmic in response.context["openmics"]]
+
+    def test_near_city_within_default_radius(self):
+        titles = self.get_titles({"near": self.san_francisco.pk})
+        self.assertEqual(titles, ["Oakland", "San Francisco"])
+
+    def test_near_coordinates_within_radius(self):
+        titles = self.get_titles({"lat": "37.7749", "lng": "-122.4194", "radius": 100})
+        self.assertEqual(titles, ["San Jose", "Oakland", "San Francisco"])
+
+    def test_selected_city_takes_precedence_over_coordinates(self):
+        # Coordinates of a previous "near me" search, in Los Angeles
+        titles = self.get_titles(
+            {"near": self.san_francisco.pk, "lat": "34.0522", "lng": "-118.2437"}
+        )
+        self.assertEqual(titles, ["Oakland", "San Francisco"])
+
+    def test_near_search_without_results(self):
+        # No open mic within the radius of the coordinates nor of the city
+        self.assertEqual(self.get_titles({"lat": "10", "lng": "10"}), [])
+        self.assertEqual(
+            self.get_titles({"lat": "10", "lng": "10", "sort": "distance"}), []
+        )
+        tokyo = City.objects.create(
+            name="Tokyo",
+            country=Country.objects.create(name="Japan", code2="JP"),
+            latitude=Decimal("35.6895"),
+            longitude=Decimal("139.69171"),
+        )
+        self.assertEqual(self.get_titles({"near": tokyo.pk}), [])
+
+    def test_sort_by_distance(self):
+        response = self.client.get(
+            reverse("openmics:openmic_list"),
+            {"near": self.san_francisco.pk, "radius": 100, "sort": "distance"},
+        )
+        titles = [openmic.title for openmic in response.context["openmics"]]
+        self.assertEqual(titles, ["San Francisco", "Oakland", "San Jose"])
+        self.assertEqual(response.context["openmics_count"], 3)
+        self.assertContains(response, "km away")
+
+    def test_sort_by_distance_is_paginated(self):
+        params = {"near": self.san_francisco.pk, "radius": 100, "sort": "distance"}
+        with self.settings(PAGE_SIZE=2):
+            response = self.client.get(reverse("openmics:openmic_list"), params)
+            page = response.context["openmics"]
+            self.assertEqual(
+                [openmic.title for openmic in page], ["San Francisco", "Oakland"]
+            )
+
+            response = self.client.get(
+                reverse("openmics:get_openmics"),
+                {**params, "cursor": page.next_cursor},
+                HTTP_HX_REQUEST="true",
+            )
+        self.assertContains(response, "San Jose")
+        self.assertNotContains(response, "Oakland")
+
+    def test_without_nearby_search(self):
+        titles = self.get_titles({"radius": 5})
+        self.assertEqual(len(titles), 5)
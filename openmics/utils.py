@@ -4,7 +4,7 @@ import re
 def extract_lat_lng_from_url(url):
     # Define the regular expression pattern to match latitude and longitude in the URL
     pattern = r"@(-?\d+\.\d+),(-?\d+\.\d+)"
-    match = re.search(pattern, url)
+    match = re.search(pattern, url or "")
 
     if match:
         lat, lng = match.groups()
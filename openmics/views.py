@@ -4,14 +4,15 @@ from django.views.generic import ListView, DetailView, CreateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from profiles.mixins import ProfileRequiredMixin
 from .models import OpenMic, Comment
-import folium
-from .utils import extract_lat_lng_from_url
+from profiles.models import Profile, Genre
+from .maps import get_map_html
 from .forms import CommentCreateForm
 from django.http import HttpResponseRedirect, HttpResponseBadRequest
 from .filters import OpenMicFilter
-from django.conf import settings
-from django.core.paginator import Paginator
-from bookmarks.mixins import BookmarkMixin, BookmarkSingleObjectMixin
+from core.listing import ListPipeline
+from core.mixins import CachedObjectMixin
+from core.pagination import InvalidCursor
+from bookmarks.mixins import BookmarkSingleObjectMixin
 from reports.forms import ReportForm
 from datetime import date
 
@@ -22,43 +23,28 @@ def openmic_list(request):
     """
 
     # Part of Django filters,
-    # initialize the open mics filter with the GET parameters and the queryset of all open mics,
-    # ordered by the last updated date (descending).
-    f = OpenMicFilter(
-        request.GET,
-        queryset=OpenMic.objects.filter(event_date__gte=date.today()).order_by(
-            "event_date"
-        ),
+    # initialize the open mics filter with the GET parameters and the queryset of all upcoming open mics,
+    # ordered by the event date (ascending, nearest date first).
+    # The filters are evaluated once and the open mics paginated with settings.PAGE_SIZE items per page.
+    openmics = ListPipeline(
+        request,
+        OpenMicFilter,
+        OpenMic.objects.for_cards()
+        .filter(event_date__gte=date.today())
+        .order_by("event_date"),
     )
-
-    # Check if any filters are applied by inspecting the GET parameters.
-    has_filter = any(field in request.GET for field in set(f.get_fields()))
-
-    # If no filters are applied, retrieve all upcoming open mic events ordered by event date.
-    if not has_filter:
-        openmics = OpenMic.objects.filter(event_date__gte=date.today()).order_by(
-            "event_date"
-        )
-    else:
-        # If filters are applied, get the filtered queryset.
-        openmics = f.qs
-
-    # Paginate the advertisements with the number of items per page defined in settings.PAGE_SIZE.
-    # This defaults to the first page when this view is triggered.
-    paginator = Paginator(openmics, settings.PAGE_SIZE)
-    openmics_page = paginator.page(1)  # default to 1 when this view is triggered
+    openmics_page = openmics.page()  # first page when this view is triggered
 
     # Prepare the context dictionary to pass to the template.
     context = {
-        "form": f.form,  # The form object associated with the filter.
+        "form": openmics.form,  # The form object associated with the filter.
         "openmics": openmics_page,
-        "openmics_count": openmics.count,  # The total count of filtered open mic events.
-        "has_filter": has_filter,
+        "openmics_count": openmics.count(),  # The total count of filtered open mic events.
+        "has_filter": openmics.has_filter,
     }
 
-    # Add bookmark context
-    bookmark_context = BookmarkMixin().get_bookmark_context(request.user, openmics)
-    context.update(bookmark_context)
+    # Add bookmark context for the open mics on the page
+    context.update(openmics.get_bookmark_context(openmics_page))
 
     return render(request, "openmics/openmic_list.html", context)
 
@@ -72,45 +58,36 @@ def get_openmics(request):
     if not request.headers.get("HX-Request"):
         return HttpResponseBadRequest("This endpoint only accepts HTMX requests.")
 
-    # Get the page number from the GET parameters. If not provided, default to page 1.
-    page = request.GET.get(
-        "page", 1  # ?page=2, then this will extract 2. If it doesn't, then default to 1
-    )
+    # Get the opaque cursor pointing after the last open mic of the previous page.
+    # If not provided, the first page is returned.
+    cursor = request.GET.get("cursor")
 
     # Initialize the open mics filter with the GET parameters and the queryset of all open mics,
     # filter by event_date only include open mics with event date >= today
     # ordered by the event date (ascending, nearest date first).
-    f = OpenMicFilter(
-        request.GET,
-        queryset=OpenMic.objects.filter(event_date__gte=date.today()).order_by(
-            "event_date"
-        ),
+    openmics = ListPipeline(
+        request,
+        OpenMicFilter,
+        OpenMic.objects.for_cards()
+        .filter(event_date__gte=date.today())
+        .order_by("event_date"),
     )
 
-    # Check if any filter fields are present in the GET parameters.
-    has_filter = any(field in request.GET for field in set(f.get_fields()))
-
-    # If no filters are applied, retrieve all open mics ordered by the last updated date.
-    # If filters are applied, get the filtered queryset.
-    if not has_filter:
-        openmics = OpenMic.objects.filter(event_date__gte=date.today()).order_by(
-            "event_date"
-        )
-    else:
-        openmics = f.qs
+    # Keyset pagination, so deep pages cost the same as the first one and no COUNT is run.
+    try:
+        openmics_page = openmics.page(cursor)
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid cursor.")
 
-    # Paginate the open mics with the number of items per page defined in settings.PAGE_SIZE.
-    paginator = Paginator(openmics, settings.PAGE_SIZE)
-    context = {"openmics": paginator.page(page)}
+    context = {"openmics": openmics_page}
 
-    # Add bookmark context
-    bookmark_context = BookmarkMixin().get_bookmark_context(request.user, openmics)
-    context.update(bookmark_context)
+    # Add bookmark context for the open mics on the page
+    context.update(openmics.get_bookmark_context(openmics_page))
 
     return render(request, "openmics/openmic_list_partial.html#openmics_list", context)
 
 
-class OpenMicDetailView(BookmarkSingleObjectMixin, DetailView):
+class OpenMicDetailView(CachedObjectMixin, BookmarkSingleObjectMixin, DetailView):
     """
     View for displaying the detail of an open mic
     """
@@ -118,6 +95,10 @@ class OpenMicDetailView(BookmarkSingleObjectMixin, DetailView):
     # The model that this view operates on.
     model = OpenMic
 
+    # Load the author, location and genres with the open mic, which is cached with them
+    queryset = OpenMic.objects.for_detail()
+    cache_dependencies = [Profile, Genre]
+
     # The template used to render the open mic detail page.
     template_name = "openmics/openmic_detail.html"
 
@@ -132,8 +113,8 @@ class OpenMicDetailView(BookmarkSingleObjectMixin, DetailView):
         # Initialize the base context provided by the superclass.
         context = super().get_context_data(**kwargs)
 
-        # Get the current OpenMic object.
-        openmic = self.get_object()
+        # The current OpenMic object, retrieved by DetailView.
+        openmic = self.object
 
         # Comments
         # Add a form for creating comments related to the open mic.
@@ -144,39 +125,21 @@ class OpenMicDetailView(BookmarkSingleObjectMixin, DetailView):
         )
 
         # Get bookmark context for Open Mic
-        bookmark_context = self.get_single_bookmark_context(
-            self.request.user, self.get_object()
-        )
+        bookmark_context = self.get_single_bookmark_context(self.request.user, openmic)
         context.update(bookmark_context)
 
         # Pass context for report button
-        openmic = self.get_object()
         context["report_form"] = ReportForm()
         context["app_label"] = openmic._meta.app_label
         context["model_name"] = openmic._meta.model_name
 
-        # Extract latitude and longitude from the Google Maps URL
-        lat, lng = extract_lat_lng_from_url(openmic.google_maps_link)
-
-        # Handle the case where the Google Maps URL is invalid.
-        if lat is None or lng is None:
+        # Handle the case where the Google Maps URL holds no coordinates.
+        if not openmic.has_coordinates:
             context["error"] = "Invalid Google Maps URL."
             return context
 
-        # Create a Folium map centered on the extracted coordinates
-        map = folium.Map(location=[lat, lng], zoom_start=15, tiles="OpenStreetMap")
-
-        # Add a marker to the map
-        folium.Marker(
-            location=[lat, lng],
-            popup=f'<a href="{openmic.google_maps_link}" target="_blank">View on Google Maps</a>',
-            tooltip=openmic.title,
-            icon=folium.Icon(color="green"),
-        ).add_to(map)
-
-        # Render the map and add it to the context
-        map_html = map._repr_html_()
-        context["map"] = map_html
+        # Add the map of the venue, rendered from the coordinates stored on save and cached
+        context["map"] = get_map_html(openmic)
 
         return context
 
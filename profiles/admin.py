@@ -1,8 +1,9 @@
 from django.contrib import admin
-from .models import Profile, ProfileType, Genre, Skill
+from .models import Profile, ProfileType, Genre, Skill, ProfileSlugHistory
 
 
 admin.site.register(Profile)
 admin.site.register(ProfileType)
 admin.site.register(Genre)
 admin.site.register(Skill)
+admin.site.register(ProfileSlugHistory)
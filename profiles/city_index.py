@@ -0,0 +1,245 @@
+# city_index.py
+import heapq
+import threading
+from bisect import bisect_left
+
+import numpy as np
+from cities_light.abstract_models import to_search
+from cities_light.models import City
+from django.conf import settings
+
+from core import cache_utils
+from core.geo import distance_expression, get_cell_ranges, get_cells, haversine_km
+
+# Character sorting after every character of a normalized key, which only holds [a-z0-9]
+KEY_END = "{"
+
+
+def normalize(value):
+    """
+    Normalizes a city name or search query for the prefix index:
+    ASCII folded, lowercase, without spaces or punctuation ("São Paulo" becomes "saopaulo").
+    """
+    return to_search(value or "")
+
+
+class CityIndex:
+    """
+    In-memory prefix index of the cities, loaded once per worker process.
+
+    Every city is indexed under the normalized form of its name, ASCII name, display name
+    ("name, region, country") and alternate names, in a sorted array of keys.
+    A prefix is looked up with two binary searches, and the matching cities are ranked
+    with exact name matches first, then by population.
+    """
+
+    def __init__(self, rows):
+        """
+        Builds the index from (id, name, name_ascii, display_name, alternate_names, population) rows.
+        """
+
+        entries = set()
+        self.populations = {}
+        self.names = {}
+        for (
+            city_id,
+            name,
+            name_ascii,
+            display_name,
+            alternate_names,
+            population,
+        ) in rows:
+            self.populations[city_id] = population or 0
+            self.names[city_id] = normalize(name)
+            names = [name, name_ascii, display_name]
+            names.extend((alternate_names or "").split(";"))
+            for key in {normalize(value) for value in names}:
+                if key:
+                    entries.add((key, city_id))
+
+        entries = sorted(entries)
+        self.keys = [key for key, _ in entries]
+        self.ids = [city_id for _, city_id in entries]
+
+    @classmethod
+    def load(cls):
+        """
+        Builds the index from the cities in the database, in a single query.
+        """
+
+        return cls(
+            City.objects.values_list(
+                "id",
+                "name",
+                "name_ascii",
+                "display_name",
+                "alternate_names",
+                "population",
+            ).iterator(chunk_size=5000)
+        )
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, query, limit):
+        """
+        Returns the ids of the best ranked cities (at most `limit`) having a name starting with the query.
+        """
+
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + KEY_END, lo=start)
+        city_ids = set(self.ids[start:end])
+
+        # Cities named exactly as the query come first, then the most populated
+        return heapq.nlargest(
+            limit,
+            city_ids,
+            key=lambda city_id: (
+                self.names[city_id] == prefix,
+                self.populations[city_id],
+                -city_id,
+            ),
+        )
+
+
+class CityGeoIndex:
+    """
+    In-memory geo index of the cities having coordinates, loaded once per worker process.
+
+    The cities are sorted by their cell of the geo grid (core.geo), so the cities in the bounding box
+    of a circle are found with two binary searches per row of cells. Only these candidates are ranked,
+    by their haversine distance computed at once with NumPy.
+    """
+
+    def __init__(self, rows):
+        """
+        Builds the index from (id, latitude, longitude) rows.
+        """
+
+        rows = np.array(list(rows), dtype=float).reshape(-1, 3)
+        cells = get_cells(rows[:, 1], rows[:, 2])
+        order = np.argsort(cells, kind="stable")
+
+        self.cells = cells[order]
+        self.ids = rows[order, 0].astype(np.int64)
+        self.latitudes = rows[order, 1]
+        self.longitudes = rows[order, 2]
+
+    @classmethod
+    def load(cls):
+        """
+        Builds the index from the cities in the database, in a single query.
+        """
+
+        return cls(
+            City.objects.filter(latitude__isnull=False, longitude__isnull=False)
+            .values_list("id", "latitude", "longitude")
+            .iterator(chunk_size=5000)
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, latitude, longitude, radius_km):
+        """
+        Returns the ids and distances (km) of the cities within the radius of the coordinates,
+        as NumPy arrays, nearest first.
+        """
+
+        ranges = np.array(get_cell_ranges(latitude, longitude, radius_km))
+        starts = np.searchsorted(self.cells, ranges[:, 0], side="left")
+        ends = np.searchsorted(self.cells, ranges[:, 1], side="right")
+        candidates = np.concatenate(
+            [np.arange(start, end) for start, end in zip(starts, ends)]
+        ).astype(np.int64)
+
+        distances = haversine_km(
+            latitude,
+            longitude,
+            self.latitudes[candidates],
+            self.longitudes[candidates],
+        )
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+
+        order = np.argsort(distances, kind="stable")
+        return self.ids[candidates[order]], distances[order]
+
+
+# The indexes of the current process, with the cache version of the cities they were built at
+_indexes = {}
+_index_lock = threading.Lock()
+
+
+def _get_index(index_class):
+    """
+    Returns the index of the given class of the current process, reloading it when the cities have changed
+    (the cache version of the City namespace is bumped by core.signals).
+    """
+
+    (version,) = cache_utils.get_versions([cache_utils.get_namespace(City)])
+    index, index_version = _indexes.get(index_class, (None, None))
+    if index is None or index_version != version:
+        with _index_lock:
+            index, index_version = _indexes.get(index_class, (None, None))
+            if index is None or index_version != version:
+                index = index_class.load()
+                _indexes[index_class] = (index, version)
+    return index
+
+
+def get_city_index():
+    """
+    Returns the city prefix index of the current process
+    """
+
+    return _get_index(CityIndex)
+
+
+def get_city_geo_index():
+    """
+    Returns the city geo index of the current process
+    """
+
+    return _get_index(CityGeoIndex)
+
+
+def filter_within_city_radius(queryset, field_name, latitude, longitude, radius_km):
+    """
+    Returns the queryset restricted to the objects whose city (the `field_name` foreign key)
+    is within the radius (km) of the coordinates, annotated with the `distance` (km) of their city.
+    """
+
+    # The index finds the candidate cities, the distance is computed by the database from the coordinates
+    # of the city of each row, keeping the queries (and the count cache keys) small
+    city_ids, _ = get_city_geo_index().search(latitude, longitude, radius_km)
+    queryset = queryset.filter(**{f"{field_name}__in": city_ids.tolist()}).annotate(
+        distance=distance_expression(
+            latitude,
+            longitude,
+            f"{field_name}__latitude",
+            f"{field_name}__longitude",
+        )
+    )
+    # Without cities in the radius, skip the query
+    return queryset if len(city_ids) else queryset.none()
+
+
+def search_cities(query):
+    """
+    Returns the ids of the cities matching the query, best ranked first.
+    The results are cached per normalized prefix, and invalidated when the cities change.
+    """
+
+    prefix = normalize(query)
+    limit = settings.CITY_AUTOCOMPLETE_LIMIT
+    return cache_utils.get_or_set(
+        cache_utils.get_namespace(City),
+        ["city-autocomplete", prefix, limit],
+        lambda: get_city_index().search(prefix, limit),
+        settings.CITY_AUTOCOMPLETE_CACHE_TIMEOUT,
+    )
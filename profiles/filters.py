@@ -1,10 +1,13 @@
 import django_filters
 from django.forms import CheckboxSelectMultiple, CheckboxInput
-from django.db.models import Q
 from django.utils.timezone import now, timedelta
 from .models import Profile, Genre, Skill, ProfileType
 from dal import autocomplete
 from cities_light.models import City
+from core import reference_data
+from core.filters import NearbyFilterSet
+from .city_index import filter_within_city_radius
+from search.backends import search
 
 
 def get_profile_type_choices():
@@ -12,38 +15,42 @@ def get_profile_type_choices():
     Function for getting profile type from Profile Type model
     """
 
-    return [
-        (profile_type.id, profile_type.name)
-        for profile_type in ProfileType.objects.all()
-    ]
+    return reference_data.registry.get_choices(ProfileType)
 
 
 def get_genre_choices():
     """
     Function for getting genres from Genre model
     """
-    return [(genre.id, genre.name) for genre in Genre.objects.all()]
+    return reference_data.registry.get_choices(Genre)
 
 
 def get_skill_choices():
     """
     Function for getting skills from Skill model
     """
-    return [(skill.id, skill.name) for skill in Skill.objects.all()]
+    return reference_data.registry.get_choices(Skill)
 
 
-class ProfileFilter(django_filters.FilterSet):
+class ProfileFilter(NearbyFilterSet):
     """
     FilterSet for filtering Profile objects based on various criteria.
     """
 
-    display_name = django_filters.CharFilter(
-        field_name="display_name", lookup_expr="icontains"
-    )
+    # Full-text search of profiles by display name, bio, influences, genres and skills
+    q = django_filters.CharFilter(label="Search", method="filter_search")
+
+    def filter_search(self, queryset, name, value):
+        """
+        Custom method to filter the profiles matching the full-text search query, most relevant first.
+        This method is used by the `q` filter above.
+        """
+
+        return search(queryset, value)
 
     profile_type = django_filters.MultipleChoiceFilter(
         field_name="profile_type",
-        choices=get_profile_type_choices(),
+        choices=get_profile_type_choices,
         widget=CheckboxSelectMultiple,
     )
 
@@ -78,29 +85,20 @@ class ProfileFilter(django_filters.FilterSet):
         widget=CheckboxInput,
     )
 
-    # Method to filter profiles that have at least one YouTube video link
+    # Method to filter profiles that have at least one YouTube video link,
+    # using the video count maintained by Profile.save
     def filter_has_youtube_video(self, queryset, name, value):
         if value:
-
-            # Return distinct profiles that match the filter criteria
-            return (
-                queryset.filter(youtube_link_1__isnull=False)
-                | queryset.filter(youtube_link_2__isnull=False)
-                | queryset.filter(youtube_link_3__isnull=False)
-                | queryset.filter(youtube_link_4__isnull=False)
-                | queryset.filter(youtube_link_5__isnull=False)
-                | queryset.filter(youtube_link_6__isnull=False)
-            ).distinct()
+            return queryset.filter(video_count__gt=0)
 
         # If not filtering, return the original queryset
         return queryset
 
-    # Method to filter profiles that have a non-empty profile picture
+    # Method to filter profiles that have a non-empty profile picture,
+    # using the flag maintained by Profile.save
     def filter_has_profile_picture(self, queryset, name, value):
         if value:
-            return queryset.filter(
-                Q(profile_picture__isnull=False) & ~Q(profile_picture="")
-            )
+            return queryset.filter(has_profile_picture=True)
         return queryset
 
     # Choices for the last login date range filter
@@ -128,6 +126,7 @@ class ProfileFilter(django_filters.FilterSet):
     SORT_CHOICES = (
         ("last_updated", "Last Profile Updated Date"),
         ("last_login", "Last Login Date"),
+        ("distance", "Distance"),
     )
 
     # Filter for sorting profiles by a selected field
@@ -135,17 +134,36 @@ class ProfileFilter(django_filters.FilterSet):
         label="Sort by", choices=SORT_CHOICES, method="filter_by_order"
     )
 
-    # Method to sort profiles based on the selected order criterion
+    # Method to sort profiles based on the selected order criterion.
+    # The distance sort needs the distances of the nearby search, it is applied by filter_queryset()
     def filter_by_order(self, queryset, name, value):
+        if value == "distance":
+            return queryset
         expression = "-last_updated" if value == "last_updated" else "-user__last_login"
         return queryset.order_by(expression)
 
+    # Nearest profiles first, then the most recently created
+    distance_ordering = ["distance", "-created"]
+
+    # Profiles are located by their city
+    def filter_within_radius(self, queryset, latitude, longitude, radius_km):
+        return filter_within_city_radius(
+            queryset, "location", latitude, longitude, radius_km
+        )
+
+    def sorts_by_distance(self):
+        return self.form.cleaned_data.get("order_by") == "distance"
+
     class Meta:
+        # Renders the choices of the genres and skills from the reference data registry
+        form = reference_data.ReferenceDataForm
         model = Profile
         fields = [
-            "display_name",
+            "q",
             "profile_type",
             "location",
+            "near",
+            "radius",
             "genres",
             "skills",
             "has_youtube_video",
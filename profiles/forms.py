@@ -14,12 +14,43 @@ from .models import (
     NIGHTS_GIG_CHOICES,
     AVAILABILITY_CHOICES,
 )
-from .timezone_choices import TIMEZONES_CHOICES
+from .timezone_choices import TIMEZONES, get_timezone_label
 from cities_light.models import City
+from core.reference_data import ReferenceDataFormMixin
 from dal import autocomplete
 
 
-class ProfileCreateForm(forms.ModelForm):
+class TimezoneSelect2(autocomplete.ListSelect2):
+    """
+    Timezone autocomplete widget, only rendering the selected timezone as an option.
+    The other timezones are searched and paged by the timezone autocomplete view.
+    """
+
+    def filter_choices_to_render(self, selected_choices):
+        self.choices = [
+            (tz, get_timezone_label(tz)) for tz in selected_choices if tz in TIMEZONES
+        ]
+
+
+class TimezoneField(forms.CharField):
+    """
+    Form field for a timezone name, validated against the set of available timezones
+    instead of a list of choices.
+    """
+
+    widget = TimezoneSelect2
+
+    def validate(self, value):
+        super().validate(value)
+        if value and value not in TIMEZONES:
+            raise forms.ValidationError(
+                "Select a valid choice. %(value)s is not one of the available choices.",
+                code="invalid_choice",
+                params={"value": value},
+            )
+
+
+class ProfileCreateForm(ReferenceDataFormMixin, forms.ModelForm):
     """
     Form for creating Profile
     """
@@ -66,9 +97,8 @@ class ProfileCreateForm(forms.ModelForm):
         required=False,
     )
 
-    timezone = forms.ChoiceField(
-        choices=TIMEZONES_CHOICES,
-        widget=autocomplete.ListSelect2(
+    timezone = TimezoneField(
+        widget=TimezoneSelect2(
             url="profiles:timezone_autocomplete",
             attrs={
                 "class": "form-control",
@@ -119,7 +149,7 @@ class ProfileCreateForm(forms.ModelForm):
         ]
 
 
-class ProfileEditGeneralInfoForm(forms.ModelForm):
+class ProfileEditGeneralInfoForm(ReferenceDataFormMixin, forms.ModelForm):
     """
     Form for editing Profile General Info in Profile Detail
     """
@@ -321,7 +351,7 @@ class ProfileEditPicturesForm(forms.ModelForm):
         ]
 
 
-class ProfileEditGenresForm(forms.ModelForm):
+class ProfileEditGenresForm(ReferenceDataFormMixin, forms.ModelForm):
     """
     Form for editing Genres in Profile Detail
     """
@@ -366,7 +396,7 @@ class ProfileEditGenresForm(forms.ModelForm):
         ]
 
 
-class ProfileEditSkillsForm(forms.ModelForm):
+class ProfileEditSkillsForm(ReferenceDataFormMixin, forms.ModelForm):
     """
     Form for editing Skills in Profile Detail
     """
@@ -559,9 +589,8 @@ class ProfileEditTimezoneForm(forms.ModelForm):
     Form for editing Timezone in Profile Settings
     """
 
-    timezone = forms.ChoiceField(
-        choices=TIMEZONES_CHOICES,
-        widget=autocomplete.ListSelect2(
+    timezone = TimezoneField(
+        widget=TimezoneSelect2(
             url="profiles:timezone_autocomplete",
             attrs={
                 "class": "form-control",
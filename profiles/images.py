@@ -0,0 +1,110 @@
+import logging
+
+from django.db.models import Q
+from PIL import Image, UnidentifiedImageError
+
+from core import images
+from core.cache_utils import bump_version, get_namespace
+from jobs.queue import job
+
+from .models import PICTURE_DERIVATIVE_SIZES, PICTURE_MAX_SIZES, Profile
+
+logger = logging.getLogger(__name__)
+
+
+def get_derivatives_field(field_name):
+    """
+    Returns the name of the field describing the derivatives of a picture field
+    """
+
+    return f"{field_name}_derivatives"
+
+
+def needs_derivatives(profile, field_name):
+    """
+    Returns True if the derivatives of the picture were not generated from its current file
+    (new picture, or removed picture whose derivatives are left).
+    """
+
+    derivatives = getattr(profile, get_derivatives_field(field_name)) or {}
+    return derivatives.get("source") != (getattr(profile, field_name).name or None)
+
+
+@job
+def update_picture_derivatives(profile_pk, field_name, force=False):
+    """
+    Resizes a picture of a profile to fit PICTURE_MAX_SIZES, generates its derivatives and deletes those
+    of its previous file. Returns True if the derivatives were updated, pictures which cannot be read
+    are recorded as unreadable.
+
+    Run as a background job after the picture is uploaded, the derivatives are only recorded
+    if the picture has not been changed again in the meantime.
+    """
+
+    derivatives_field = get_derivatives_field(field_name)
+    profile = (
+        Profile.objects.filter(pk=profile_pk)
+        .only(field_name, derivatives_field)
+        .first()
+    )
+    if profile is None or not (force or needs_derivatives(profile, field_name)):
+        return False
+
+    field_file = getattr(profile, field_name)
+    uploaded_name = field_file.name
+    previous = getattr(profile, derivatives_field) or {}
+    derivatives = {}
+    if field_file:
+        try:
+            # The uploads are stored as they are during the request, and capped here
+            field_file.name = images.cap_image(
+                field_file, *PICTURE_MAX_SIZES[field_name]
+            )
+            derivatives = images.generate_derivatives(
+                field_file, PICTURE_DERIVATIVE_SIZES[field_name]
+            )
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+            logger.warning(
+                "Could not generate the derivatives of %s",
+                field_file.name,
+                exc_info=True,
+            )
+            # Record the picture as unreadable, it is rendered as missing rather than as its original
+            derivatives = {"source": field_file.name, "sizes": {}, "unreadable": True}
+
+    if field_file:
+        unchanged = Q(**{field_name: uploaded_name})
+    else:
+        unchanged = Q(**{field_name: ""}) | Q(**{f"{field_name}__isnull": True})
+    changes = {derivatives_field: derivatives}
+    if field_file.name != uploaded_name:
+        # The storage saved the resized picture under another name
+        changes[field_name] = field_file.name
+    updated = Profile.objects.filter(unchanged, pk=profile_pk).update(**changes)
+    if not updated and field_name in changes:
+        field_file.storage.delete(field_file.name)
+
+    # Delete the files of the derivatives left unused, those of the previous file if they were replaced,
+    # otherwise the ones just generated from an outdated file
+    kept, unused = (derivatives, previous) if updated else (previous, derivatives)
+    kept_names = {
+        name
+        for derivative in kept.get("sizes", {}).values()
+        for name in derivative.values()
+    }
+    unused = {
+        "sizes": {
+            size: {
+                format: name
+                for format, name in derivative.items()
+                if format in images.DERIVATIVE_FORMATS and name not in kept_names
+            }
+            for size, derivative in unused.get("sizes", {}).items()
+        }
+    }
+    images.delete_derivatives(field_file.storage, unused)
+
+    if updated:
+        # The update bypasses the signals invalidating the cached profiles
+        bump_version(get_namespace(Profile))
+    return bool(updated) and not derivatives.get("unreadable")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from profiles.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Backfills the video_count and has_profile_picture columns of every profile"
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("Backfilling profile media flags...")
+
+        # Recompute the flags of every profile in a single UPDATE
+        updated = Profile.objects.all().update_media_flags()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully backfilled {updated} profiles")
+        )
@@ -0,0 +1,60 @@
+import time
+
+from cities_light.models import City
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from profiles.city_index import CityIndex
+
+# Queries typed in the location autocomplete, from the first keystroke
+DEFAULT_QUERIES = ["s", "sa", "san", "lon", "new y", "kuala", "jakarta", "sao pa"]
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the city prefix index of the location autocomplete against the previous icontains query"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "queries", nargs="*", default=DEFAULT_QUERIES, help="Queries to look up"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Number of runs of each query"
+        )
+
+    def measure(self, function, repeat):
+        """
+        Returns the average duration of the function in milliseconds
+        """
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        return (time.perf_counter() - start) * 1000 / repeat
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        limit = settings.CITY_AUTOCOMPLETE_LIMIT
+
+        start = time.perf_counter()
+        index = CityIndex.load()
+        self.stdout.write(
+            f"Loaded {len(index)} keys of {City.objects.count()} cities "
+            f"in {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+
+        def icontains(query):
+            # The previous lookup: a count and the first page, as paginated by the autocomplete view
+            queryset = City.objects.filter(name__icontains=query)
+            queryset.count()
+            return list(queryset[:10])
+
+        def prefix_index(query):
+            # The index lookup and the fetch of the first page, without the per prefix cache
+            city_ids = index.search(query, limit)
+            return City.objects.only("id", "display_name").in_bulk(city_ids[:10])
+
+        self.stdout.write(f"{'query':<12}{'icontains':>14}{'prefix index':>16}")
+        for query in options["queries"]:
+            before = self.measure(lambda: icontains(query), repeat)
+            after = self.measure(lambda: prefix_index(query), repeat)
+            self.stdout.write(f"{query!r:<12}{before:>11.2f} ms{after:>13.2f} ms")
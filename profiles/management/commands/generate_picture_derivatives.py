@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from profiles.images import (
+    get_derivatives_field,
+    needs_derivatives,
+    update_picture_derivatives,
+)
+from profiles.models import PICTURE_DERIVATIVE_SIZES, Profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the missing derivatives (resized WebP and JPEG copies) of the profile and cover pictures, "
+        "e.g. for the pictures uploaded before they existed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate the derivatives of every picture, e.g. after changing their sizes",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Generating picture derivatives...")
+
+        fields = list(PICTURE_DERIVATIVE_SIZES)
+        has_picture = Q()
+        for field_name in fields:
+            has_picture |= ~Q(**{field_name: ""}) & Q(
+                **{f"{field_name}__isnull": False}
+            )
+
+        # Only load the pictures and their derivatives
+        profiles = (
+            Profile.objects.filter(has_picture)
+            .only(*fields, *map(get_derivatives_field, fields))
+            .order_by("pk")
+        )
+
+        updated = 0
+        for profile in profiles.iterator(chunk_size=500):
+            for field_name in fields:
+                if not getattr(profile, field_name):
+                    continue
+                if options["force"] or needs_derivatives(profile, field_name):
+                    updated += update_picture_derivatives(
+                        profile.pk, field_name, force=options["force"]
+                    )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully generated the derivatives of {updated} pictures"
+            )
+        )
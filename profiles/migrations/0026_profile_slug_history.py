@@ -0,0 +1,41 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0025_profile_media_flags"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProfileSlugHistory",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("slug", models.SlugField(unique=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="slug_history",
+                        to="profiles.profile",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Profile slug history",
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0026_profile_slug_history"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="cover_picture_derivatives",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="profile_picture_derivatives",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="profile",
+            name="cover_picture",
+            field=models.ImageField(
+                blank=True, null=True, upload_to="profiles/cover_pics/"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="profile",
+            name="profile_picture",
+            field=models.ImageField(
+                blank=True, null=True, upload_to="profiles/profile_pics/"
+            ),
+        ),
+    ]
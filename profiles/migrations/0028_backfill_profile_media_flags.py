@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from profiles.models import ProfileQuerySet
+
+
+def backfill_media_flags(apps, schema_editor):
+    """
+    Computes the video_count and has_profile_picture columns of the existing profiles,
+    which the has_youtube_video and has_profile_picture filters read.
+    Uses the same single UPDATE as the backfill_profile_media_flags command, on the historical model.
+    """
+    Profile = apps.get_model("profiles", "Profile")
+
+    ProfileQuerySet.update_media_flags(Profile.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0027_profile_picture_derivatives"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_media_flags, migrations.RunPython.noop),
+    ]
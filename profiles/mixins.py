@@ -1,5 +1,9 @@
 from django.shortcuts import redirect
 from django.contrib import messages
+from django.http import Http404
+from django.urls import reverse
+
+from .models import ProfileSlugHistory
 
 
 class ProfileRequiredMixin:
@@ -27,3 +31,32 @@ class ProfileRequiredMixin:
 
         # If the user has a profile, proceed with the normal dispatch process
         return super().dispatch(request, *args, **kwargs)
+
+
+class ProfileSlugRedirectMixin:
+    """
+    Mixin for the profile pages looked up by slug, redirecting the previous slugs of a renamed profile
+    to its current slug. The slug history is only looked up when no profile has the slug.
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            return super().get(request, *args, **kwargs)
+        except Http404:
+            history = (
+                ProfileSlugHistory.objects.filter(slug=kwargs.get("slug"))
+                .select_related("profile")
+                .only("profile__slug")
+                .first()
+            )
+            if history is None:
+                raise
+
+        # Redirect permanently to the same page of the profile, keeping the query string
+        url = reverse(
+            request.resolver_match.view_name,
+            kwargs={**kwargs, "slug": history.profile.slug},
+        )
+        if request.META.get("QUERY_STRING"):
+            url = f"{url}?{request.META['QUERY_STRING']}"
+        return redirect(url, permanent=True)
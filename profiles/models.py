@@ -1,15 +1,51 @@
-from django.db import models
+import re
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Q, Value, When
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.urls import reverse
 from django.utils.text import slugify
 from django.utils import timezone
-from django_resized import ResizedImageField
 from embed_video.fields import EmbedVideoField
 
+from core import reference_data
+from core.images import DerivativeImage
+
 # Import the fixed list of timezone choices
 from .timezone_choices import TIMEZONES_CHOICES
 
+# Music video fields of the profile, counted in Profile.video_count
+YOUTUBE_LINK_FIELDS = [f"youtube_link_{i}" for i in range(1, 7)]
+
+# Fields the media flags (video_count, has_profile_picture) are computed from
+MEDIA_FIELDS = YOUTUBE_LINK_FIELDS + ["profile_picture"]
+
+# Derivatives generated from the pictures of the profiles, by picture field:
+# name of each size with its (width, height), a height crops the picture to fill it.
+# The inbox and header avatars are displayed at 40px and the cards at 150px, at up to 2x density.
+PICTURE_DERIVATIVE_SIZES = {
+    "profile_picture": {
+        "avatar": (96, 96),
+        "card": (320, 320),
+        "full": (500, 500),
+    },
+    "cover_picture": {
+        "card": (960, None),
+        "full": (1920, None),
+    },
+}
+
+# Largest (width, height) the pictures are stored at, the uploads are resized to fit by the derivatives job.
+# They are what is displayed until the derivatives are generated.
+PICTURE_MAX_SIZES = {
+    "profile_picture": (500, 500),
+    "cover_picture": (1920, None),
+}
+
+# Number of times Profile.save allocates a new slug when the allocated one is taken concurrently
+SLUG_ALLOCATION_ATTEMPTS = 5
+
 COMMITMENT_CHOICES = [
     ("", "----"),
     ("just_for_fun", "Just for Fun"),
@@ -48,6 +84,7 @@ AVAILABILITY_CHOICES = [
 ]
 
 
+@reference_data.register
 class ProfileType(models.Model):
     """
     Model for storing Profile Types
@@ -59,6 +96,7 @@ class ProfileType(models.Model):
         return self.name
 
 
+@reference_data.register
 class Genre(models.Model):
     """
     Model for storing Genres
@@ -70,6 +108,7 @@ class Genre(models.Model):
         return self.name
 
 
+@reference_data.register
 class Skill(models.Model):
     """
     Model for storing Skills
@@ -81,6 +120,86 @@ class Skill(models.Model):
         return self.name
 
 
+class ProfileQuerySet(models.QuerySet):
+    """
+    QuerySet for Profiles
+    """
+
+    def for_cards(self):
+        """
+        Shapes the queryset for profile cards (profile lists, bookmarks, inbox search).
+        Joins the profile type and location country rendered on every card,
+        and only loads the columns the cards display so the large text columns are left out.
+        """
+
+        return self.select_related("profile_type", "location__country").only(
+            "user",
+            "display_name",
+            "slug",
+            "profile_picture",
+            "profile_picture_derivatives",
+            "created",
+            "last_updated",
+            "profile_type__name",
+            "location__country__name",
+        )
+
+    def update_media_flags(self):
+        """
+        Recomputes the video_count and has_profile_picture columns of the profiles in a single UPDATE,
+        used to backfill them.
+        """
+
+        def is_set(field):
+            return Q(**{f"{field}__isnull": False}) & ~Q(**{field: ""})
+
+        video_count = sum(
+            Case(When(is_set(field), then=Value(1)), default=Value(0))
+            for field in YOUTUBE_LINK_FIELDS
+        )
+        return self.update(
+            video_count=video_count,
+            has_profile_picture=Case(
+                When(is_set("profile_picture"), then=Value(True)),
+                default=Value(False),
+            ),
+        )
+
+    def allocate_slug(self, slug, exclude_pk=None):
+        """
+        Returns the slug if no profile has it, otherwise the slug followed by the first free "-N" suffix.
+        Every taken "slug" and "slug-N" is fetched in a single query, whatever the number of collisions.
+        """
+
+        queryset = self.filter(Q(slug=slug) | Q(slug__startswith=f"{slug}-"))
+        if exclude_pk is not None:
+            queryset = queryset.exclude(pk=exclude_pk)
+        taken = set(queryset.values_list("slug", flat=True))
+        if slug not in taken:
+            return slug
+
+        # Numeric suffixes in use, other slugs starting with "slug-" (e.g. "slug-band") do not collide
+        pattern = re.compile(rf"{re.escape(slug)}-([0-9]+)")
+        suffixes = {
+            int(match.group(1)) for match in map(pattern.fullmatch, taken) if match
+        }
+        counter = 1
+        while counter in suffixes:
+            counter += 1
+        return f"{slug}-{counter}"
+
+    def for_detail(self):
+        """
+        Shapes the queryset for the profile detail pages.
+        Joins the user, profile type and location, and prefetches the genres and skills,
+        so the loaded profile holds everything the pages render and can be cached as is.
+        """
+
+        return self.select_related(
+            "user", "profile_type", "location__country"
+        ).prefetch_related("genres", "skills")
+
+
 class Profile(models.Model):
     """
     Model for storing Profiles
@@ -94,18 +213,25 @@ class Profile(models.Model):
     location = models.ForeignKey(
         "cities_light.City", on_delete=models.SET_NULL, null=True, blank=True
     )
-    profile_picture = ResizedImageField(
-        size=[500, 500],  # Resize to width = 500px, height = 500px
+    # The pictures are stored as uploaded. A job then resizes them to fit PICTURE_MAX_SIZES and generates
+    # their derivatives (see PICTURE_DERIVATIVE_SIZES), on the worker or right after the request with JOBS_EAGER.
+    profile_picture = models.ImageField(
         upload_to="profiles/profile_pics/",
         null=True,
         blank=True,
     )
-    cover_picture = ResizedImageField(
-        size=[1920, None],  # Resize to width = 1920px, height = auto
+    cover_picture = models.ImageField(
         upload_to="profiles/cover_pics/",
         null=True,
         blank=True,
     )
+    # Descriptions of the derivatives of the pictures, maintained by profiles.images
+    profile_picture_derivatives = models.JSONField(
+        default=dict, blank=True, editable=False
+    )
+    cover_picture_derivatives = models.JSONField(
+        default=dict, blank=True, editable=False
+    )
     genres = models.ManyToManyField(Genre, blank=True)
     influences = models.TextField(blank=True)
     skills = models.ManyToManyField(Skill, blank=True)
@@ -118,6 +244,13 @@ class Profile(models.Model):
     youtube_link_4 = EmbedVideoField(null=True, blank=True)
     youtube_link_5 = EmbedVideoField(null=True, blank=True)
     youtube_link_6 = EmbedVideoField(null=True, blank=True)
+    # Media flags maintained by save() from the fields above, so the filters use a single indexed column
+    video_count = models.PositiveSmallIntegerField(
+        default=0, editable=False, db_index=True
+    )
+    has_profile_picture = models.BooleanField(
+        default=False, editable=False, db_index=True
+    )
     personal_website_social_link = models.URLField(null=True, blank=True)
     facebook_social_link = models.URLField(null=True, blank=True)
     youtube_social_link = models.URLField(null=True, blank=True)
@@ -155,6 +288,8 @@ class Profile(models.Model):
         choices=TIMEZONES_CHOICES,
     )
 
+    objects = ProfileQuerySet.as_manager()
+
     @property
     def age(self):
         """
@@ -176,6 +311,29 @@ class Profile(models.Model):
     def __str__(self):
         return f"{self.display_name} - {self.user.email}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the slug loaded from the database, save() only allocates a slug when it changes
+        instance._loaded_slug = instance.__dict__.get("slug")
+        return instance
+
+    @property
+    def profile_picture_image(self):
+        """
+        The profile picture with its derivatives, rendered by the `picture` template tag
+        """
+
+        return DerivativeImage(self.profile_picture, self.profile_picture_derivatives)
+
+    @property
+    def cover_picture_image(self):
+        """
+        The cover picture with its derivatives, rendered by the `picture` template tag
+        """
+
+        return DerivativeImage(self.cover_picture, self.cover_picture_derivatives)
+
     def get_absolute_url(self):
         """
         Returns the URL to access a particular profile instance.
@@ -194,28 +352,93 @@ class Profile(models.Model):
         if self.birthday and self.birthday > timezone.now().date():
             raise ValidationError("Birthday cannot be in the future.")
 
+    def update_media_flags(self):
+        """
+        Computes the video_count and has_profile_picture flags from the music videos and profile picture.
+        """
+
+        self.video_count = sum(
+            1 for field in YOUTUBE_LINK_FIELDS if getattr(self, field)
+        )
+        self.has_profile_picture = bool(self.profile_picture)
+
     def save(self, *args, **kwargs):
         """
         Custom save method for the Profile model to automatically generate a unique slug based on the display name.
         If the slug is not provided, it is generated from the display name.
-        The method also ensures that the slug is unique by appending a counter if necessary.
+        The method also ensures that the slug is unique by appending the first free counter if necessary,
+        and records the previous slug of the profile when it changes.
         """
 
-        # Check if the slug is already set; if not, generate it from the display name
-        if not self.slug:
-            self.slug = slugify(self.display_name)
-
-        # Loop to ensure the slug is unique
-        original_slug = self.slug
-        queryset = Profile.objects.all().exclude(pk=self.pk)
+        # Keep the media flags in sync with the music videos and profile picture,
+        # unless the save does not touch them (partial save, or media fields not loaded)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            sync_media_flags = bool(set(update_fields) & set(MEDIA_FIELDS))
+        else:
+            sync_media_flags = not set(MEDIA_FIELDS) & self.get_deferred_fields()
+        if sync_media_flags:
+            self.update_media_flags()
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {
+                    "video_count",
+                    "has_profile_picture",
+                }
+
+        # Allocate a unique slug when the profile is created or its slug is changed,
+        # unless the save does not touch it (partial save, or slug not loaded)
+        loaded_slug = getattr(self, "_loaded_slug", None)
+        allocate_slug = (
+            "slug" not in self.get_deferred_fields()
+            and (update_fields is None or "slug" in update_fields)
+            and (self._state.adding or not self.slug or self.slug != loaded_slug)
+        )
+        if not allocate_slug:
+            super().save(*args, **kwargs)
+            return
+
+        # Generate the slug from the display name if it is not set
+        slug = self.slug or slugify(self.display_name)
+
+        for attempt in range(SLUG_ALLOCATION_ATTEMPTS):
+            self.slug = Profile.objects.allocate_slug(slug, exclude_pk=self.pk)
+            try:
+                # The savepoint keeps the transaction usable if the unique constraint fails
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                break
+            except IntegrityError:
+                # Allocate again if another profile took the slug since it was allocated,
+                # any other integrity error is raised
+                slug_taken = (
+                    Profile.objects.filter(slug=self.slug).exclude(pk=self.pk).exists()
+                )
+                if not slug_taken or attempt == SLUG_ALLOCATION_ATTEMPTS - 1:
+                    raise
+
+        # Keep the previous slug, so the links to it redirect to the new one
+        if loaded_slug and loaded_slug != self.slug:
+            ProfileSlugHistory.objects.update_or_create(
+                slug=loaded_slug, defaults={"profile": self}
+            )
+        # The new slug is in use, it no longer redirects to the profile which had it before
+        ProfileSlugHistory.objects.filter(slug=self.slug).delete()
+        self._loaded_slug = self.slug
+
+
+class ProfileSlugHistory(models.Model):
+    """
+    Model for storing the previous slugs of the profiles, so the links to a renamed profile redirect to it
+    """
 
-        # Initialize a counter to append to the slug if necessary
-        counter = 1
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="slug_history"
+    )
+    slug = models.SlugField(unique=True)
+    created = models.DateTimeField(auto_now_add=True)
 
-        # Loop to ensure the slug is unique
-        while queryset.filter(slug=self.slug).exists():
-            # If a profile with the same slug exists, append the counter to the original slug
-            self.slug = f"{original_slug}-{counter}"
-            counter += 1  # Increment the counter for the next iteration if needed
+    class Meta:
+        verbose_name_plural = "Profile slug history"
 
-        super().save(*args, **kwargs)
+    def __str__(self):
+        return f"{self.slug} -> {self.profile.slug}"
@@ -0,0 +1,51 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import images
+from core.tasks import delete_files
+
+from .images import get_derivatives_field, needs_derivatives, update_picture_derivatives
+from .models import PICTURE_DERIVATIVE_SIZES, Profile
+
+
+@receiver(post_save, sender=Profile)
+def schedule_picture_derivatives(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    """
+    Signal receiver that queues the generation of the derivatives of the pictures changed by the save
+    as background jobs, off the request path.
+    """
+    if raw:
+        return
+
+    deferred = instance.get_deferred_fields()
+    for field_name in PICTURE_DERIVATIVE_SIZES:
+        # Skip the pictures the save does not touch (partial save, or picture not loaded)
+        if update_fields is not None and field_name not in update_fields:
+            continue
+        if {field_name, get_derivatives_field(field_name)} & deferred:
+            continue
+        if needs_derivatives(instance, field_name):
+            update_picture_derivatives.delay(instance.pk, field_name)
+
+
+@receiver(post_delete, sender=Profile)
+def delete_picture_derivatives(sender, instance, **kwargs):
+    """
+    Signal receiver that queues the deletion of the derivatives of the pictures of a deleted profile
+    once it is committed, django-cleanup deleting the pictures themselves.
+    """
+    for field_name in PICTURE_DERIVATIVE_SIZES:
+        names = images.get_derivative_names(
+            instance.__dict__.get(get_derivatives_field(field_name))
+        )
+        if names:
+            transaction.on_commit(
+                partial(
+                    delete_files.delay, Profile._meta.label_lower, field_name, names
+                )
+            )
@@ -0,0 +1,175 @@
+from decimal import Decimal
+from io import StringIO
+
+from cities_light.models import City, Country, Region
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from profiles.city_index import (
+    CityGeoIndex,
+    CityIndex,
+    filter_within_city_radius,
+    normalize,
+    search_cities,
+)
+from profiles.models import Profile
+
+
+class CityIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.brazil = Country.objects.create(name="Brazil", code2="BR")
+        self.usa = Country.objects.create(name="United States", code2="US")
+        self.california = Region.objects.create(name="California", country=self.usa)
+
+        self.sao_paulo = City.objects.create(
+            name="São Paulo", country=self.brazil, population=12_000_000
+        )
+        self.san_francisco = City.objects.create(
+            name="San Francisco",
+            region=self.california,
+            country=self.usa,
+            population=800_000,
+            alternate_names="SF;Frisco",
+        )
+        self.san_jose = City.objects.create(
+            name="San Jose",
+            region=self.california,
+            country=self.usa,
+            population=1_000_000,
+        )
+        self.san = City.objects.create(name="San", country=self.usa, population=100)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_normalize(self):
+        self.assertEqual(normalize("São Paulo"), "saopaulo")
+        self.assertEqual(normalize("  New-York "), "newyork")
+        self.assertEqual(normalize(None), "")
+
+    def test_prefix_ranked_by_exact_match_then_population(self):
+        index = CityIndex.load()
+
+        self.assertEqual(
+            index.search("san", 10),
+            [self.san.pk, self.san_jose.pk, self.san_francisco.pk],
+        )
+        self.assertEqual(index.search("san", 2), [self.san.pk, self.san_jose.pk])
+
+    def test_ascii_folded_and_alternate_names(self):
+        index = CityIndex.load()
+
+        self.assertEqual(index.search("sao pau", 10), [self.sao_paulo.pk])
+        self.assertEqual(index.search("SÃO", 10), [self.sao_paulo.pk])
+        self.assertEqual(index.search("fris", 10), [self.san_francisco.pk])
+        self.assertEqual(index.search("?", 10), [])
+        self.assertEqual(index.search("paris", 10), [])
+
+    def test_search_cities_is_cached_and_invalidated(self):
+        self.assertEqual(search_cities("san j"), [self.san_jose.pk])
+        with self.assertNumQueries(0):
+            self.assertEqual(search_cities("San J"), [self.san_jose.pk])
+
+        san_juan = City.objects.create(name="San Juan", country=self.usa, population=5)
+        self.assertEqual(search_cities("san j"), [self.san_jose.pk, san_juan.pk])
+
+    def test_location_autocomplete(self):
+        response = self.client.get(
+            reverse("profiles:location_autocomplete"), {"q": "san"}
+        )
+
+        results = response.json()["results"]
+        self.assertEqual(
+            [result["id"] for result in results],
+            [str(self.san.pk), str(self.san_jose.pk), str(self.san_francisco.pk)],
+        )
+        self.assertEqual(results[2]["text"], str(self.san_francisco))
+
+    def test_location_autocomplete_without_query(self):
+        response = self.client.get(reverse("profiles:location_autocomplete"))
+
+        results = response.json()["results"]
+        self.assertEqual(results[0]["id"], str(self.sao_paulo.pk))
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("benchmark_city_autocomplete", "san", repeat=1, stdout=out)
+        self.assertIn("'san'", out.getvalue())
+
+
+class CityGeoIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        usa = Country.objects.create(name="United States", code2="US")
+        fiji = Country.objects.create(name="Fiji", code2="FJ")
+        self.cities = {
+            name: City.objects.create(
+                name=name,
+                country=country,
+                latitude=Decimal(str(latitude)),
+                longitude=Decimal(str(longitude)),
+            )
+            for name, country, latitude, longitude in [
+                ("San Francisco", usa, 37.7749, -122.4194),
+                ("Oakland", usa, 37.8044, -122.2712),
+                ("San Jose", usa, 37.3382, -121.8863),
+                ("Los Angeles", usa, 34.0522, -118.2437),
+                ("Labasa", fiji, -16.4167, 179.3833),
+                ("Rabi", fiji, -16.5, -179.98),
+            ]
+        }
+        City.objects.create(name="Nowhere", country=usa)
+
+    def tearDown(self):
+        cache.clear()
+
+    def search(self, name, radius_km):
+        city = self.cities[name]
+        index = CityGeoIndex.load()
+        city_ids, distances = index.search(
+            float(city.latitude), float(city.longitude), radius_km
+        )
+        pks = {city.pk: name for name, city in self.cities.items()}
+        return [pks[city_id] for city_id in city_ids], distances
+
+    def test_cities_within_radius_nearest_first(self):
+        names, distances = self.search("San Francisco", 100)
+        self.assertEqual(names, ["San Francisco", "Oakland", "San Jose"])
+        self.assertEqual(distances[0], 0)
+        self.assertAlmostEqual(distances[2], 67.9, delta=1)
+
+        names, _ = self.search("San Francisco", 50)
+        self.assertEqual(names, ["San Francisco", "Oakland"])
+
+    def test_cities_across_the_antimeridian(self):
+        names, _ = self.search("Labasa", 100)
+        self.assertEqual(names, ["Labasa", "Rabi"])
+
+    def test_cities_without_coordinates_are_not_indexed(self):
+        self.assertEqual(len(CityGeoIndex.load()), len(self.cities))
+
+    def test_filter_within_city_radius(self):
+        for name in ["San Jose", "Los Angeles", "Oakland"]:
+            user = get_user_model().objects.create_user(username=name.lower())
+            Profile.objects.create(
+                user=user, display_name=name, location=self.cities[name]
+            )
+        city = self.cities["San Francisco"]
+
+        profiles = filter_within_city_radius(
+            Profile.objects.all(),
+            "location",
+            float(city.latitude),
+            float(city.longitude),
+            100,
+        ).order_by("distance")
+        self.assertEqual(
+            [profile.display_name for profile in profiles], ["Oakland", "San Jose"]
+        )
+        self.assertAlmostEqual(profiles[1].distance, 67.9, delta=1)
+        # The distance is computed from the coordinates of the cities, not listed per candidate city
+        self.assertNotIn("CASE", str(profiles.query))
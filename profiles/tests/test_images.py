@@ -0,0 +1,238 @@
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core import images
+from jobs.models import Job
+from jobs.queue import run_pending
+from profiles.images import needs_derivatives, update_picture_derivatives
+from profiles.models import PICTURE_DERIVATIVE_SIZES, Profile
+
+User = get_user_model()
+
+
+def make_upload(name="picture.png", size=(800, 600)):
+    """Returns an uploaded PNG picture with transparency."""
+    output = BytesIO()
+    Image.new("RGBA", size, (200, 30, 30, 128)).save(output, "PNG")
+    return SimpleUploadedFile(name, output.getvalue(), content_type="image/png")
+
+
+@override_settings(JOBS_EAGER=True)
+class PictureDerivativesTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        # Store the pictures and their derivatives in a temporary directory
+        storage = FileSystemStorage(location=media.name, base_url="/media/")
+        for field_name in PICTURE_DERIVATIVE_SIZES:
+            patcher = mock.patch.object(
+                Profile._meta.get_field(field_name), "storage", storage
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=user, display_name="Test User")
+
+    def upload(self, field_name="profile_picture", **kwargs):
+        """Uploads a picture and runs the file deletions of django-cleanup scheduled on commit."""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            setattr(self.profile, field_name, make_upload(**kwargs))
+            self.profile.save()
+        self.profile.refresh_from_db()
+        return callbacks
+
+    @override_settings(JOBS_EAGER=False)
+    def test_derivatives_are_generated_by_a_job(self):
+        self.upload()
+        # Nothing is generated during the request, a job is queued
+        self.assertEqual(self.profile.profile_picture_derivatives, {})
+        self.assertEqual(
+            list(Job.objects.values_list("name", "args")),
+            [
+                (
+                    "profiles.images.update_picture_derivatives",
+                    [self.profile.pk, "profile_picture"],
+                )
+            ],
+        )
+
+        # The picture is stored as uploaded during the request
+        with self.profile.profile_picture.open("rb") as file:
+            self.assertEqual(Image.open(file).size, (800, 600))
+
+        self.assertEqual(run_pending(), 1)
+        self.profile.refresh_from_db()
+
+        # The job resized it to fit 500px, keeping its format
+        with self.profile.profile_picture.open("rb") as file:
+            image = Image.open(file)
+            self.assertEqual((image.format, image.size), ("PNG", (500, 375)))
+
+        derivatives = self.profile.profile_picture_derivatives
+        self.assertEqual(derivatives["source"], self.profile.profile_picture.name)
+        self.assertEqual(
+            {
+                size: derivative["width"]
+                for size, derivative in derivatives["sizes"].items()
+            },
+            {"avatar": 96, "card": 320, "full": 375},
+        )
+
+        storage = self.profile.profile_picture.storage
+        with storage.open(derivatives["sizes"]["avatar"]["webp"]) as file:
+            image = Image.open(file)
+            self.assertEqual((image.format, image.size), ("WEBP", (96, 96)))
+        with storage.open(derivatives["sizes"]["full"]["jpeg"]) as file:
+            image = Image.open(file)
+            self.assertEqual((image.format, image.size), ("JPEG", (375, 375)))
+
+    def test_cover_derivatives_keep_the_aspect_ratio(self):
+        self.upload("cover_picture", size=(2400, 800))
+
+        derivatives = self.profile.cover_picture_derivatives["sizes"]
+        self.assertEqual(derivatives["card"]["width"], 960)
+        with self.profile.cover_picture.storage.open(
+            derivatives["full"]["jpeg"]
+        ) as file:
+            self.assertEqual(Image.open(file).size, (1920, 640))
+        # The original is capped to the width of the cover
+        with self.profile.cover_picture.open("rb") as file:
+            self.assertEqual(Image.open(file).size, (1920, 640))
+
+    def test_small_pictures_are_kept_as_uploaded(self):
+        self.upload(size=(300, 200))
+        with self.profile.profile_picture.open("rb") as file:
+            self.assertEqual(Image.open(file).size, (300, 200))
+        self.assertEqual(
+            self.profile.profile_picture_derivatives["source"],
+            self.profile.profile_picture.name,
+        )
+
+    def test_saves_not_touching_the_pictures_queue_nothing(self):
+        self.upload()
+
+        with self.settings(JOBS_EAGER=False):
+            self.profile.bio = "Drummer"
+            self.profile.save()
+            Profile.objects.only("display_name").get(pk=self.profile.pk).save()
+        self.assertFalse(Job.objects.exists())
+
+    def test_previous_derivatives_are_deleted(self):
+        self.upload(name="first.png")
+        storage = self.profile.profile_picture.storage
+        previous = self.profile.profile_picture_derivatives["sizes"]["card"]["webp"]
+
+        self.upload(name="second.png")
+        self.assertNotEqual(
+            self.profile.profile_picture_derivatives["sizes"]["card"]["webp"], previous
+        )
+        self.assertFalse(storage.exists(previous))
+
+        # Removing the picture removes its derivatives
+        name = self.profile.profile_picture_derivatives["sizes"]["card"]["webp"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.profile_picture = None
+            self.profile.save()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.profile_picture_derivatives, {})
+        self.assertFalse(storage.exists(name))
+
+    @override_settings(JOBS_EAGER=False)
+    def test_files_of_deleted_profiles_are_deleted_by_jobs(self):
+        self.upload()
+        run_pending()
+        self.profile.refresh_from_db()
+        storage = self.profile.profile_picture.storage
+        names = [self.profile.profile_picture.name] + images.get_derivative_names(
+            self.profile.profile_picture_derivatives
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.delete()
+        # The files are still there until the jobs run
+        self.assertTrue(all(storage.exists(name) for name in names))
+        self.assertEqual(
+            set(Job.objects.values_list("name", flat=True)),
+            {"core.tasks.delete_files"},
+        )
+
+        run_pending()
+        self.assertFalse(any(storage.exists(name) for name in names))
+
+    def test_outdated_derivatives_are_not_recorded(self):
+        generate_derivatives = images.generate_derivatives
+
+        def generate_then_change_picture(field_file, sizes):
+            derivatives = generate_derivatives(field_file, sizes)
+            # The picture changes again while the derivatives of the first one are generated
+            Profile.objects.filter(pk=self.profile.pk).update(
+                profile_picture="profiles/profile_pics/other.png"
+            )
+            return derivatives
+
+        with mock.patch(
+            "core.images.generate_derivatives", side_effect=generate_then_change_picture
+        ):
+            self.upload()
+
+        self.assertEqual(self.profile.profile_picture_derivatives, {})
+        # The derivatives of the first picture were deleted
+        storage = self.profile.profile_picture.storage
+        _, files = storage.listdir("profiles/profile_pics/derivatives")
+        self.assertEqual(files, [])
+
+    def test_unreadable_picture(self):
+        Profile.objects.filter(pk=self.profile.pk).update(
+            profile_picture="profiles/profile_pics/missing.png"
+        )
+        with self.assertLogs("profiles.images", "WARNING"):
+            self.assertFalse(
+                update_picture_derivatives(self.profile.pk, "profile_picture")
+            )
+
+        # The picture is recorded as unreadable and rendered as missing, instead of its original
+        self.profile.refresh_from_db()
+        self.assertFalse(self.profile.profile_picture_image)
+        self.assertFalse(
+            needs_derivatives(self.profile, "profile_picture"),
+        )
+        response = self.client.get(reverse("profiles:profile_list"))
+        self.assertNotContains(response, "missing.png")
+        self.assertContains(response, "profile_pic_default.jpg")
+
+    def test_generate_picture_derivatives_command(self):
+        self.upload()
+        Profile.objects.update(profile_picture_derivatives={})
+
+        out = StringIO()
+        call_command("generate_picture_derivatives", stdout=out)
+        self.profile.refresh_from_db()
+        self.assertEqual(
+            self.profile.profile_picture_derivatives["source"],
+            self.profile.profile_picture.name,
+        )
+        self.assertIn(
+            "Successfully generated the derivatives of 1 pictures", out.getvalue()
+        )
+
+        # Nothing left to generate, unless forced
+        call_command("generate_picture_derivatives", stdout=out)
+        self.assertIn("derivatives of 0 pictures", out.getvalue())
+        call_command("generate_picture_derivatives", force=True, stdout=out)
+        self.assertIn("derivatives of 1 pictures", out.getvalue().splitlines()[-1])
+
+    def test_list_renders_derivatives(self):
+        self.upload()
+        response = self.client.get(reverse("profiles:profile_list"))
+        card = self.profile.profile_picture_derivatives["sizes"]["card"]
+        self.assertContains(response, f'/media/{card["webp"]} 320w')
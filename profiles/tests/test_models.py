@@ -1,9 +1,13 @@
-from django.test import TestCase
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import date
 from django.core.exceptions import ValidationError
-from profiles.models import Profile, ProfileType, Genre, Skill
+from profiles.models import Profile, ProfileType, Genre, Skill, ProfileSlugHistory
 
 User = get_user_model()
 
@@ -75,3 +79,106 @@ class ProfileModelTests(TestCase):
         )
         second_profile.save()
         self.assertEqual(second_profile.slug, "test-user-1")
+
+
+class ProfileSlugAllocationTests(TestCase):
+    def create_profile(self, display_name, slug=None):
+        user = User.objects.create_user(username=f"user{User.objects.count()}")
+        return Profile.objects.create(user=user, display_name=display_name, slug=slug)
+
+    def test_slug_is_allocated_in_a_single_query(self):
+        for _ in range(5):
+            self.create_profile("John Smith")
+        self.create_profile("John Smith Band")
+
+        with self.assertNumQueries(1):
+            slug = Profile.objects.allocate_slug("john-smith")
+        self.assertEqual(slug, "john-smith-5")
+
+    def test_first_free_suffix_is_allocated(self):
+        self.create_profile("John Smith")
+        self.create_profile("John Smith", slug="john-smith-2")
+        self.assertEqual(self.create_profile("John Smith").slug, "john-smith-1")
+        self.assertEqual(self.create_profile("John Smith").slug, "john-smith-3")
+
+    def test_unchanged_slug_is_not_allocated_again(self):
+        profile = Profile.objects.get(pk=self.create_profile("John Smith").pk)
+        profile.bio = "Guitarist"
+        profile.save()
+        self.assertEqual(profile.slug, "john-smith")
+        self.assertFalse(ProfileSlugHistory.objects.exists())
+
+    def test_changed_slug_is_recorded_in_history(self):
+        profile = Profile.objects.get(pk=self.create_profile("John Smith").pk)
+        profile.slug = "johnny"
+        profile.save()
+
+        history = ProfileSlugHistory.objects.get()
+        self.assertEqual((history.slug, history.profile), ("john-smith", profile))
+
+        # Taking the slug back removes it from the history
+        profile.slug = "john-smith"
+        profile.save()
+        self.assertEqual(
+            list(ProfileSlugHistory.objects.values_list("slug", flat=True)),
+            ["johnny"],
+        )
+
+    def test_slug_taken_concurrently_is_allocated_again(self):
+        self.create_profile("John Smith")
+        allocate_slug = Profile.objects.allocate_slug
+        calls = []
+
+        def stale_allocate_slug(slug, exclude_pk=None):
+            # The first allocation misses the profile created concurrently
+            calls.append(slug)
+            return slug if len(calls) == 1 else allocate_slug(slug, exclude_pk)
+
+        with mock.patch.object(
+            Profile.objects, "allocate_slug", side_effect=stale_allocate_slug
+        ):
+            profile = self.create_profile("John Smith")
+        self.assertEqual(profile.slug, "john-smith-1")
+        self.assertEqual(len(calls), 2)
+
+
+# The pictures are not stored, the jobs generating their derivatives are queued but not run
+@override_settings(JOBS_EAGER=False)
+class ProfileMediaFlagsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=self.user, display_name="Test User")
+
+    def test_flags_are_maintained_on_save(self):
+        self.assertEqual(self.profile.video_count, 0)
+        self.assertFalse(self.profile.has_profile_picture)
+
+        self.profile.youtube_link_1 = "https://www.youtube.com/watch?v=abc"
+        self.profile.youtube_link_3 = "https://www.youtube.com/watch?v=def"
+        self.profile.youtube_link_4 = ""
+        self.profile.profile_picture = "profiles/profile_pics/picture.jpg"
+        self.profile.save()
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.video_count, 2)
+        self.assertTrue(self.profile.has_profile_picture)
+
+    def test_flags_are_saved_with_update_fields(self):
+        self.profile.youtube_link_2 = "https://www.youtube.com/watch?v=abc"
+        self.profile.save(update_fields=["youtube_link_2"])
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.video_count, 1)
+
+    def test_backfill_command(self):
+        Profile.objects.filter(pk=self.profile.pk).update(
+            youtube_link_5="https://www.youtube.com/watch?v=abc",
+            youtube_link_6="",
+            profile_picture="profiles/profile_pics/picture.jpg",
+        )
+
+        call_command("backfill_profile_media_flags", stdout=StringIO())
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.video_count, 1)
+        self.assertTrue(self.profile.has_profile_picture)
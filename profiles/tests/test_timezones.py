@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from profiles.forms import ProfileEditTimezoneForm
+from profiles.timezone_choices import (
+    TIMEZONES,
+    TimezoneIndex,
+    format_offset,
+    get_timezone_label,
+)
+
+
+class TimezoneIndexTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.index = TimezoneIndex(date.today())
+
+    def test_format_offset(self):
+        self.assertEqual(format_offset(timedelta(hours=7)), "+07:00")
+        self.assertEqual(format_offset(timedelta(hours=-3, minutes=-30)), "-03:30")
+        self.assertEqual(format_offset(timedelta(0)), "+00:00")
+
+    def test_search_by_city_and_region(self):
+        self.assertEqual(self.index.search("new york"), ["America/New_York"])
+        self.assertEqual(self.index.search("new_york"), ["America/New_York"])
+        self.assertEqual(self.index.search("asia sing"), ["Asia/Singapore"])
+        self.assertEqual(self.index.search("kual"), ["Asia/Kuala_Lumpur"])
+
+    def test_search_by_offset(self):
+        # Jakarta stays at UTC+7 all year round
+        for query in ("+7", "utc+7", "UTC+07:00", "gmt+0700"):
+            self.assertIn("Asia/Jakarta", self.index.search(query))
+        self.assertNotIn("Asia/Jakarta", self.index.search("utc+8"))
+
+    def test_search_by_alias(self):
+        self.assertIn("America/New_York", self.index.search("eastern"))
+        self.assertIn("Asia/Jakarta", self.index.search("wib"))
+
+    def test_empty_query_returns_every_timezone(self):
+        self.assertEqual(len(self.index.search("  ")), len(TIMEZONES))
+
+    def test_label(self):
+        self.assertEqual(get_timezone_label("Asia/Jakarta"), "Asia/Jakarta (UTC+07:00)")
+
+
+class TimezoneAutocompleteTests(SimpleTestCase):
+    def get(self, **params):
+        return self.client.get(reverse("profiles:timezone_autocomplete"), params).json()
+
+    def test_results_are_paged(self):
+        first_page = self.get()
+        self.assertEqual(len(first_page["results"]), 20)
+        self.assertTrue(first_page["pagination"]["more"])
+
+        second_page = self.get(page=2)
+        self.assertNotEqual(first_page["results"][0], second_page["results"][0])
+
+        last_page = self.get(page=len(TIMEZONES) // 20 + 1)
+        self.assertFalse(last_page["pagination"]["more"])
+
+    def test_results_are_searched(self):
+        data = self.get(q="jakarta")
+        self.assertEqual(
+            data["results"],
+            [
+                {
+                    "id": "Asia/Jakarta",
+                    "text": "Asia/Jakarta (UTC+07:00)",
+                    "selected_text": "Asia/Jakarta (UTC+07:00)",
+                }
+            ],
+        )
+        self.assertFalse(data["pagination"]["more"])
+
+    def test_invalid_page(self):
+        self.assertEqual(len(self.get(page="x")["results"]), 20)
+
+
+class TimezoneFieldTests(SimpleTestCase):
+    def test_only_the_selected_timezone_is_rendered(self):
+        form = ProfileEditTimezoneForm(initial={"timezone": "Asia/Jakarta"})
+        html = str(form["timezone"])
+
+        self.assertEqual(html.count("<option"), 1)
+        self.assertIn("Asia/Jakarta (UTC+07:00)", html)
+
+    def test_validation(self):
+        field = ProfileEditTimezoneForm.base_fields["timezone"]
+
+        self.assertEqual(field.clean("Asia/Jakarta"), "Asia/Jakarta")
+        with self.assertRaises(ValidationError):
+            field.clean("Mars/Olympus_Mons")
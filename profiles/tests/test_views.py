@@ -0,0 +1,187 @@
+from decimal import Decimal
+
+from cities_light.models import City, Country
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from profiles.models import Profile, ProfileType
+
+User = get_user_model()
+
+
+class ProfileListQueryCountTests(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name="United Kingdom", code2="GB")
+        city = City.objects.create(name="Glasgow", country=country)
+        profile_type = ProfileType.objects.create(name="Musician")
+
+        for i in range(12):
+            user = User.objects.create_user(username=f"user{i}", password="password")
+            Profile.objects.create(
+                user=user,
+                display_name=f"User {i}",
+                profile_type=profile_type,
+                location=city,
+            )
+
+    def count_queries(self, url, page_size, **kwargs):
+        """Returns the number of queries run to render the url with the given page size."""
+        with self.settings(PAGE_SIZE=page_size):
+            # Warm up process wide caches (e.g. content types) so only the page itself is measured
+            self.client.get(url, **kwargs)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_profile_list_query_count_does_not_depend_on_page_size(self):
+        url = reverse("profiles:profile_list")
+        self.assertEqual(self.count_queries(url, 2), self.count_queries(url, 10))
+
+    def test_get_profiles_query_count_does_not_depend_on_page_size(self):
+        url = reverse("profiles:get_profiles")
+        self.assertEqual(
+            self.count_queries(url, 2, HTTP_HX_REQUEST="true"),
+            self.count_queries(url, 10, HTTP_HX_REQUEST="true"),
+        )
+
+    def test_card_shows_profile_type_and_country(self):
+        response = self.client.get(reverse("profiles:profile_list"))
+        self.assertContains(response, "Musician, United Kingdom")
+
+
+# The pictures are not stored, the jobs generating their derivatives are queued but not run
+@override_settings(JOBS_EAGER=False)
+class ProfileMediaFilterTests(TestCase):
+    def setUp(self):
+        for i, (videos, picture) in enumerate([(0, ""), (1, ""), (0, "a.jpg")]):
+            user = User.objects.create_user(username=f"user{i}", password="password")
+            profile = Profile(user=user, display_name=f"Media User {i}")
+            if videos:
+                profile.youtube_link_2 = "https://www.youtube.com/watch?v=abc"
+            # An emptied music video field does not count as a video
+            profile.youtube_link_1 = ""
+            profile.profile_picture = picture
+            profile.save()
+
+    def get_display_names(self, params):
+        response = self.client.get(reverse("profiles:profile_list"), params)
+        return {
+            f"Media User {i}"
+            for i in range(3)
+            if f"Media User {i}" in response.content.decode()
+        }
+
+    def test_has_youtube_video_filter(self):
+        with CaptureQueriesContext(connection) as queries:
+            names = self.get_display_names({"has_youtube_video": "on"})
+
+        self.assertEqual(names, {"Media User 1"})
+        self.assertFalse(
+            any("youtube_link" in query["sql"] for query in queries),
+            "The filter should only use the video count",
+        )
+
+    def test_has_profile_picture_filter(self):
+        self.assertEqual(
+            self.get_display_names({"has_profile_picture": "on"}), {"Media User 2"}
+        )
+
+
+class ProfileNearbySearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        country = Country.objects.create(name="United States", code2="US")
+        self.cities = {}
+        for name, latitude, longitude in [
+            ("Los Angeles", "34.0522", "-118.2437"),
+            ("San Jose", "37.3382", "-121.8863"),
+            ("Oakland", "37.8044", "-122.2712"),
+            ("San Francisco", "37.7749", "-122.4194"),
+        ]:
+            city = City.objects.create(
+                name=name,
+                country=country,
+                latitude=Decimal(latitude),
+                longitude=Decimal(longitude),
+            )
+            self.cities[name] = city
+            # Profiles are listed newest first, the nearest is the newest
+            user = User.objects.create_user(username=name, password="password")
+            Profile.objects.create(
+                user=user, display_name=f"Musician of {name}", location=city
+            )
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_display_names(self, params):
+        response = self.client.get(reverse("profiles:profile_list"), params)
+        self.assertEqual(response.status_code, 200)
+        return [profile.display_name for profile in response.context["profiles"]]
+
+    def test_within_radius_of_city(self):
+        names = self.get_display_names(
+            {"near": self.cities["San Francisco"].pk, "radius": 50}
+        )
+        self.assertEqual(names, ["Musician of San Francisco", "Musician of Oakland"])
+
+    def test_near_search_without_results(self):
+        tokyo = City.objects.create(
+            name="Tokyo",
+            country=Country.objects.create(name="Japan", code2="JP"),
+            latitude=Decimal("35.6895"),
+            longitude=Decimal("139.69171"),
+        )
+        self.assertEqual(self.get_display_names({"near": tokyo.pk}), [])
+
+    def test_sort_by_distance(self):
+        names = self.get_display_names(
+            {
+                "near": self.cities["Oakland"].pk,
+                "radius": 100,
+                "order_by": "distance",
+            }
+        )
+        self.assertEqual(
+            names,
+            [
+                "Musician of Oakland",
+                "Musician of San Francisco",
+                "Musician of San Jose",
+            ],
+        )
+
+    def test_sort_by_distance_without_city(self):
+        names = self.get_display_names({"order_by": "distance"})
+        self.assertEqual(len(names), 4)
+
+
+class ProfileSlugRedirectTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="testuser", password="password")
+        self.profile = Profile.objects.create(user=user, display_name="John Smith")
+        self.profile = Profile.objects.get(pk=self.profile.pk)
+        self.profile.slug = "johnny"
+        self.profile.save()
+
+    def test_previous_slug_redirects_to_current_slug(self):
+        for url_name in ["profiles:profile_detail", "profiles:profile_detail_ads"]:
+            response = self.client.get(
+                reverse(url_name, kwargs={"slug": "john-smith"}), {"tab": "1"}
+            )
+            self.assertRedirects(
+                response,
+                reverse(url_name, kwargs={"slug": "johnny"}) + "?tab=1",
+                status_code=301,
+            )
+
+    def test_unknown_slug_is_not_found(self):
+        response = self.client.get(
+            reverse("profiles:profile_detail", kwargs={"slug": "unknown"})
+        )
+        self.assertEqual(response.status_code, 404)
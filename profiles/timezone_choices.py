@@ -1,5 +1,136 @@
 # timezone_choices.py
+import re
 import zoneinfo
+from bisect import bisect_left
+from datetime import date, datetime
+from functools import lru_cache
 
 # Generate the fixed list of timezone choices
 TIMEZONES_CHOICES = [(tz, tz) for tz in sorted(zoneinfo.available_timezones())]
+
+# Set of the valid timezone names, for constant time validation
+TIMEZONES = frozenset(tz for tz, _ in TIMEZONES_CHOICES)
+
+# Common abbreviations and names people search time zones by
+TIMEZONE_ALIASES = {
+    "UTC": ["utc", "gmt", "zulu"],
+    "Europe/London": ["gmt", "bst", "uk", "britain"],
+    "Europe/Paris": ["cet", "cest"],
+    "Europe/Berlin": ["cet", "cest"],
+    "America/New_York": ["eastern", "est", "edt", "et"],
+    "America/Chicago": ["central", "cst", "cdt", "ct"],
+    "America/Denver": ["mountain", "mst", "mdt", "mt"],
+    "America/Phoenix": ["mst", "arizona"],
+    "America/Los_Angeles": ["pacific", "pst", "pdt", "pt"],
+    "America/Anchorage": ["alaska", "akst", "akdt"],
+    "Pacific/Honolulu": ["hawaii", "hst"],
+    "Asia/Jakarta": ["wib", "indonesia"],
+    "Asia/Makassar": ["wita"],
+    "Asia/Jayapura": ["wit"],
+    "Asia/Kuala_Lumpur": ["myt", "malaysia"],
+    "Asia/Singapore": ["sgt", "singapore"],
+    "Asia/Kolkata": ["ist", "india"],
+    "Asia/Shanghai": ["china", "beijing"],
+    "Asia/Tokyo": ["jst", "japan"],
+    "Australia/Sydney": ["aest", "aedt"],
+}
+
+# Characters separating the words of a timezone name, and of a search query
+NAME_SEPARATORS = re.compile(r"[/_-]+")
+QUERY_SEPARATORS = re.compile(r"[\s/_,()]+")
+
+# Character sorting after every character of a token
+TOKEN_END = "\uffff"
+
+
+def format_offset(offset):
+    """
+    Formats a UTC offset (a timedelta) as "+07:00"
+    """
+    minutes = int(offset.total_seconds() // 60)
+    sign = "-" if minutes < 0 else "+"
+    hours, minutes = divmod(abs(minutes), 60)
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+
+def get_offset_tokens(offset):
+    """
+    Returns the tokens a UTC offset can be searched by, e.g. "+07:00", "+7", "utc+7" and "gmt+07:00"
+    """
+    formatted = format_offset(offset)
+    sign, hours, minutes = formatted[0], int(formatted[1:3]), formatted[4:]
+    short = f"{sign}{hours}" if minutes == "00" else f"{sign}{hours}:{minutes}"
+    tokens = {formatted, short, formatted.replace(":", "")}
+    return tokens | {
+        f"{prefix}{token}" for token in tokens for prefix in ("utc", "gmt")
+    }
+
+
+class TimezoneIndex:
+    """
+    Token index of the timezones for the timezone autocomplete.
+
+    Each timezone is indexed under the words of its name (region and city, e.g. "america", "new", "york"),
+    its city as a single word ("newyork"), its current UTC offset in several notations, and common aliases.
+    A query matches the timezones having, for every word of the query, a token starting with it.
+    """
+
+    def __init__(self, today):
+        self.labels = {}
+        entries = set()
+        for tz in sorted(TIMEZONES):
+            offset = datetime.now(zoneinfo.ZoneInfo(tz)).utcoffset()
+            self.labels[tz] = f"{tz} (UTC{format_offset(offset)})"
+
+            # Words of the name, its parts ("new_york") and its city as a single word ("newyork")
+            words = [word.lower() for word in NAME_SEPARATORS.split(tz) if word]
+            tokens = set(words) | set(tz.lower().split("/")) | {"".join(words[1:])}
+            tokens.update(get_offset_tokens(offset))
+            tokens.update(TIMEZONE_ALIASES.get(tz, []))
+            entries.update((token, tz) for token in tokens if token)
+
+        entries = sorted(entries)
+        self.tokens = [token for token, _ in entries]
+        self.timezones = [tz for _, tz in entries]
+        self.today = today
+
+    def lookup(self, prefix):
+        """
+        Returns the set of timezones having a token starting with the prefix
+        """
+        start = bisect_left(self.tokens, prefix)
+        end = bisect_left(self.tokens, prefix + TOKEN_END, lo=start)
+        return set(self.timezones[start:end])
+
+    def search(self, query):
+        """
+        Returns the timezones matching every word of the query, sorted by name.
+        Without a query, every timezone is returned.
+        """
+        words = [word for word in QUERY_SEPARATORS.split(query.lower()) if word]
+        if not words:
+            return sorted(self.labels)
+
+        matches = self.lookup(words[0])
+        for word in words[1:]:
+            matches &= self.lookup(word)
+        return sorted(matches)
+
+
+@lru_cache(maxsize=1)
+def _get_timezone_index(today):
+    return TimezoneIndex(today)
+
+
+def get_timezone_index():
+    """
+    Returns the timezone index of the current process, rebuilt each day so the UTC offsets follow daylight saving time
+    """
+    return _get_timezone_index(date.today())
+
+
+def get_timezone_label(tz):
+    """
+    Returns the label of a timezone displayed in the autocomplete, its name and current UTC offset
+    """
+    return get_timezone_index().labels.get(tz, tz)
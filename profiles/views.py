@@ -6,11 +6,12 @@ from django.views.generic import (
     UpdateView,
     TemplateView,
 )
+from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.messages.views import SuccessMessageMixin
 from bookmarks.mixins import BookmarkSingleObjectMixin, BookmarkMixin
-from .models import Profile
-from .timezone_choices import TIMEZONES_CHOICES
+from .models import Profile, ProfileType, Genre, Skill
+from .timezone_choices import get_timezone_index, get_timezone_label
 from .forms import (
     ProfileCreateForm,
     ProfileEditGeneralInfoForm,
@@ -22,15 +23,18 @@ from .forms import (
     ProfileEditSocialsForm,
     ProfileEditTimezoneForm,
 )
-from django.http import HttpResponseBadRequest
+from django.http import HttpResponseBadRequest, JsonResponse
 from advertisements.models import Advertisement
 from inbox.forms import InboxCreateMessageForm
 from .filters import ProfileFilter
-from django.core.paginator import Paginator
-from django.conf import settings
+from core.listing import ListPipeline
+from core.mixins import CachedObjectMixin
+from .mixins import ProfileSlugRedirectMixin
+from core.pagination import InvalidCursor
 from reports.forms import ReportForm
 from dal import autocomplete
 from cities_light.models import City
+from .city_index import search_cities
 
 
 class ProfileCreateView(
@@ -76,23 +80,55 @@ class LocationAutocomplete(autocomplete.Select2QuerySetView):
 
     def get_queryset(self):
 
-        qs = City.objects.all()
+        # The results are labelled with the display name ("name, region, country") of the cities,
+        # so no other column or related table is loaded
+        qs = City.objects.only("id", "display_name")
 
-        # If there is a search query (self.q), filter the cities by name
-        # using case-insensitive containment (i.e., 'icontains')
-        if self.q:
-            qs = qs.filter(name__icontains=self.q)
+        # Without a search query, suggest the most populated cities
+        if not self.q:
+            return qs.order_by("-population", "id")
 
-        return qs
+        # If there is a search query (self.q), look up the cities whose name starts with it
+        # in the prefix index, best ranked first, and fetch them in the same order
+        city_ids = search_cities(self.q)
+        cities = qs.in_bulk(city_ids)
+        return [cities[city_id] for city_id in city_ids if city_id in cities]
 
 
 class TimezoneAutocompleteFromList(autocomplete.Select2ListView):
     """
     View to return list of timezones in Timezone autocomplete fields.
-    """
-
-    def get_list(self):
-        return TIMEZONES_CHOICES
+    The timezones are searched server-side in the timezone token index (city, region, UTC offset, aliases),
+    and returned one page at a time.
+    """
+
+    # Number of timezones returned per page
+    paginate_by = 20
+
+    def get(self, request, *args, **kwargs):
+        timezones = get_timezone_index().search(self.q)
+
+        # Select2 requests the following pages with a 1-based page parameter
+        try:
+            page = max(int(request.GET.get("page", 1)), 1)
+        except ValueError:
+            page = 1
+        start = (page - 1) * self.paginate_by
+        end = start + self.paginate_by
+
+        return JsonResponse(
+            {
+                "results": [
+                    {
+                        "id": tz,
+                        "text": get_timezone_label(tz),
+                        "selected_text": get_timezone_label(tz),
+                    }
+                    for tz in timezones[start:end]
+                ],
+                "pagination": {"more": end < len(timezones)},
+            }
+        )
 
 
 def profile_list(request):
@@ -102,28 +138,16 @@ def profile_list(request):
 
     # Take all the profiles in the database, order them by their creation date from newest to oldest,
     # and then apply any filters that the user specified in the URL query string.
-    f = ProfileFilter(request.GET, queryset=Profile.objects.all().order_by("-created"))
-
-    # Check if there are filter fields in the GET request,
-    # will be used to display Reset filter button in the template
-    has_filter = any(field in request.GET for field in set(f.get_fields()))
-
-    # If no filters are applied, retrieve all profiles ordered by creation date (newest first).
-    # Otherwise, use the filtered queryset provided by the filter.
-    if not has_filter:
-        profiles = Profile.objects.all().order_by("-created")
-    else:
-        profiles = f.qs
-
-    # Paginate the profiles using the PAGE_SIZE from settings.py
-    paginator = Paginator(profiles, settings.PAGE_SIZE)
-    profiles_page = paginator.page(1)  # default to 1 when this view is triggered
+    # The filters are evaluated once and the profiles paginated using the PAGE_SIZE from settings.py
+    profiles = ListPipeline(
+        request, ProfileFilter, Profile.objects.for_cards().order_by("-created")
+    )
 
     context = {
-        "form": f.form,
-        "profiles": profiles_page,
-        "profiles_count": profiles.count,
-        "has_filter": has_filter,
+        "form": profiles.form,
+        "profiles": profiles.page(),  # first page when this view is triggered
+        "profiles_count": profiles.count(),
+        "has_filter": profiles.has_filter,
     }
 
     return render(request, "profiles/profile_list.html", context)
@@ -138,30 +162,36 @@ def get_profiles(request):
     if not request.headers.get("HX-Request"):
         return HttpResponseBadRequest("This endpoint only accepts HTMX requests.")
 
-    # ?page=2, then this will extract 2. If it doesn't, then default to 1
-    page = request.GET.get("page", 1)
+    # Opaque cursor pointing after the last profile of the previous page
+    cursor = request.GET.get("cursor")
 
-    f = ProfileFilter(request.GET, queryset=Profile.objects.all().order_by("-created"))
-    has_filter = any(field in request.GET for field in set(f.get_fields()))
+    profiles = ListPipeline(
+        request, ProfileFilter, Profile.objects.for_cards().order_by("-created")
+    )
 
-    if not has_filter:
-        profiles = Profile.objects.all().order_by("-created")
-    else:
-        profiles = f.qs
+    # Keyset pagination, so deep pages cost the same as the first one and no COUNT is run
+    try:
+        profiles_page = profiles.page(cursor)
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid cursor.")
 
-    paginator = Paginator(profiles, settings.PAGE_SIZE)
-    context = {"profiles": paginator.page(page)}
+    context = {"profiles": profiles_page}
 
     return render(request, "profiles/profile_list_partial.html#profiles_list", context)
 
 
-class ProfileDetailView(BookmarkSingleObjectMixin, DetailView):
+class ProfileDetailView(
+    ProfileSlugRedirectMixin, CachedObjectMixin, BookmarkSingleObjectMixin, DetailView
+):
     """
     View for displaying the Profile Detail.
     Uses Django generic DetailView to handle the profile detail - About page.
     """
 
     model = Profile
+    # Load the user, type, location, genres and skills with the profile, which is cached with them
+    queryset = Profile.objects.for_detail()
+    cache_dependencies = [get_user_model(), ProfileType, Genre, Skill]
     template_name = "profiles/profile_detail_about.html"
     context_object_name = "profile"
     slug_field = "slug"
@@ -182,14 +212,14 @@ class ProfileDetailView(BookmarkSingleObjectMixin, DetailView):
         # Get bookmark context for Profile model
         # Add bookmark context for profile (single object)
         profile_bookmark_context = self.get_single_bookmark_context(
-            self.request.user, self.get_object()
+            self.request.user, self.object
         )
         # Update the context with bookmark info
         context.update(profile_bookmark_context)
 
         # Pass context for report button
-        # Get the current profile object
-        profile = self.get_object()
+        # The current profile object, retrieved by DetailView
+        profile = self.object
         # Add the report button to the context
         context["report_form"] = ReportForm()
         # Add the app label for the profile model
@@ -200,12 +230,21 @@ class ProfileDetailView(BookmarkSingleObjectMixin, DetailView):
         return context
 
 
-class ProfileAdsDetailView(BookmarkSingleObjectMixin, BookmarkMixin, DetailView):
+class ProfileAdsDetailView(
+    ProfileSlugRedirectMixin,
+    CachedObjectMixin,
+    BookmarkSingleObjectMixin,
+    BookmarkMixin,
+    DetailView,
+):
     """
     View for displaying the Active Ads section of Profile Detail page.
     """
 
     model = Profile
+    # Load the user, type, location, genres and skills with the profile, which is cached with them
+    queryset = Profile.objects.for_detail()
+    cache_dependencies = [get_user_model(), ProfileType, Genre, Skill]
     template_name = "profiles/profile_detail_ads.html"
     context_object_name = "profile"
     slug_field = "slug"
@@ -222,10 +261,12 @@ class ProfileAdsDetailView(BookmarkSingleObjectMixin, BookmarkMixin, DetailView)
         # Get InboxCreateMessageForm
         context["create_message_form"] = InboxCreateMessageForm()
 
-        # Get advertisements for the profile
-        profile = self.get_object()
-        advertisements = Advertisement.objects.filter(author=profile).order_by(
-            "-last_updated"
+        # Get advertisements for the profile retrieved by DetailView
+        profile = self.object
+        advertisements = (
+            Advertisement.objects.for_cards()
+            .filter(author=profile)
+            .order_by("-last_updated")
         )
         context["ads"] = advertisements
 
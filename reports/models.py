@@ -23,11 +23,19 @@ class Report(models.Model):
     object_type = models.CharField(max_length=50, blank=True, null=True)
 
     def save(self, *args, **kwargs):
+        from .tasks import snapshot_report_object
+
         # Set object details
-        if self.content_object:
-            self.object_title = str(self.content_object)
+        # The type is known from the content type, the title is recorded by a background job
+        # as rendering the reported object may load it and its relations
+        if self.content_type_id and not self.object_type:
             self.object_type = self.content_type.model
+        # Only snapshot new reports, so later edits (e.g. in the admin) do not queue it again,
+        # including for reports whose object was deleted before its title could be recorded
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if adding and not self.object_title:
+            snapshot_report_object.delay(self.pk)
 
     def __str__(self):
         return f"Report(profile={self.profile}, content_type={self.content_type}, object_id={self.object_id})"
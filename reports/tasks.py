@@ -0,0 +1,21 @@
+from jobs.queue import job
+
+from .models import Report
+
+
+@job
+def snapshot_report_object(report_pk):
+    """
+    Records the title of the reported object on a report,
+    so the report still tells what was reported once the object is changed or deleted.
+    """
+
+    report = Report.objects.select_related("content_type").filter(pk=report_pk).first()
+    # The report or the reported object may have been deleted in the meantime
+    if report is None or report.content_object is None:
+        return
+
+    title_length = Report._meta.get_field("object_title").max_length
+    Report.objects.filter(pk=report_pk).update(
+        object_title=str(report.content_object)[:title_length]
+    )
@@ -1,14 +1,17 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from profiles.models import Profile
 from reports.models import Report
 from advertisements.models import Advertisement
+from jobs.models import Job
+from jobs.queue import run_pending
 
 User = get_user_model()
 
 
+@override_settings(JOBS_EAGER=True)
 class CreateReportViewTests(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(username="testuser", password="password")
@@ -77,3 +80,22 @@ class CreateReportViewTests(TestCase):
         self.assertEqual(report.profile, self.profile)
         self.assertEqual(report.object_title, str(self.advertisement))
         self.assertEqual(report.object_type, "advertisement")
+
+    @override_settings(JOBS_EAGER=False)
+    def test_object_title_is_recorded_by_a_job(self):
+        self.client.post(
+            self.url,
+            HTTP_HX_REQUEST="true",
+            data={"description": "Inappropriate content"},
+        )
+        report = Report.objects.latest("created")
+        self.assertIsNone(report.object_title)
+        self.assertEqual(report.object_type, "advertisement")
+
+        # Editing the report before its title is recorded does not queue another job
+        report.save()
+        self.assertEqual(Job.objects.count(), 1)
+
+        self.assertEqual(run_pending(), 1)
+        report.refresh_from_db()
+        self.assertEqual(report.object_title, str(self.advertisement))
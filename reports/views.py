@@ -78,7 +78,7 @@ class CreateReportView(
         # Set the content type, object ID, and other relevant information.
         report.content_type = content_type
         report.object_id = object_id
-        report.object_title = str(content_object)
+        # The title of the object is recorded in the background (see Report.save)
         report.object_type = model_name
 
         # Save the report to the database.
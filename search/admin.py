@@ -0,0 +1,23 @@
+from django.contrib import admin
+from .models import SearchDocument
+
+
+class SearchDocumentAdmin(admin.ModelAdmin):
+    """
+    Admin class for inspecting the search documents, which are maintained automatically.
+    """
+
+    # Fields to display in the list view of the SearchDocument model.
+    list_display = ("title", "content_type", "object_id", "updated")
+
+    # Filter the documents by the model of their object.
+    list_filter = ("content_type",)
+
+    # Fields that can be searched in the admin search bar.
+    search_fields = ("title",)
+
+    # The documents are written from their objects, they are read-only here.
+    readonly_fields = ("content_type", "object_id", "title", "tags", "body", "updated")
+
+
+admin.site.register(SearchDocument, SearchDocumentAdmin)
@@ -0,0 +1,167 @@
+import re
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models import Expression, F, FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+from .models import SearchDocument
+
+# Maximum number of search terms taken from a query, the rest is ignored
+MAX_TERMS = 8
+
+# Name of the SQLite FTS5 table indexing the search documents (created by the migrations)
+FTS5_TABLE = "search_searchdocument_fts"
+
+# Weights of the title, tags and body columns in the SQLite ranking
+FTS5_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+def get_terms(query):
+    """
+    Splits a search query into lowercase words, dropping any search syntax (quotes, operators)
+    so user input can safely be turned into a full-text query.
+    """
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+class BaseSearchBackend:
+    """
+    Interface of the full-text search backends.
+    The search documents are written with the ORM, each backend only implements the query side
+    on top of the index its database maintains.
+    """
+
+    def search(self, queryset, query):
+        """
+        Filters the queryset of a searchable model to the objects matching every word of the query
+        (words are prefix matched), annotated with a `search_rank`, the higher the more relevant,
+        and ordered by it.
+        """
+        terms = get_terms(query)
+        if not terms:
+            return queryset
+
+        content_type = ContentType.objects.get_for_model(queryset.model)
+        return self.filter(queryset, terms, content_type).order_by("-search_rank")
+
+    def filter(self, queryset, terms, content_type):
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Backend for PostgreSQL, matching the GIN indexed search vectors of the documents
+    and ranking them with ts_rank (title weighted A, tags B, body C).
+    """
+
+    def filter(self, queryset, terms, content_type):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        # The terms are plain words, so a raw tsquery of prefix matches is safe to build
+        search_query = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms),
+            search_type="raw",
+            config="english",
+        )
+        documents = SearchDocument.objects.filter(
+            content_type=content_type, search_vector=search_query
+        )
+        # ts_rank returns a real (float4), cast to double precision so the ranks compared by the cursor
+        # pagination (stored as Python floats) are equal to the ones of the rows, ties included
+        ranks = documents.filter(object_id=OuterRef("pk")).annotate(
+            rank=Cast(SearchRank(F("search_vector"), search_query), FloatField())
+        )
+        return queryset.filter(pk__in=documents.values("object_id")).annotate(
+            search_rank=Subquery(ranks.values("rank")[:1], output_field=FloatField())
+        )
+
+
+class FTS5Rank(Expression):
+    """
+    Relevance of the search document of the outer row for an FTS5 MATCH query, from the bm25 ranking.
+    Negated, as bm25 gives the best matches the lowest scores.
+    """
+
+    output_field = FloatField()
+
+    def __init__(self, match, content_type_id, expression="pk"):
+        super().__init__()
+        self.match = match
+        self.content_type_id = content_type_id
+        self.expression = F(expression)
+
+    def get_source_expressions(self):
+        return [self.expression]
+
+    def set_source_expressions(self, exprs):
+        (self.expression,) = exprs
+
+    def as_sql(self, compiler, connection):
+        object_id_sql, object_id_params = compiler.compile(self.expression)
+        weights = ", ".join(str(weight) for weight in FTS5_WEIGHTS)
+        sql = (
+            f"(SELECT -bm25({FTS5_TABLE}, {weights}) FROM {FTS5_TABLE} "
+            f"WHERE {FTS5_TABLE} MATCH %s AND content_type_id = %s AND object_id = {object_id_sql})"
+        )
+        return sql, (self.match, self.content_type_id, *object_id_params)
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    Backend for SQLite (local development and tests), matching the FTS5 table of the documents
+    and ranking them with bm25.
+    """
+
+    def filter(self, queryset, terms, content_type):
+        # Quoted terms are matched literally, the trailing * makes them prefix matches
+        match = " ".join(f'"{term}"*' for term in terms)
+
+        matching_ids = RawSQL(
+            f"SELECT object_id FROM {FTS5_TABLE} WHERE {FTS5_TABLE} MATCH %s AND content_type_id = %s",
+            (match, content_type.id),
+        )
+        return queryset.filter(pk__in=matching_ids).annotate(
+            search_rank=FTS5Rank(match, content_type.id)
+        )
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Backend for the other databases, matching the documents with case-insensitive containment and no ranking.
+    """
+
+    def filter(self, queryset, terms, content_type):
+        documents = SearchDocument.objects.filter(content_type=content_type)
+        for term in terms:
+            documents = documents.filter(
+                Q(title__icontains=term)
+                | Q(tags__icontains=term)
+                | Q(body__icontains=term)
+            )
+        return queryset.filter(pk__in=documents.values("object_id")).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+
+# Search backends of the database vendors with a full-text index
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_backend():
+    """
+    Returns the search backend for the database in use
+    """
+    return BACKENDS.get(connection.vendor, DatabaseSearchBackend)()
+
+
+def search(queryset, query):
+    """
+    Filters the queryset of a Profile, Advertisement or Open Mic to the objects matching the search query,
+    ordered by relevance.
+    """
+    return get_backend().search(queryset, query)
@@ -0,0 +1,77 @@
+from django.contrib.contenttypes.models import ContentType
+
+from advertisements.models import Advertisement
+from openmics.models import OpenMic
+from profiles.models import Profile
+
+from .models import SearchDocument
+
+
+def get_profile_document(profile):
+    """
+    Returns the searchable text of a profile
+    """
+    return {
+        "title": profile.display_name,
+        "tags": " ".join(
+            tag
+            for tag in [profile.influences]
+            + [genre.name for genre in profile.genres.all()]
+            + [skill.name for skill in profile.skills.all()]
+            if tag
+        ),
+        "body": profile.bio,
+    }
+
+
+def get_advertisement_document(advertisement):
+    """
+    Returns the searchable text of an advertisement
+    """
+    return {
+        "title": advertisement.title,
+        "tags": " ".join(
+            [genre.name for genre in advertisement.genres.all()]
+            + [skill.name for skill in advertisement.skills.all()]
+        ),
+        "body": advertisement.description,
+    }
+
+
+def get_openmic_document(openmic):
+    """
+    Returns the searchable text of an open mic
+    """
+    return {
+        "title": openmic.title,
+        "tags": " ".join(genre.name for genre in openmic.genres.all()),
+        "body": openmic.description,
+    }
+
+
+# Searchable models and the functions returning the searchable text of their objects
+SEARCH_DOCUMENTS = {
+    Profile: get_profile_document,
+    Advertisement: get_advertisement_document,
+    OpenMic: get_openmic_document,
+}
+
+
+def update_document(obj):
+    """
+    Creates or updates the search document of an object of a searchable model
+    """
+    SearchDocument.objects.update_or_create(
+        content_type=ContentType.objects.get_for_model(obj),
+        object_id=obj.pk,
+        defaults=SEARCH_DOCUMENTS[type(obj)](obj),
+    )
+
+
+def remove_document(obj):
+    """
+    Deletes the search document of an object of a searchable model
+    """
+    SearchDocument.objects.filter(
+        content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk
+    ).delete()
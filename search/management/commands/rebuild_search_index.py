@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from search.documents import SEARCH_DOCUMENTS, update_document
+
+
+class Command(BaseCommand):
+    help = "Creates or updates the search documents of every profile, advertisement and open mic"
+
+    def handle(self, *args, **kwargs):
+        for model in SEARCH_DOCUMENTS:
+            self.stdout.write(f"Indexing {model._meta.verbose_name_plural}...")
+
+            # Prefetch the genres and skills included in the documents
+            related = [
+                field.name
+                for field in model._meta.many_to_many
+                if field.name in ("genres", "skills")
+            ]
+            queryset = model.objects.prefetch_related(*related).order_by("pk")
+
+            count = 0
+            for obj in queryset.iterator(chunk_size=500):
+                update_document(obj)
+                count += 1
+
+            self.stdout.write(f"Indexed {count} {model._meta.verbose_name_plural}")
+
+        self.stdout.write(self.style.SUCCESS("Successfully rebuilt the search index"))
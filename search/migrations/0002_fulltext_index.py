@@ -0,0 +1,102 @@
+from django.db import migrations
+
+# PostgreSQL: a trigger keeps the weighted search vector of each document up to date, and a GIN index covers it
+POSTGRESQL_FORWARD = [
+    """
+    CREATE FUNCTION search_searchdocument_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.tags, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.body, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, tags, body ON search_searchdocument
+    FOR EACH ROW EXECUTE FUNCTION search_searchdocument_vector_update()
+    """,
+    """
+    CREATE INDEX search_searchdocument_vector_gin
+    ON search_searchdocument USING gin (search_vector)
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX IF EXISTS search_searchdocument_vector_gin",
+    "DROP TRIGGER IF EXISTS search_searchdocument_vector_trigger ON search_searchdocument",
+    "DROP FUNCTION IF EXISTS search_searchdocument_vector_update()",
+]
+
+# SQLite: an external content FTS5 table over the documents, kept in sync by triggers
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE search_searchdocument_fts USING fts5(
+        title, tags, body,
+        content_type_id UNINDEXED, object_id UNINDEXED,
+        content='search_searchdocument', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_fts_insert AFTER INSERT ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(rowid, title, tags, body, content_type_id, object_id)
+        VALUES (new.id, new.title, new.tags, new.body, new.content_type_id, new.object_id);
+    END
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_fts_delete AFTER DELETE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, title, tags, body, content_type_id, object_id)
+        VALUES ('delete', old.id, old.title, old.tags, old.body, old.content_type_id, old.object_id);
+    END
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_fts_update AFTER UPDATE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, title, tags, body, content_type_id, object_id)
+        VALUES ('delete', old.id, old.title, old.tags, old.body, old.content_type_id, old.object_id);
+        INSERT INTO search_searchdocument_fts(rowid, title, tags, body, content_type_id, object_id)
+        VALUES (new.id, new.title, new.tags, new.body, new.content_type_id, new.object_id);
+    END
+    """,
+    # Index the documents which already exist
+    "INSERT INTO search_searchdocument_fts(search_searchdocument_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS search_searchdocument_fts_update",
+    "DROP TRIGGER IF EXISTS search_searchdocument_fts_delete",
+    "DROP TRIGGER IF EXISTS search_searchdocument_fts_insert",
+    "DROP TABLE IF EXISTS search_searchdocument_fts",
+]
+
+
+def run_vendor_sql(statements):
+    """
+    Returns a migration function executing the statements of the database vendor in use, if any
+    """
+
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_vendor_sql(
+                {"postgresql": POSTGRESQL_FORWARD, "sqlite": SQLITE_FORWARD}
+            ),
+            run_vendor_sql(
+                {"postgresql": POSTGRESQL_BACKWARD, "sqlite": SQLITE_BACKWARD}
+            ),
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.db import migrations
+
+from search.documents import (
+    get_advertisement_document,
+    get_openmic_document,
+    get_profile_document,
+)
+
+# Searchable models and the functions returning the searchable text of their objects (see search.documents)
+DOCUMENTS = [
+    ("profiles", "profile", get_profile_document),
+    ("advertisements", "advertisement", get_advertisement_document),
+    ("openmics", "openmic", get_openmic_document),
+]
+
+BATCH_SIZE = 500
+
+
+def backfill_search_documents(apps, schema_editor):
+    """
+    Creates the search documents of the existing profiles, advertisements and open mics,
+    which the `q` filters of the lists search. Same documents as the rebuild_search_index command,
+    built from the historical models. The triggers of 0002 index them as they are inserted.
+    """
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    SearchDocument = apps.get_model("search", "SearchDocument")
+
+    for app_label, model_name, get_document in DOCUMENTS:
+        model = apps.get_model(app_label, model_name)
+        if not model.objects.exists():
+            continue
+        content_type, _ = ContentType.objects.get_or_create(
+            app_label=app_label, model=model_name
+        )
+
+        # Prefetch the genres and skills included in the documents
+        related = [
+            field.name
+            for field in model._meta.many_to_many
+            if field.name in ("genres", "skills")
+        ]
+        queryset = model.objects.prefetch_related(*related).order_by("pk")
+
+        # Insert the documents by batches, without loading every object at once
+        documents = []
+        for obj in queryset.iterator(chunk_size=BATCH_SIZE):
+            documents.append(
+                SearchDocument(
+                    content_type=content_type, object_id=obj.pk, **get_document(obj)
+                )
+            )
+            if len(documents) == BATCH_SIZE:
+                SearchDocument.objects.bulk_create(documents, ignore_conflicts=True)
+                documents = []
+        SearchDocument.objects.bulk_create(documents, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0002_fulltext_index"),
+        ("profiles", "0028_backfill_profile_media_flags"),
+        ("advertisements", "0004_alter_comment_author"),
+        ("openmics", "0006_openmic_geo_cell"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
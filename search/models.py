@@ -0,0 +1,41 @@
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    Model storing the searchable text of a Profile, Advertisement or Open Mic.
+    The text is split in three columns ranked from the most to the least relevant.
+    The full-text index over the columns is maintained by the database itself (see the migrations):
+    a GIN indexed tsvector on PostgreSQL, and an FTS5 table on SQLite.
+    """
+
+    # The content type and ID of the searchable object
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey("content_type", "object_id")
+
+    # Title or display name, ranked highest
+    title = models.CharField(max_length=255, blank=True)
+    # Influences, genre and skill names
+    tags = models.TextField(blank=True)
+    # Description or bio, ranked lowest
+    body = models.TextField(blank=True)
+
+    # Weighted search vector of the columns, only filled on PostgreSQL (by a trigger)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # One search document per object
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id"], name="unique_search_document"
+            )
+        ]
+
+    def __str__(self):
+        return f"SearchDocument(content_type={self.content_type_id}, object_id={self.object_id})"
@@ -0,0 +1,50 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from advertisements.models import Advertisement
+from openmics.models import OpenMic
+from profiles.models import Profile
+
+from .documents import remove_document, update_document
+
+
+@receiver(post_save, sender=Advertisement)
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=OpenMic)
+def update_document_on_save(sender, instance, **kwargs):
+    """
+    Signal receiver that updates the search document of an object when it is saved.
+    """
+    update_document(instance)
+
+
+@receiver(post_delete, sender=Advertisement)
+@receiver(post_delete, sender=Profile)
+@receiver(post_delete, sender=OpenMic)
+def remove_document_on_delete(sender, instance, **kwargs):
+    """
+    Signal receiver that deletes the search document of an object when it is deleted.
+    """
+    remove_document(instance)
+
+
+@receiver(m2m_changed, sender=Profile.genres.through)
+@receiver(m2m_changed, sender=Profile.skills.through)
+@receiver(m2m_changed, sender=Advertisement.genres.through)
+@receiver(m2m_changed, sender=Advertisement.skills.through)
+@receiver(m2m_changed, sender=OpenMic.genres.through)
+def update_document_on_relation_change(
+    sender, instance, action, reverse, model, pk_set, **kwargs
+):
+    """
+    Signal receiver that updates the search documents of the objects whose genres or skills changed.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        update_document(instance)
+    elif pk_set:
+        # Changed from the genre or skill side, update the documents of the objects given
+        for obj in model.objects.filter(pk__in=pk_set):
+            update_document(obj)
@@ -0,0 +1,189 @@
+from datetime import date, time, timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from advertisements.models import Advertisement, AdType
+from core.pagination import CursorPaginator
+from openmics.models import OpenMic
+from profiles.models import Genre, Profile, Skill
+from search.backends import DatabaseSearchBackend, get_terms, search
+from search.models import SearchDocument
+
+User = get_user_model()
+
+
+class SearchTestMixin:
+    def create_profile(self, username, **kwargs):
+        user = User.objects.create_user(username=username, password="password")
+        return Profile.objects.create(user=user, **kwargs)
+
+
+class SearchDocumentTests(SearchTestMixin, TestCase):
+    def setUp(self):
+        self.profile = self.create_profile(
+            "testuser", display_name="Test User", bio="Plays in a jazz trio"
+        )
+
+    def get_document(self, obj):
+        return SearchDocument.objects.get(
+            content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk
+        )
+
+    def test_document_is_created_and_updated_on_save(self):
+        self.assertEqual(self.get_document(self.profile).title, "Test User")
+
+        self.profile.display_name = "Renamed User"
+        self.profile.influences = "Miles Davis"
+        self.profile.save()
+
+        document = self.get_document(self.profile)
+        self.assertEqual(document.title, "Renamed User")
+        self.assertIn("Miles Davis", document.tags)
+        self.assertEqual(document.body, "Plays in a jazz trio")
+
+    def test_document_is_updated_on_genre_and_skill_change(self):
+        genre = Genre.objects.create(name="Bossa Nova")
+        skill = Skill.objects.create(name="Saxophone")
+
+        self.profile.influences = "Stan Getz"
+        self.profile.save()
+        self.profile.genres.add(genre)
+        genre.profile_set.add(self.create_profile("other", display_name="Other"))
+        self.profile.skills.add(skill)
+
+        self.assertEqual(self.get_document(self.profile).tags, "Stan Getz Bossa Nova Saxophone")
+        self.assertEqual(
+            list(search(Profile.objects.all(), "saxophone")), [self.profile]
+        )
+        self.assertEqual(len(search(Profile.objects.all(), "bossa")), 2)
+
+        self.profile.skills.remove(skill)
+        self.assertFalse(search(Profile.objects.all(), "saxophone").exists())
+
+    def test_document_is_deleted_with_its_object(self):
+        self.profile.delete()
+        self.assertFalse(SearchDocument.objects.exists())
+
+    def test_rebuild_search_index(self):
+        SearchDocument.objects.all().delete()
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        self.assertEqual(list(search(Profile.objects.all(), "jazz")), [self.profile])
+
+
+class SearchTests(SearchTestMixin, TestCase):
+    def setUp(self):
+        self.title_match = self.create_profile(
+            "drummer", display_name="Drummer Available", bio="Weekends only"
+        )
+        self.bio_match = self.create_profile(
+            "guitarist", display_name="Guitarist", bio="Also a drummer"
+        )
+        self.no_match = self.create_profile(
+            "singer", display_name="Singer", bio="Soprano"
+        )
+
+    def test_get_terms(self):
+        self.assertEqual(
+            get_terms('Jazz "drummer" OR -guitar*'), ["jazz", "drummer", "or", "guitar"]
+        )
+        self.assertEqual(get_terms("  "), [])
+
+    def test_title_matches_rank_first(self):
+        results = list(search(Profile.objects.all(), "drummer"))
+        self.assertEqual(results, [self.title_match, self.bio_match])
+
+    def test_prefix_and_every_word_match(self):
+        self.assertEqual(
+            list(search(Profile.objects.all(), "drum week")), [self.title_match]
+        )
+
+    def test_search_syntax_is_ignored(self):
+        self.assertEqual(
+            list(search(Profile.objects.all(), 'drummer" OR "singer*')), []
+        )
+        self.assertEqual(list(search(Profile.objects.all(), "sop^rano")), [])
+
+    def test_empty_query_does_not_filter(self):
+        self.assertEqual(search(Profile.objects.all(), "?!").count(), 3)
+
+    def test_results_are_restricted_to_the_model(self):
+        OpenMic.objects.create(
+            title="Drummer Night",
+            description="Bring your sticks",
+            event_date=date.today() + timedelta(days=1),
+            start_time=time(19, 0),
+            end_time=time(23, 0),
+            author=self.no_match,
+        )
+
+        self.assertEqual(len(search(Profile.objects.all(), "drummer")), 2)
+        self.assertEqual(search(OpenMic.objects.all(), "drummer").count(), 1)
+
+    def test_ranked_results_paginate_with_cursors(self):
+        for i in range(5):
+            self.create_profile(f"drummer{i}", display_name=f"Drummer {i}")
+
+        paginator = CursorPaginator(search(Profile.objects.all(), "drummer"), 2)
+        page = paginator.page()
+        pks = [profile.pk for profile in page]
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            pks.extend(profile.pk for profile in page)
+
+        self.assertEqual(len(pks), 7)
+        self.assertEqual(len(set(pks)), 7)
+        self.assertEqual(pks[-1], self.bio_match.pk)
+
+    @skipUnless(connection.vendor == "postgresql", "ts_rank ranks are PostgreSQL only")
+    def test_tied_ranks_paginate_with_cursors(self):
+        # Identical documents have the same (non integer) rank, the pages are split within the tie
+        tied = [
+            self.create_profile(f"bassist{i}", display_name="Bassist", bio="Jazz")
+            for i in range(7)
+        ]
+
+        paginator = CursorPaginator(search(Profile.objects.all(), "bassist"), 2)
+        page = paginator.page()
+        pks = [profile.pk for profile in page]
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            pks.extend(profile.pk for profile in page)
+
+        self.assertEqual(sorted(pks), sorted(profile.pk for profile in tied))
+
+    def test_database_backend(self):
+        results = DatabaseSearchBackend().search(Profile.objects.all(), "drum week")
+        self.assertEqual(list(results), [self.title_match])
+
+    def test_profile_list_search_filter(self):
+        response = self.client.get(reverse("profiles:profile_list"), {"q": "drummer"})
+
+        self.assertContains(response, "Drummer Available")
+        self.assertContains(response, "Guitarist")
+        self.assertNotContains(response, "Singer")
+
+    def test_advertisement_list_search_filter(self):
+        ad_type = AdType.objects.create(name="Band Member Wanted")
+        for title in ("Looking for a bassist", "Looking for a keyboardist"):
+            Advertisement.objects.create(
+                title=title,
+                ad_type=ad_type,
+                description="Rehearsals on Mondays",
+                author=self.no_match,
+            )
+
+        response = self.client.get(
+            reverse("advertisements:advertisement_list"), {"q": "bassist"}
+        )
+
+        self.assertContains(response, "Looking for a bassist")
+        self.assertNotContains(response, "Looking for a keyboardist")
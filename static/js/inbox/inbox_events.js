@@ -0,0 +1,21 @@
+// Listens to the inbox event stream of the logged in user and passes the events on to HTMX,
+// so the inbox badge and the new message indicators refresh as soon as a message arrives.
+(function () {
+    const url = document.currentScript.dataset.url;
+    if (!url || !window.EventSource) {
+        return;
+    }
+
+    // The browser reconnects automatically when the server closes the stream
+    const source = new EventSource(url);
+
+    // Number of conversations with unread messages changed, refreshes the inbox badge in the header
+    source.addEventListener("unread", function (event) {
+        htmx.trigger(document.body, "inbox:unread", JSON.parse(event.data));
+    });
+
+    // A new message was received, refreshes the new message indicators of the conversation list
+    source.addEventListener("message", function (event) {
+        htmx.trigger(document.body, "inbox:message", JSON.parse(event.data));
+    });
+})();